@@ -0,0 +1,178 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+from distimate import Distribution, DistributionType
+
+SAMPLES = [10 ** 3, 10 ** 5, 10 ** 7, 10 ** 8]
+EDGES = [10, 10 ** 3, 10 ** 4]
+
+# Number of distributions merged by merge benchmarks.
+MERGED = 1000
+
+
+def create_edges(count):
+    return np.geomspace(1, 10 ** 6, count)
+
+
+def create_histogram(rng, edges):
+    return rng.integers(0, 100, len(edges) + 1).astype(np.float64)
+
+
+class Ingestion:
+    """Binning samples using a binary search in edges."""
+
+    params = [SAMPLES, EDGES]
+    param_names = ["samples", "edges"]
+
+    def setup(self, samples, edges):
+        rng = np.random.default_rng(0)
+        self.edges = create_edges(edges)
+        self.samples = rng.lognormal(5, 2, samples)
+        self.weights = rng.random(samples)
+        self.dist = Distribution(self.edges)
+
+    def time_update(self, samples, edges):
+        self.dist.update(self.samples)
+
+    def time_update_w_weights(self, samples, edges):
+        self.dist.update(self.samples, self.weights)
+
+    def time_from_samples(self, samples, edges):
+        Distribution.from_samples(self.edges, self.samples)
+
+    def peakmem_from_samples(self, samples, edges):
+        Distribution.from_samples(self.edges, self.samples)
+
+
+class ArithmeticIngestion:
+    """Binning samples using an arithmetic layout of edges."""
+
+    params = [SAMPLES, EDGES]
+    param_names = ["samples", "edges"]
+
+    def setup(self, samples, edges):
+        rng = np.random.default_rng(0)
+        self.dist_type = DistributionType.exponential(1, 10 ** 6, edges)
+        self.samples = rng.lognormal(5, 2, samples)
+
+    def time_from_samples(self, samples, edges):
+        self.dist_type.from_samples(self.samples)
+
+    def peakmem_from_samples(self, samples, edges):
+        self.dist_type.from_samples(self.samples)
+
+
+class ScalarIngestion:
+    """Adding samples one by one."""
+
+    params = [EDGES]
+    param_names = ["edges"]
+
+    def setup(self, edges):
+        rng = np.random.default_rng(0)
+        self.dist = Distribution(create_edges(edges))
+        self.samples = rng.lognormal(5, 2, 1000).tolist()
+
+    def time_add(self, edges):
+        for sample in self.samples:
+            self.dist.add(sample)
+
+
+class Merging:
+    """Combining and comparing distributions."""
+
+    params = [EDGES]
+    param_names = ["edges"]
+
+    def setup(self, edges):
+        rng = np.random.default_rng(0)
+        self.edges = create_edges(edges)
+        self.dist1 = Distribution(self.edges, create_histogram(rng, self.edges))
+        self.dist2 = Distribution(self.edges, create_histogram(rng, self.edges))
+        self.dists = [
+            Distribution(self.edges, create_histogram(rng, self.edges))
+            for _ in range(MERGED)
+        ]
+
+    def time_add(self, edges):
+        self.dist1 + self.dist2
+
+    def time_iadd(self, edges):
+        self.dist1 += self.dist2
+
+    def time_eq(self, edges):
+        self.dist1 == self.dist2
+
+    def time_sum(self, edges):
+        sum(self.dists, Distribution(self.edges))
+
+    def peakmem_sum(self, edges):
+        sum(self.dists, Distribution(self.edges))
+
+    def time_merge_all(self, edges):
+        Distribution.merge_all(self.dists)
+
+    def peakmem_merge_all(self, edges):
+        Distribution.merge_all(self.dists)
+
+
+class Statistics:
+    """Statistical functions of a distribution."""
+
+    params = [EDGES]
+    param_names = ["edges"]
+
+    def setup(self, edges):
+        rng = np.random.default_rng(0)
+        self.edges = create_edges(edges)
+        self.histogram = create_histogram(rng, self.edges)
+        self.dist = Distribution(self.edges, self.histogram)
+        self.dist.quantile(0.5)
+
+    def time_quantile_of_new(self, edges):
+        Distribution(self.edges, self.histogram).quantile(0.5)
+
+    def time_quantile_of_cached(self, edges):
+        self.dist.quantile(0.5)
+
+    def time_cdf_of_new(self, edges):
+        Distribution(self.edges, self.histogram).cdf(1000)
+
+    def time_to_cumulative(self, edges):
+        self.dist.to_cumulative()
+
+    def time_mean(self, edges):
+        self.dist.mean
+
+
+class Serialization:
+    """Conversion of distributions to and from bytes."""
+
+    params = [EDGES]
+    param_names = ["edges"]
+
+    def setup(self, edges):
+        rng = np.random.default_rng(0)
+        self.dist_type = DistributionType(create_edges(edges))
+        histogram = create_histogram(rng, self.dist_type.edges)
+        self.dist = self.dist_type.from_histogram(histogram)
+        self.data = self.dist.to_bytes()
+
+    def time_to_bytes(self, edges):
+        self.dist.to_bytes()
+
+    def time_from_bytes(self, edges):
+        self.dist_type.from_bytes(self.data)
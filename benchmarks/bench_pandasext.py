@@ -0,0 +1,137 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pandas as pd
+
+from distimate import DistributionType
+
+ROWS = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+EDGES = [10, 100, 10 ** 3]
+
+# Benchmarks with more histogram values are skipped.
+MAX_VALUES = 10 ** 8
+
+# Series of Distribution objects are boxed row by row, keep them smaller.
+MAX_OBJECT_ROWS = 10 ** 5
+
+# Number of groups for groupby benchmarks.
+GROUPS = 100
+
+
+def create_series(rows, edges):
+    if rows * (edges + 1) > MAX_VALUES:
+        raise NotImplementedError("Too large.")
+    rng = np.random.default_rng(0)
+    dist_type = DistributionType(np.geomspace(1, 10 ** 6, edges))
+    histograms = rng.integers(0, 100, (rows, edges + 1)).astype(np.float64)
+    return dist_type, histograms, rng
+
+
+class SeriesConversions:
+    """Converting histograms to and from Pandas series."""
+
+    params = [ROWS, EDGES]
+    param_names = ["rows", "edges"]
+
+    def setup(self, rows, edges):
+        self.dist_type, self.histograms, _ = create_series(rows, edges)
+        self.frame = pd.DataFrame(self.histograms)
+        self.series = pd.Series.dist.from_histogram(self.dist_type, self.histograms)
+
+    def time_from_histogram(self, rows, edges):
+        pd.Series.dist.from_histogram(self.dist_type, self.histograms)
+
+    def peakmem_from_histogram(self, rows, edges):
+        pd.Series.dist.from_histogram(self.dist_type, self.histograms)
+
+    def time_from_histogram_frame(self, rows, edges):
+        pd.Series.dist.from_histogram(self.dist_type, self.frame)
+
+    def time_to_histogram(self, rows, edges):
+        self.series.dist.to_histogram()
+
+    def time_to_cumulative(self, rows, edges):
+        self.series.dist.to_cumulative()
+
+
+class SeriesStatistics:
+    """Statistical functions of all rows using the dist accessor."""
+
+    params = [ROWS, EDGES]
+    param_names = ["rows", "edges"]
+
+    def setup(self, rows, edges):
+        self.dist_type, self.histograms, _ = create_series(rows, edges)
+        self.series = pd.Series.dist.from_histogram(self.dist_type, self.histograms)
+
+    def time_pdf(self, rows, edges):
+        self.series.dist.pdf(1000)
+
+    def time_cdf(self, rows, edges):
+        self.series.dist.cdf(1000)
+
+    def time_quantile(self, rows, edges):
+        self.series.dist.quantile(0.5)
+
+    def time_multiple_quantiles(self, rows, edges):
+        self.series.dist.quantile([0.5, 0.9, 0.99])
+
+    def peakmem_multiple_quantiles(self, rows, edges):
+        self.series.dist.quantile([0.5, 0.9, 0.99])
+
+
+class ObjectSeriesStatistics:
+    """Statistical functions of series with Distribution objects."""
+
+    params = [ROWS, EDGES]
+    param_names = ["rows", "edges"]
+
+    def setup(self, rows, edges):
+        if rows > MAX_OBJECT_ROWS:
+            raise NotImplementedError("Too large.")
+        self.dist_type, self.histograms, _ = create_series(rows, edges)
+        series = pd.Series.dist.from_histogram(self.dist_type, self.histograms)
+        self.series = series.astype(object)
+
+    def time_quantile(self, rows, edges):
+        self.series.dist.quantile(0.5)
+
+    def time_sum(self, rows, edges):
+        self.series.dist.sum()
+
+
+class SeriesAggregation:
+    """Merging distributions in series."""
+
+    params = [ROWS, EDGES]
+    param_names = ["rows", "edges"]
+
+    def setup(self, rows, edges):
+        self.dist_type, self.histograms, rng = create_series(rows, edges)
+        self.series = pd.Series.dist.from_histogram(self.dist_type, self.histograms)
+        self.keys = rng.integers(0, GROUPS, rows)
+        self.samples = rng.lognormal(5, 2, rows)
+
+    def time_sum(self, rows, edges):
+        self.series.sum()
+
+    def time_groupby_sum(self, rows, edges):
+        self.series.groupby(self.keys).sum()
+
+    def peakmem_groupby_sum(self, rows, edges):
+        self.series.groupby(self.keys).sum()
+
+    def time_from_grouped_samples(self, rows, edges):
+        pd.Series.dist.from_grouped_samples(self.dist_type, self.keys, self.samples)
@@ -0,0 +1,101 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+from distimate import stats
+
+EDGES = [10, 10 ** 3, 10 ** 4]
+POINTS = [1, 10 ** 3, 10 ** 5]
+ROWS = [10 ** 3, 10 ** 5]
+
+# Row-wise benchmarks with more histogram values are skipped.
+MAX_VALUES = 10 ** 8
+
+
+def create_edges(count):
+    return np.geomspace(1, 10 ** 6, count)
+
+
+class StatsFunctions:
+    """Creating and evaluating PDF, CDF and quantile functions."""
+
+    params = [EDGES, POINTS]
+    param_names = ["edges", "points"]
+
+    def setup(self, edges, points):
+        rng = np.random.default_rng(0)
+        self.edges = create_edges(edges)
+        self.histogram = rng.integers(0, 100, edges + 1).astype(np.float64)
+        self.pdf = stats.PDF(self.edges, self.histogram)
+        self.cdf = stats.CDF(self.edges, self.histogram)
+        self.quantile = stats.Quantile(self.edges, self.histogram)
+        self.values = rng.uniform(0, 10 ** 6, points)
+        self.sorted_values = np.sort(self.values)
+        self.probabilities = rng.random(points)
+
+    def time_pdf_init(self, edges, points):
+        stats.PDF(self.edges, self.histogram)
+
+    def time_cdf_init(self, edges, points):
+        stats.CDF(self.edges, self.histogram)
+
+    def time_quantile_init(self, edges, points):
+        stats.Quantile(self.edges, self.histogram)
+
+    def time_pdf_call(self, edges, points):
+        self.pdf(self.values)
+
+    def time_cdf_call(self, edges, points):
+        self.cdf(self.values)
+
+    def time_cdf_call_sorted(self, edges, points):
+        self.cdf(self.sorted_values)
+
+    def time_quantile_call(self, edges, points):
+        self.quantile(self.probabilities)
+
+    def time_mean(self, edges, points):
+        stats.mean(self.edges, self.histogram)
+
+
+class RowWiseStats:
+    """Evaluating statistical functions of many histograms at once."""
+
+    params = [ROWS, EDGES]
+    param_names = ["rows", "edges"]
+
+    def setup(self, rows, edges):
+        if rows * (edges + 1) > MAX_VALUES:
+            raise NotImplementedError("Too large.")
+        rng = np.random.default_rng(0)
+        self.edges = create_edges(edges)
+        self.histograms = rng.integers(0, 100, (rows, edges + 1)).astype(np.float64)
+        self.values = np.array([10, 1000, 10 ** 5])
+        self.probabilities = np.array([0.5, 0.9, 0.99])
+
+    def time_pdf(self, rows, edges):
+        stats.pdf(self.edges, self.histograms, self.values)
+
+    def time_cdf(self, rows, edges):
+        stats.cdf(self.edges, self.histograms, self.values)
+
+    def time_quantile(self, rows, edges):
+        stats.quantile(self.edges, self.histograms, self.probabilities)
+
+    def peakmem_quantile(self, rows, edges):
+        stats.quantile(self.edges, self.histograms, self.probabilities)
+
+    def time_mean(self, rows, edges):
+        stats.mean(self.edges, self.histograms)
@@ -0,0 +1,226 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compare benchmarks of two Git revisions.
+
+Benchmarks from the current working tree are run against
+Distimate sources of each revision, so both revisions run same benchmarks.
+Each revision is checked out to a temporary Git worktree
+and each benchmark runs in a fresh process.
+
+Benchmarks follow conventions of asv (airspeed velocity):
+``time_*`` methods are timed, ``peakmem_*`` methods report
+peak memory allocated during the call (traced by :mod:`tracemalloc`),
+and ``setup`` raising :class:`NotImplementedError` skips parameters.
+
+Usage::
+
+    python benchmarks/compare.py main
+    python benchmarks/compare.py main HEAD --bench "Merging|Series" --quick
+
+Exits with status 1 if any benchmark is slower by more than a factor.
+"""
+
+import argparse
+import glob
+import importlib
+import inspect
+import itertools
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARKS_DIR)
+
+# Minimal total duration of one timing repeat.
+MIN_REPEAT_TIME = 0.2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare benchmarks of two revisions.")
+    parser.add_argument("base", nargs="?", help="base revision")
+    parser.add_argument("head", nargs="?", default="HEAD", help="compared revision")
+    parser.add_argument("--bench", default="", help="regex filtering benchmarks")
+    parser.add_argument(
+        "--quick", action="store_true", help="run the smallest parameters only"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="timing repeats")
+    parser.add_argument(
+        "--factor", type=float, default=1.1, help="ratio reported as a change"
+    )
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        result = run_benchmark(*json.loads(args.worker), repeat=args.repeat)
+        json.dump(result, sys.stdout)
+        return 0
+    if args.base is None:
+        parser.error("The base revision is required.")
+    benchmarks = list(iter_benchmarks(args.bench, args.quick))
+    if not benchmarks:
+        parser.error("No benchmarks match.")
+    revisions = [args.base, args.head]
+    results = [run_revision(revision, benchmarks, args) for revision in revisions]
+    return report(benchmarks, results[0], results[1], args.factor)
+
+
+def iter_benchmarks(pattern, quick):
+    # Yield names and specs of all parametrized benchmarks.
+    sys.path.insert(0, BENCHMARKS_DIR)
+    paths = sorted(glob.glob(os.path.join(BENCHMARKS_DIR, "bench_*.py")))
+    for path in paths:
+        module_name = os.path.splitext(os.path.basename(path))[0]
+        module = importlib.import_module(module_name)
+        for class_name, cls in sorted(vars(module).items()):
+            if not inspect.isclass(cls) or cls.__module__ != module_name:
+                continue
+            params = _get_params(cls)
+            if quick:
+                params = [values[:1] for values in params]
+            for method_name in sorted(vars(cls)):
+                if not method_name.startswith(("time_", "peakmem_")):
+                    continue
+                for values in itertools.product(*params):
+                    args = ", ".join(repr(value) for value in values)
+                    name = f"{module_name}.{class_name}.{method_name}({args})"
+                    if re.search(pattern, name):
+                        yield name, [module_name, class_name, method_name, values]
+
+
+def _get_params(cls):
+    params = getattr(cls, "params", [])
+    if params and not isinstance(params[0], (list, tuple)):
+        return [params]
+    return params
+
+
+def run_revision(revision, benchmarks, args):
+    # Run benchmarks against sources of a revision, return results by name.
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        worktree = os.path.join(tmp, "worktree")
+        git = ["git", "-C", REPO_DIR, "worktree"]
+        subprocess.run(git + ["add", "--detach", worktree, revision], check=True)
+        try:
+            src = os.path.join(worktree, "src")
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join([src, BENCHMARKS_DIR]))
+            for name, spec in benchmarks:
+                print(f"{revision}: {name}", file=sys.stderr)
+                command = [
+                    sys.executable,
+                    os.path.abspath(__file__),
+                    "--worker",
+                    json.dumps(spec),
+                    "--repeat",
+                    str(args.repeat),
+                ]
+                process = subprocess.run(
+                    command,
+                    env=env,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    universal_newlines=True,
+                )
+                if process.returncode == 0:
+                    results[name] = json.loads(process.stdout)
+                else:
+                    lines = process.stderr.strip().splitlines() or ["failed"]
+                    results[name] = {"error": lines[-1]}
+        finally:
+            subprocess.run(git + ["remove", "--force", worktree], check=True)
+    return results
+
+
+def run_benchmark(module_name, class_name, method_name, values, *, repeat):
+    # Run one benchmark in this process, return its result.
+    import distimate
+
+    src = os.environ["PYTHONPATH"].split(os.pathsep)[0]
+    if not os.path.realpath(distimate.__file__).startswith(os.path.realpath(src)):
+        raise RuntimeError(f"Distimate is imported from {distimate.__file__}.")
+    module = importlib.import_module(module_name)
+    instance = getattr(module, class_name)()
+    setup = getattr(instance, "setup", None)
+    if setup is not None:
+        try:
+            setup(*values)
+        except NotImplementedError:
+            return {"skipped": True}
+    method = getattr(instance, method_name)
+    if method_name.startswith("peakmem_"):
+        tracemalloc.start()
+        method(*values)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {"peakmem": peak}
+    timer = timeit.Timer(lambda: method(*values))
+    number = 1
+    while timer.timeit(number) < MIN_REPEAT_TIME:
+        number *= 10
+    return {"time": min(timer.repeat(repeat, number)) / number}
+
+
+def report(benchmarks, base_results, head_results, factor):
+    # Print a table of results, return 1 if anything is slower.
+    regressions = 0
+    errors = []
+    print(f"{'':2}{'before':>12}{'after':>12}{'ratio':>8}  benchmark")
+    for name, _ in benchmarks:
+        base, head = base_results[name], head_results[name]
+        if "skipped" in base or "skipped" in head:
+            continue
+        kind = "peakmem" if ".peakmem_" in name else "time"
+        for revision, result in ("before", base), ("after", head):
+            if "error" in result:
+                errors.append(f"{name} failed {revision}: {result['error']}")
+        before = _format_result(base, kind)
+        after = _format_result(head, kind)
+        mark, ratio = "", ""
+        if kind in base and kind in head and base[kind] > 0:
+            value = head[kind] / base[kind]
+            ratio = f"{value:.2f}"
+            if value > factor:
+                mark = "+"
+                regressions += 1
+            elif value < 1 / factor:
+                mark = "-"
+        print(f"{mark:2}{before:>12}{after:>12}{ratio:>8}  {name}")
+    for error in errors:
+        print(error, file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def _format_result(result, kind):
+    if "error" in result:
+        return "failed"
+    value = result[kind]
+    if kind == "time":
+        units = [("s", 1), ("ms", 1e-3), ("us", 1e-6), ("ns", 1e-9)]
+    else:
+        units = [("GB", 2 ** 30), ("MB", 2 ** 20), ("kB", 2 ** 10), ("B", 1)]
+    for unit, scale in units:
+        if value >= scale:
+            break
+    return f"{value / scale:.3g}{unit}"
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -39,13 +39,15 @@ setup(
     long_description_content_type="text/markdown",
     packages=find_packages("src"),
     package_dir={"": "src"},
-    python_requires=">=3.6",
+    python_requires=">=3.9",
     install_requires=[
         "numpy",
     ],
     extras_require={
         "dev": ["flake8", "pytest"],
-        "pandas": ["pandas>=1.0.0"],
+        "pandas": ["pandas>=2.1.0"],
+        "arrow": ["pandas>=2.2.2", "pyarrow>=26.0.0"],
+        "numba": ["numba>=0.60.0"],
     },
     classifiers=[
         "Framework :: IPython",
@@ -55,9 +57,10 @@ setup(
         "License :: OSI Approved :: Apache Software License",
         "Programming Language :: Python",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.6",
-        "Programming Language :: Python :: 3.7",
-        "Programming Language :: Python :: 3.8",
+        "Programming Language :: Python :: 3.9",
+        "Programming Language :: Python :: 3.10",
+        "Programming Language :: Python :: 3.11",
+        "Programming Language :: Python :: 3.12",
         "Topic :: Scientific/Engineering",
         "Topic :: Scientific/Engineering :: Information Analysis",
         "Topic :: Scientific/Engineering :: Mathematics",
@@ -12,19 +12,32 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from .arrays import DistributionArray
+from .arrowext import register_to_arrow
 from .distributions import Distribution
 from .pandasext import register_to_pandas
+from .recorders import ShardedRecorder
+from .sparse import SparseDistribution
 from .stats import CDF, PDF, Quantile, mean
+from .store import DistributionStore
 from .types import DistributionType
+from .windows import DecayedDistribution, SlidingWindow
 
 __all__ = [
+    "DecayedDistribution",
     "Distribution",
+    "DistributionArray",
+    "DistributionStore",
     "DistributionType",
     "CDF",
     "PDF",
     "Quantile",
+    "ShardedRecorder",
+    "SparseDistribution",
+    "SlidingWindow",
     "mean",
 ]
 
 
 register_to_pandas()
+register_to_arrow()
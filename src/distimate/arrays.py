@@ -0,0 +1,272 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+from distimate import stats
+from distimate.distributions import (
+    Distribution,
+    _get_type,
+    _intern_edges,
+    _same_edges,
+)
+
+
+class DistributionArray:
+    """
+    Array of distributions sharing the same histogram edges.
+
+    Stores histograms of all distributions in one 2-D array
+    with one row per distribution.
+    Statistical functions are computed for all rows at once.
+
+    :param edges: 1-D array-like, ordered histogram edges
+    :param values: optional 2-D array-like, one histogram per row,
+        each row one item longer than *edges*
+    """
+
+    __slots__ = ("_edges", "_values")
+
+    _dtype = np.float64
+
+    def __init__(self, edges, values=None):
+        self._edges = _intern_edges(edges)
+        size = len(self._edges) + 1
+        if values is None:
+            values = np.zeros((0, size), dtype=self._dtype)
+        else:
+            values = np.asarray(values, dtype=self._dtype)
+            if values.ndim != 2:
+                raise ValueError("Histograms must be 2-D array-like.")
+            if values.shape[1] != size:
+                raise ValueError("Histograms must have len(edges) + 1 columns.")
+            if not np.all(values >= 0):
+                raise ValueError("Histogram values must not be negative.")
+        self._values = values
+
+    def __setstate__(self, state):
+        # Unpickled edges are a private copy, so they are interned again.
+        _, slots = state
+        self._edges = _intern_edges(slots["_edges"])
+        self._values = slots["_values"]
+
+    def __repr__(self):
+        name = type(self).__name__
+        return f"<{name}: size={len(self)}>"
+
+    def __len__(self):
+        return len(self._values)
+
+    def __iter__(self):
+        for values in self._values:
+            yield Distribution(self._edges, values.copy())
+
+    def __getitem__(self, item):
+        """
+        Return a distribution or a subset of distributions.
+
+        Integer returns a :class:`.Distribution` with a copy of the histogram.
+        Slices, integer arrays and boolean masks return
+        a :class:`DistributionArray` (a view for slices, as in NumPy).
+        """
+        if np.ndim(item) == 0 and not isinstance(item, slice):
+            return Distribution(self._edges, self._values[item].copy())
+        return type(self)(self._edges, self._values[item])
+
+    def __add__(self, other):
+        """
+        Combine distributions with other distributions element-wise.
+
+        The other operand can be a :class:`DistributionArray` of same length,
+        or a :class:`.Distribution` that is added to every row.
+        """
+        other_values = self._get_other_values(other)
+        if other_values is None:
+            return NotImplemented
+        return type(self)(self._edges, self._values + other_values)
+
+    def __iadd__(self, other):
+        """Combine distributions with other distributions element-wise inplace."""
+        other_values = self._get_other_values(other)
+        if other_values is None:
+            return NotImplemented
+        self._values += other_values
+        return self
+
+    @property
+    def edges(self):
+        """
+        Edges of the underlying histograms
+
+        :return: :class: 1-D `numpy.array`, ordered histogram edges
+        """
+        return self._edges
+
+    @property
+    def values(self):
+        """
+        Values of the underlying histograms.
+
+        :return: 2-D `numpy.array`, one histogram per row
+        """
+        return self._values
+
+    @classmethod
+    def from_histogram(cls, edges, histograms):
+        """
+        Create distributions from histograms.
+
+        :param edges: 1-D array-like, ordered histogram edges
+        :param histograms: 2-D array-like, one histogram per row
+        :return: a new :class:`DistributionArray`
+        """
+        return cls(edges, histograms)
+
+    @classmethod
+    def from_cumulative(cls, edges, cumulatives):
+        """
+        Create distributions from cumulative histograms.
+
+        :param edges: 1-D array-like, ordered histogram edges
+        :param cumulatives: 2-D array-like, one cumulative histogram per row
+        :return: a new :class:`DistributionArray`
+        """
+        values = np.diff(cumulatives, axis=1, prepend=0)
+        return cls(edges, values)
+
+    @classmethod
+    def from_distributions(cls, edges, dists):
+        """
+        Create distributions by stacking :class:`.Distribution` instances.
+
+        :param edges: 1-D array-like, ordered histogram edges
+        :param dists: iterable of :class:`.Distribution` instances
+        :return: a new :class:`DistributionArray`
+        """
+        edges = _intern_edges(edges)
+        rows = []
+        for dist in dists:
+            if not _same_edges(dist.edges, edges):
+                raise ValueError("Distributions have different edges.")
+            rows.append(dist.values)
+        if not rows:
+            return cls(edges)
+        return cls(edges, np.stack(rows))
+
+    def to_histogram(self):
+        """
+        Return histograms of these distributions as a NumPy array.
+
+        :return: 2-D :class:`numpy.array`
+        """
+        return self._values.copy()
+
+    def to_cumulative(self):
+        """
+        Return cumulative histograms of these distributions as a NumPy array.
+
+        :return: 2-D :class:`numpy.array`
+        """
+        return np.cumsum(self._values, axis=1)
+
+    def rebin(self, target_type):
+        """
+        Convert these distributions to other histogram edges.
+
+        All histograms are translated at once.
+        See :meth:`.Distribution.rebin` for details.
+
+        :param target_type: :class:`.DistributionType` or
+            1-D array-like with histogram edges
+        :return: a new :class:`DistributionArray`
+        """
+        target_type = _get_type(target_type)
+        values = _get_type(self._edges)._rebin(self._values, target_type)
+        return type(self)(target_type.edges, values)
+
+    def sum(self):
+        """
+        Merge all distributions to one.
+
+        :return: a new :class:`.Distribution`
+        """
+        return Distribution(self._edges, self._values.sum(axis=0))
+
+    @property
+    def weight(self):
+        """
+        Return a total weight of samples in each distribution.
+
+        :return: 1-D :class:`numpy.array`
+        """
+        return self._values.sum(axis=1)
+
+    @property
+    def mean(self):
+        """
+        Estimate mean of each distribution.
+
+        See :func:`.mean` for details.
+
+        :return: 1-D :class:`numpy.array`
+        """
+        return stats.mean(self._edges, self._values)
+
+    def pdf(self, v):
+        """
+        Compute PDF of each distribution.
+
+        See :class:`.PDF` for details.
+
+        :param v: scalar value or 1-D array-like
+        :return: :class:`numpy.array` with one row per distribution
+        """
+        return stats.pdf(self._edges, self._values, v)
+
+    def cdf(self, v):
+        """
+        Compute CDF of each distribution.
+
+        See :class:`.CDF` for details.
+
+        :param v: scalar value or 1-D array-like
+        :return: :class:`numpy.array` with one row per distribution
+        """
+        return stats.cdf(self._edges, self._values, v)
+
+    def quantile(self, q):
+        """
+        Compute quantile function of each distribution.
+
+        See :class:`.Quantile` for details.
+
+        :param q: scalar value or 1-D array-like
+        :return: :class:`numpy.array` with one row per distribution
+        """
+        return stats.quantile(self._edges, self._values, q)
+
+    def _get_other_values(self, other):
+        if isinstance(other, DistributionArray):
+            self._check_compatibility(other)
+            if len(other) != len(self):
+                raise ValueError("Distribution arrays have different lengths.")
+            return other._values
+        if isinstance(other, Distribution):
+            self._check_compatibility(other)
+            return other.values
+        return None
+
+    def _check_compatibility(self, other):
+        if not _same_edges(other.edges, self._edges):
+            raise ValueError("Distributions have different edges.")
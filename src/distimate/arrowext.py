@@ -0,0 +1,179 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import numpy as np
+
+from distimate.distributions import _get_type
+
+try:
+    import pyarrow as pa
+    from pyarrow import ExtensionType
+except ImportError:
+    pa = None
+    ExtensionType = object
+
+
+_EXTENSION_NAME = "distimate.distribution"
+
+
+class DistributionArrowType(ExtensionType):
+    """
+    Apache Arrow extension type for columns of distributions.
+
+    Histograms are stored as fixed-size lists with one item per bucket,
+    so a column is converted to and from NumPy without per-row work.
+    Histogram edges are stored in extension metadata of the field,
+    so distribution types are restored when tables are read,
+    including tables stored in Parquet files.
+
+    Pandas series with :class:`.DistributionDtype` are converted
+    to this type by :func:`pyarrow.array` or :meth:`pyarrow.Table.from_pandas`,
+    and back by :meth:`pyarrow.Table.to_pandas`.
+
+    :param dist_type: :class:`.DistributionType` or
+        1-D array-like with histogram edges
+    :param value_type: optional Arrow type of histogram values,
+        defaults to the type matching :attr:`.DistributionType.dtype`,
+        for example, ``float64`` or ``int64``
+    """
+
+    def __init__(self, dist_type, value_type=None):
+        if pa is None:
+            raise ImportError("Arrow integration requires pyarrow.")
+        dist_type = _get_type(dist_type)
+        if value_type is None:
+            value_type = pa.from_numpy_dtype(dist_type.dtype)
+        self._dist_type = dist_type
+        storage_type = pa.list_(value_type, len(dist_type.edges) + 1)
+        super().__init__(storage_type, _EXTENSION_NAME)
+
+    def __reduce__(self):
+        return type(self), (self._dist_type.edges, self.value_type)
+
+    def __arrow_ext_serialize__(self):
+        return json.dumps({"edges": self._dist_type.edges.tolist()}).encode()
+
+    @classmethod
+    def __arrow_ext_deserialize__(cls, storage_type, serialized):
+        edges = json.loads(serialized.decode())["edges"]
+        value_type = storage_type.value_type
+        dtype = np.dtype(value_type.to_pandas_dtype())
+        return cls(_get_type(edges).with_dtype(dtype), value_type)
+
+    @property
+    def dist_type(self):
+        """
+        Distribution type of the distributions.
+
+        :return: :class:`.DistributionType`
+        """
+        return self._dist_type
+
+    @property
+    def edges(self):
+        """
+        Edges of the histograms.
+
+        :return: 1-D :class:`numpy.array`, ordered histogram edges
+        """
+        return self._dist_type.edges
+
+    @property
+    def value_type(self):
+        """
+        Arrow type of histogram values.
+
+        :return: :class:`pyarrow.DataType`
+        """
+        return self.storage_type.value_type
+
+    def to_pandas_dtype(self):
+        # Imported here because distimate.pandasext imports this module.
+        from distimate.pandasext import DistributionDtype
+
+        return DistributionDtype(self._dist_type)
+
+
+def to_arrow(arrow_type, values, mask):
+    """
+    Convert histograms to an Arrow extension array.
+
+    Float64 histograms without missing values are not copied.
+
+    :param arrow_type: :class:`DistributionArrowType`
+    :param values: 2-D array, one histogram per row
+    :param mask: 1-D boolean array, true for missing values
+    :return: :class:`pyarrow.ExtensionArray`
+    """
+    dtype = np.dtype(arrow_type.value_type.to_pandas_dtype())
+    values = np.ascontiguousarray(values)
+    if values.dtype != dtype:
+        if dtype.kind != "f" and not np.array_equal(values, np.trunc(values)):
+            raise ValueError("Histogram values must be integers.")
+        values = values.astype(dtype)
+    children = pa.array(values.ravel(), type=arrow_type.value_type)
+    validity = None
+    null_count = int(np.count_nonzero(mask))
+    if null_count:
+        validity = pa.array(~np.asarray(mask, dtype=bool)).buffers()[1]
+    storage = pa.FixedSizeListArray.from_buffers(
+        arrow_type.storage_type,
+        len(values),
+        [validity],
+        null_count=null_count,
+        children=[children],
+    )
+    return pa.ExtensionArray.from_storage(arrow_type, storage)
+
+
+def from_arrow(array):
+    """
+    Convert an Arrow array of distributions to histograms.
+
+    Chunks of a :class:`pyarrow.ChunkedArray` are concatenated.
+
+    :param array: :class:`pyarrow.Array` or :class:`pyarrow.ChunkedArray`
+        with :class:`DistributionArrowType` or fixed-size list storage
+    :return: tuple of 2-D :class:`numpy.array` with one histogram
+        per row (zeros for missing values) and a 1-D boolean mask
+    """
+    chunks = array.chunks if isinstance(array, pa.ChunkedArray) else [array]
+    size = getattr(array.type, "storage_type", array.type).list_size
+    values = []
+    masks = []
+    for chunk in chunks:
+        storage = getattr(chunk, "storage", chunk)
+        # Children of a sliced array start at the offset of the slice.
+        children = storage.values.slice(storage.offset * size, len(storage) * size)
+        chunk_values = children.to_numpy(zero_copy_only=False).reshape(-1, size)
+        chunk_mask = storage.is_null().to_numpy(zero_copy_only=False)
+        values.append(chunk_values)
+        masks.append(chunk_mask)
+    if not values:
+        return np.zeros((0, size)), np.zeros(0, dtype=bool)
+    values = np.concatenate(values)
+    mask = np.concatenate(masks)
+    values[mask] = 0
+    return values, mask
+
+
+def register_to_arrow():
+    if pa is None:
+        return  # Arrow is not installed
+    try:
+        pa.register_extension_type(DistributionArrowType([0]))
+    except pa.ArrowKeyError:
+        pass  # Already registered
@@ -0,0 +1,247 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+# Each metric is split to two steps. Histograms are prepared once per row,
+# for example, normalized to probabilities, and prepared rows are compared.
+# Prepared arrays have histograms on the last axis, so comparing broadcasts
+# them in both paired and pairwise modes.
+
+# Pairwise distances are computed in chunks of rows, so that
+# temporary arrays have at most this number of elements.
+_CHUNK_ELEMENTS = 2 ** 20
+
+
+def _probabilities(edges, hist):
+    # Normalize histograms, histograms without samples become NaN.
+    edges = np.asarray(edges)
+    hist = np.asarray(hist, dtype=np.float64)
+    if hist.ndim not in (1, 2):
+        raise ValueError("Histograms must be 1-D or 2-D array-like.")
+    if hist.shape[-1] != len(edges) + 1:
+        raise ValueError("Histogram must have len(edges) + 1 items.")
+    total = hist.sum(axis=-1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return hist / total
+
+
+def _prepare_cumulative(edges, hist):
+    # CDF values at edges, the last bucket is above the last edge.
+    return (np.cumsum(_probabilities(edges, hist), axis=-1)[..., :-1],)
+
+
+def _compare_ks(edges, a, b):
+    # Interpolated CDFs are linear between edges,
+    # so their largest difference is at one of edges.
+    return np.max(np.abs(a[0] - b[0]), axis=-1)
+
+
+def _compare_wasserstein(edges, a, b):
+    # Integrate absolute difference of CDFs, which is linear between edges.
+    # If the difference changes its sign inside a bucket,
+    # the area is split to two triangles.
+    diff = a[0] - b[0]
+    start = diff[..., :-1]
+    end = diff[..., 1:]
+    low = np.abs(start)
+    high = np.abs(end)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        area = np.where(
+            start * end >= 0,
+            (low + high) / 2,
+            (low ** 2 + high ** 2) / (2 * (low + high)),
+        )
+    return np.sum(area * np.diff(edges), axis=-1)
+
+
+def _entropy(p):
+    # Entropy in bits, NaN rows stay NaN.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = np.where(p == 0, 0, p * np.log2(p))
+    return -np.sum(terms, axis=-1)
+
+
+def _prepare_jensen_shannon(edges, hist):
+    p = _probabilities(edges, hist)
+    return p, _entropy(p)
+
+
+def _compare_jensen_shannon(edges, a, b):
+    # Entropy of the mixture minus mean entropy of the distributions.
+    # Rounding can make the difference slightly negative.
+    result = _entropy((a[0] + b[0]) / 2) - (a[1] + b[1]) / 2
+    return np.maximum(result, 0)
+
+
+def _prepare_hellinger(edges, hist):
+    return (np.sqrt(_probabilities(edges, hist)),)
+
+
+def _compare_hellinger(edges, a, b):
+    return np.sqrt(np.sum((a[0] - b[0]) ** 2, axis=-1) / 2)
+
+
+_METRICS = {
+    "kolmogorov_smirnov": (_prepare_cumulative, _compare_ks),
+    "wasserstein": (_prepare_cumulative, _compare_wasserstein),
+    "jensen_shannon": (_prepare_jensen_shannon, _compare_jensen_shannon),
+    "hellinger": (_prepare_hellinger, _compare_hellinger),
+}
+
+
+def _paired(metric, edges, hist1, hist2):
+    prepare, compare = _METRICS[metric]
+    edges = np.asarray(edges, dtype=np.float64)
+    return compare(edges, prepare(edges, hist1), prepare(edges, hist2))[()]
+
+
+def kolmogorov_smirnov(edges, hist1, hist2):
+    """
+    Compute Kolmogorov–Smirnov statistic of histograms.
+
+    The statistic is the largest absolute difference of CDFs,
+    between 0 and 1 (inclusive).
+    CDFs are interpolated as by :class:`.CDF`, so the largest difference
+    is at one of edges.
+    Samples above the last edge are assumed to be just above it.
+
+    Histograms are paired row by row. A 1-D histogram is compared
+    with each row of a 2-D array. Histograms without samples give NaN.
+    See :func:`pairwise` for distances of all pairs.
+
+    :param edges: 1-D array-like, ordered histogram edges
+    :param hist1: 1-D array-like, one item longer than edges,
+        or 2-D array-like with one histogram per row
+    :param hist2: 1-D or 2-D array-like like *hist1*
+    :return: float number or 1-D :class:`numpy.array`
+    """
+    return _paired("kolmogorov_smirnov", edges, hist1, hist2)
+
+
+def wasserstein(edges, hist1, hist2):
+    """
+    Compute 1-Wasserstein distance of histograms.
+
+    Also known as the earth mover's distance. It is an area between CDFs,
+    in units of edges, so it accounts for how far samples moved.
+    Samples are assumed to be evenly distributed in inner buckets,
+    samples below the first edge are assumed to be at the first edge
+    and samples above the last edge just above it.
+
+    Histograms are paired row by row. A 1-D histogram is compared
+    with each row of a 2-D array. Histograms without samples give NaN.
+    See :func:`pairwise` for distances of all pairs.
+
+    :param edges: 1-D array-like, ordered histogram edges
+    :param hist1: 1-D array-like, one item longer than edges,
+        or 2-D array-like with one histogram per row
+    :param hist2: 1-D or 2-D array-like like *hist1*
+    :return: float number or 1-D :class:`numpy.array`
+    """
+    return _paired("wasserstein", edges, hist1, hist2)
+
+
+def jensen_shannon(edges, hist1, hist2):
+    """
+    Compute Jensen–Shannon divergence of histograms.
+
+    Compares probabilities of buckets regardless of their positions.
+    The divergence is in bits, between 0 and 1 (inclusive).
+    Its square root is a metric.
+
+    Histograms are paired row by row. A 1-D histogram is compared
+    with each row of a 2-D array. Histograms without samples give NaN.
+    See :func:`pairwise` for distances of all pairs.
+
+    :param edges: 1-D array-like, ordered histogram edges
+    :param hist1: 1-D array-like, one item longer than edges,
+        or 2-D array-like with one histogram per row
+    :param hist2: 1-D or 2-D array-like like *hist1*
+    :return: float number or 1-D :class:`numpy.array`
+    """
+    return _paired("jensen_shannon", edges, hist1, hist2)
+
+
+def hellinger(edges, hist1, hist2):
+    """
+    Compute Hellinger distance of histograms.
+
+    Compares probabilities of buckets regardless of their positions.
+    The distance is between 0 and 1 (inclusive).
+
+    Histograms are paired row by row. A 1-D histogram is compared
+    with each row of a 2-D array. Histograms without samples give NaN.
+    See :func:`pairwise` for distances of all pairs.
+
+    :param edges: 1-D array-like, ordered histogram edges
+    :param hist1: 1-D array-like, one item longer than edges,
+        or 2-D array-like with one histogram per row
+    :param hist2: 1-D or 2-D array-like like *hist1*
+    :return: float number or 1-D :class:`numpy.array`
+    """
+    return _paired("hellinger", edges, hist1, hist2)
+
+
+def pairwise(metric, edges, hist1, hist2=None, *, chunk_size=None, out=None):
+    """
+    Compute a matrix of distances between all pairs of histograms.
+
+    Histograms are prepared once per row, then distances are computed
+    in chunks of rows, so temporary arrays have limited size.
+    The result can be written to a preallocated array,
+    for example, to :class:`numpy.memmap` if it does not fit to memory.
+
+    Without *hist2*, distances between rows of *hist1* are computed.
+    Because all metrics are symmetric, only a half of them is computed.
+
+    :param metric: name of a metric, one of ``"kolmogorov_smirnov"``,
+        ``"wasserstein"``, ``"jensen_shannon"`` and ``"hellinger"``,
+        see the functions with same names
+    :param edges: 1-D array-like, ordered histogram edges
+    :param hist1: 2-D array-like with one histogram per row
+    :param hist2: optional 2-D array-like with one histogram per row
+    :param chunk_size: optional number of *hist1* rows compared at once
+    :param out: optional float array for results,
+        with shape ``(len(hist1), len(hist2))``
+    :return: 2-D :class:`numpy.array` with shape ``(len(hist1), len(hist2))``
+    """
+    if metric not in _METRICS:
+        raise ValueError(f"Unknown metric: {metric!r}")
+    prepare, compare = _METRICS[metric]
+    edges = np.asarray(edges, dtype=np.float64)
+    if np.ndim(hist1) != 2 or (hist2 is not None and np.ndim(hist2) != 2):
+        raise ValueError("Histograms must be 2-D array-like.")
+    symmetric = hist2 is None
+    prepared1 = prepare(edges, hist1)
+    prepared2 = prepared1 if symmetric else prepare(edges, hist2)
+    rows = len(prepared1[0])
+    columns = len(prepared2[0])
+    if out is None:
+        out = np.empty((rows, columns))
+    elif out.shape != (rows, columns):
+        raise ValueError("Output must have shape (len(hist1), len(hist2)).")
+    if chunk_size is None:
+        chunk_size = max(1, _CHUNK_ELEMENTS // max(1, columns * (len(edges) + 1)))
+    for start in range(0, rows, chunk_size):
+        stop = min(start + chunk_size, rows)
+        # Compared columns start at the diagonal in the symmetric case.
+        offset = start if symmetric else 0
+        a = tuple(array[start:stop, np.newaxis] for array in prepared1)
+        b = tuple(array[np.newaxis, offset:] for array in prepared2)
+        block = compare(edges, a, b)
+        out[start:stop, offset:] = block
+        if symmetric:
+            out[offset:, start:stop] = block.T
+    return out
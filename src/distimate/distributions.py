@@ -12,10 +12,273 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
+import itertools
+import weakref
+
 import numpy as np
 
+from distimate import kernels, serialization
 from distimate.stats import CDF, PDF, Quantile, mean
 
+_INT64_MAX = np.iinfo(np.int64).max
+
+# Canonical edges by content hash and by identity, see _intern_edges().
+_interned_edges = weakref.WeakValueDictionary()
+_interned_ids = weakref.WeakValueDictionary()
+
+# Distribution types created from plain edges, by identity of interned edges.
+_interned_types = weakref.WeakValueDictionary()
+
+
+def _is_integral(values):
+    return np.array_equal(values, np.trunc(values))
+
+
+def _is_counter(values):
+    # Integer histograms are checked for overflows and fractional weights.
+    return values.dtype.kind in "iu"
+
+
+def _max_exact_integer(dtype):
+    # Float numbers represent all integers up to this value exactly.
+    return 2 ** (np.finfo(dtype).nmant + 1)
+
+
+def _to_counters(values, dtype):
+    """
+    Convert histogram values to an integer dtype.
+
+    Raises :class:`ValueError` for fractional values and
+    :class:`OverflowError` for values that do not fit to the dtype.
+    """
+    values = np.asarray(values)
+    limit = np.iinfo(dtype).max
+    if values.dtype.kind == "f":
+        if not (np.all(np.isfinite(values)) and _is_integral(values)):
+            raise ValueError("Histogram values must be integers.")
+        # Float conversion of the limit can round up.
+        too_large = values >= float(limit) + 1
+    else:
+        too_large = values > limit
+    if np.any(too_large):
+        raise OverflowError(f"Histogram values overflow {np.dtype(dtype)}.")
+    return values.astype(dtype, copy=False)
+
+
+def _as_integer_array(values):
+    """Convert array-like to an array, keeping large Python integers exact."""
+    array = np.asarray(values)
+    if array.dtype.kind == "f" and not isinstance(values, np.ndarray):
+        # NumPy converts lists with integers above int64 range to float64.
+        items = list(values)
+        integral = all(isinstance(item, (int, np.integer)) for item in items)
+        if items and integral and min(items) >= 0:
+            return np.array(items, dtype=np.uint64)
+    return array
+
+
+def _to_integer_weights(weights):
+    """Convert weights to non-negative int64 integers for integer histograms."""
+    weights = np.asarray(weights)
+    if weights.dtype.kind not in "biu":
+        if not (np.all(np.isfinite(weights)) and _is_integral(weights)):
+            raise ValueError("Weights of integer histograms must be integers.")
+    if np.any(weights < 0):
+        raise ValueError("Weights of integer histograms must not be negative.")
+    return _to_counters(weights, np.int64)
+
+
+def _check_overflow(values, increments):
+    """Raise :class:`OverflowError` if integer values cannot be incremented."""
+    if _is_counter(values):
+        if np.any(increments > np.iinfo(values.dtype).max - values):
+            raise OverflowError(f"Histogram values overflow {values.dtype}.")
+
+
+def _promote_dtypes(dtype, other):
+    """
+    Return a dtype that can hold sums of histograms with given dtypes.
+
+    Same as :func:`numpy.promote_types`, but counters stay integers.
+    NumPy promotes uint64 and signed integers to float64,
+    but counters are never negative, so uint64 holds both exactly.
+    """
+    result = np.promote_types(dtype, other)
+    if np.dtype(dtype).kind in "iu" and np.dtype(other).kind in "iu":
+        if result.kind == "f":
+            return np.dtype(np.uint64)
+    return result
+
+
+def _add_histogram(values, other):
+    """Add other histogram to values inplace, keeping dtype of values."""
+    if _is_counter(values):
+        other = _to_counters(other, values.dtype)
+        _check_overflow(values, other)
+    values += other
+
+
+def _merge_histograms(dist_type, dists, pairwise=False):
+    """
+    Sum histograms of distributions to a new array with dtype of dist_type.
+
+    Histograms are added to preallocated buffers inplace.
+    Pairwise summation keeps a stack of partial sums like a binary counter,
+    partial sum at level k holds a sum of 2**k histograms,
+    so it needs only a logarithmic number of buffers.
+    """
+    edges = dist_type.edges
+    size = len(edges) + 1
+    if not pairwise:
+        values = np.zeros(size, dtype=dist_type.dtype)
+        for dist in dists:
+            if not _same_edges(dist.edges, edges):
+                raise ValueError("Distributions have different edges.")
+            _add_histogram(values, dist.values)
+        return values
+    stack = []
+    free = []
+    for dist in dists:
+        if not _same_edges(dist.edges, edges):
+            raise ValueError("Distributions have different edges.")
+        values = free.pop() if free else np.empty(size, dtype=dist_type.dtype)
+        values.fill(0)
+        _add_histogram(values, dist.values)
+        level = 0
+        while stack and stack[-1][0] == level:
+            _, partial = stack.pop()
+            _add_histogram(partial, values)
+            free.append(values)
+            values = partial
+            level += 1
+        stack.append((level, values))
+    if not stack:
+        return np.zeros(size, dtype=dist_type.dtype)
+    _, values = stack.pop()
+    while stack:
+        _, partial = stack.pop()
+        _add_histogram(partial, values)
+        values = partial
+    return values
+
+
+def _count(size, index, weights):
+    # Sum non-negative integer weights per bucket exactly as int64.
+    counts = np.bincount(index, minlength=size)
+    if weights is None:
+        return counts
+    weights = _to_integer_weights(weights)
+    if weights.ndim == 0:
+        if weights and np.max(counts, initial=0) > _INT64_MAX // weights:
+            raise OverflowError("Histogram values overflow int64.")
+        return counts * weights
+    # Floats are only an estimate, exact sum is checked close to the limit.
+    total = weights.sum(dtype=np.float64)
+    if total > 2 ** 62 and sum(int(w) for w in weights) > _INT64_MAX:
+        raise OverflowError("Histogram values overflow int64.")
+    increments = np.zeros(size, dtype=np.int64)
+    np.add.at(increments, index, weights)
+    return increments
+
+
+def _accumulate(values, index, weights=None):
+    """
+    Add weights to histogram values at given indexes.
+
+    Gives same results as ``np.add.at(values, index, weights)``,
+    but chooses a faster kernel when it does not change the results:
+
+    - :func:`numpy.bincount` can count samples if all sums are integers
+      that floats represent exactly, so the order of additions does not matter.
+    - :func:`numpy.bincount` can sum weights into an empty float64 histogram,
+      because it sums weights in the same order as :func:`numpy.add.at`.
+      Other float types would differ, because the bincount sums in float64.
+    - Otherwise, scalar weights are expanded to an array, because
+      :func:`numpy.add.at` is much slower with a scalar operand.
+
+    Integer histograms are summed exactly, weights must be
+    non-negative integers and overflows raise :class:`OverflowError`.
+
+    :param values: 1-D array, histogram values updated inplace
+    :param index: 1-D array of bucket indexes
+    :param weights: optional scalar or 1-D array-like with same length as index
+    """
+    size = len(values)
+    if _is_counter(values):
+        increments = _count(size, index, weights)
+        _check_overflow(values, increments)
+        values += increments.astype(values.dtype)
+        return
+    if weights is None:
+        weights = 1
+    # The bincount allocates an array for all buckets,
+    # so it does not pay off for few samples in many buckets.
+    large = len(index) >= size
+    if np.ndim(weights) == 0:
+        exact = (
+            large
+            and _is_integral(weights)
+            and _is_integral(values)
+            and np.max(values, initial=0) + len(index) * abs(weights)
+            < _max_exact_integer(values.dtype)
+        )
+        if exact:
+            values += np.bincount(index, minlength=size) * weights
+            return
+        weights = np.full(len(index), weights, dtype=values.dtype)
+    elif large and values.dtype == np.float64 and not values.any():
+        values += np.bincount(index, weights, minlength=size)
+        return
+    np.add.at(values, index, weights)
+
+
+def _intern_edges(edges):
+    """
+    Return a canonical read-only array equal to edges.
+
+    Equal edges are represented by one array while any distribution uses it,
+    so compatibility of distributions is usually checked by identity.
+    """
+    if _interned_ids.get(id(edges)) is edges:
+        return edges
+    edges = np.asarray(edges)
+    data = np.ascontiguousarray(edges).tobytes()
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    key = (edges.dtype.str, edges.shape, digest)
+    interned = _interned_edges.get(key)
+    if interned is None:
+        interned = edges.copy()
+        interned.flags.writeable = False
+        _interned_edges[key] = interned
+        _interned_ids[id(interned)] = interned
+    return interned
+
+
+def _same_edges(edges, other_edges):
+    """Return whether edges are equal, comparing interned edges by identity."""
+    return edges is other_edges or np.array_equal(edges, other_edges)
+
+
+def _get_type(edges):
+    """
+    Return a distribution type for edges or a distribution type.
+
+    Equal edges give the same type while it is in use.
+    """
+    # Imported here because distimate.types imports this module.
+    from distimate.types import DistributionType
+
+    if isinstance(edges, DistributionType):
+        return edges
+    edges = _intern_edges(edges)
+    # Interned edges are alive while their type is, so their ID is unique.
+    dist_type = _interned_types.get(id(edges))
+    if dist_type is None:
+        dist_type = DistributionType(edges)
+        _interned_types[id(edges)] = dist_type
+    return dist_type
+
 
 class Distribution:
     """
@@ -25,28 +288,63 @@ class Distribution:
     Supports distribution merging and comparison.
     Implements approximation of common statistical functions.
 
-    :param edges: 1-D array-like, ordered histogram edges
+    Statistical functions and the cumulative histogram are cached
+    until the distribution is modified by :meth:`add`, :meth:`update`
+    or the ``+=`` operator.
+
+    Histogram values are stored as :attr:`.DistributionType.dtype`.
+    Sum of distributions with different dtypes is promoted
+    to a dtype that can hold both (as :func:`numpy.promote_types`,
+    except that sums of integer counters stay integers),
+    the ``+=`` operator keeps dtype of the left operand.
+
+    :param edges: 1-D array-like, ordered histogram edges,
+        or a :class:`.DistributionType`
     :param values: 1-D array-like, histogram, one item longer than *edges*
     """
 
-    __slots__ = ("_edges", "_values")
+    __slots__ = ("_type", "_values", "_cache")
 
     _dtype = np.float64
 
     def __init__(self, edges, values=None):
-        self._edges = np.asarray(edges)
-        size = len(self._edges) + 1
+        self._type = _get_type(edges)
+        size = len(self._type.edges) + 1
+        dtype = self._type.dtype
         if values is None:
-            values = np.zeros(size, dtype=self._dtype)
+            values = np.zeros(size, dtype=dtype)
         else:
-            values = np.asarray(values, dtype=self._dtype)
+            if dtype.kind == "f":
+                values = np.asarray(values, dtype=dtype)
+            else:
+                values = _as_integer_array(values)
             if values.ndim != 1:
                 raise ValueError("Histogram must be 1-D array-like.")
             if len(values) != size:
                 raise ValueError("Histogram must have len(edges) + 1 items.")
             if not np.all(values >= 0):
                 raise ValueError("Histogram values must not be negative.")
+            if dtype.kind != "f":
+                values = _to_counters(values, dtype)
         self._values = values
+        self._cache = None
+
+    @classmethod
+    def _create(cls, dist_type, values):
+        # Create a distribution from valid histogram values without checks.
+        dist = cls.__new__(cls)
+        dist._type = dist_type
+        dist._values = values
+        dist._cache = None
+        return dist
+
+    def __getstate__(self):
+        # Cached functions are rebuilt after unpickling, so they are not pickled.
+        return self._type, self._values
+
+    def __setstate__(self, state):
+        self._type, self._values = state
+        self._cache = None
 
     def __repr__(self):
         name = type(self).__name__
@@ -62,16 +360,25 @@ class Distribution:
     def __add__(self, other):
         """Combine this distribution with other distribution."""
         if isinstance(other, Distribution):
+            if (
+                self._type.edges is other._type.edges
+                and self._values.dtype == other._values.dtype == np.float64
+            ):
+                # Sums of float64 histograms need no promotion or checks.
+                return Distribution._create(self._type, self._values + other._values)
             self._check_compatibility(other)
-            values = self._values + other._values
-            return Distribution(self.edges, values)
+            dtype = _promote_dtypes(self._values.dtype, other._values.dtype)
+            values = self._values.astype(dtype)
+            _add_histogram(values, other._values)
+            return Distribution(self._type.with_dtype(dtype), values)
         return NotImplemented
 
     def __iadd__(self, other):
         """Combine this distribution with other distribution inplace."""
         if isinstance(other, Distribution):
             self._check_compatibility(other)
-            self._values += other._values
+            _add_histogram(self._values, other._values)
+            self._cache = None
             return self
         return NotImplemented
 
@@ -82,13 +389,16 @@ class Distribution:
 
         :return: :class: 1-D `numpy.array`, ordered histogram edges
         """
-        return self._edges
+        return self._type.edges
 
     @property
     def values(self):
         """
         Values of the underlying histogram.
 
+        The array should not be modified inplace, because modifications
+        are not reflected by cached statistical functions.
+
         :return: 1-D `numpy.array`, histogram values
         """
         return self._values
@@ -131,6 +441,62 @@ class Distribution:
         values = np.diff(cumulative, prepend=0)
         return cls(edges, values)
 
+    @classmethod
+    def merge_all(cls, dists, *, pairwise=False):
+        """
+        Merge many distributions to a new one.
+
+        Gives same result as ``sum(dists, Distribution(edges))``,
+        but histograms are added to one preallocated buffer inplace,
+        instead of allocating a new distribution for each addition.
+        Distributions can be streamed from a generator.
+        As with the ``+=`` operator, the result keeps dtype
+        of the first distribution.
+
+        Float histograms are summed one by one by default.
+        With *pairwise* summation, partial sums are merged in a balanced tree,
+        so rounding errors grow with a logarithm of the number of distributions.
+
+        :param dists: non-empty iterable of distributions with same edges
+        :param pairwise: whether to use pairwise summation
+        :return: a new :class:`Distribution`
+        """
+        iterator = iter(dists)
+        first = next(iterator, None)
+        if first is None:
+            raise ValueError("Cannot infer distribution edges.")
+        dists = itertools.chain([first], iterator)
+        return cls(first._type, _merge_histograms(first._type, dists, pairwise))
+
+    @classmethod
+    def from_bytes(cls, edges, data):
+        """
+        Create a distribution from bytes returned by :meth:`to_bytes`.
+
+        Dense histograms are not copied, they share memory with *data*.
+        If *data* is immutable (for example, :class:`bytes`),
+        the histogram cannot be modified inplace.
+
+        :param edges: 1-D array-like, ordered histogram edges,
+            or a :class:`.DistributionType`
+        :param data: bytes-like object
+        :return: a new :class:`Distribution`
+        """
+        dist_type = _get_type(edges)
+        return cls(dist_type, serialization.decode(data, dist_type.fingerprint))
+
+    def to_bytes(self):
+        """
+        Serialize this distribution to bytes.
+
+        The data contain a fingerprint of histogram edges, not edges themselves.
+        Histogram is stored as dense or sparse, whichever is shorter.
+        Sparse histograms with integer values are encoded as varints.
+
+        :return: :class:`bytes`
+        """
+        return serialization.encode(self._values, self._type.fingerprint)
+
     def to_histogram(self):
         """
         Return a histogram of this distribution as a NumPy array.
@@ -145,7 +511,31 @@ class Distribution:
 
         :return: 1-D :class:`numpy.array`
         """
-        return np.cumsum(self._values)
+        if self._values.dtype != np.float64:
+            return np.cumsum(self._values)
+        return self._get_cumulative().copy()
+
+    def rebin(self, target_type):
+        """
+        Convert this distribution to other histogram edges.
+
+        Each bucket is split to target buckets proportionally to their overlap,
+        assuming that samples are spread uniformly within the bucket.
+        Samples below the first edge are assumed to be at the first edge,
+        samples above the last edge are assumed to be just above it.
+        If target edges are a subset of these edges, each bucket falls
+        to one target bucket, so the histogram is translated exactly.
+        Integer target types accept only exactly translated histograms.
+
+        The translation is computed once for each pair of distribution types.
+
+        :param target_type: :class:`.DistributionType` or
+            1-D array-like with histogram edges
+        :return: a new :class:`Distribution`
+        """
+        target_type = _get_type(target_type)
+        values = self._type._rebin(self._values, target_type)
+        return type(self)(target_type, values)
 
     def add(self, value, weight=None):
         """
@@ -158,8 +548,12 @@ class Distribution:
             raise ValueError("Value must be a scalar.")
         if weight is None:
             weight = 1
-        index = self._edges.searchsorted(value)
+        index = self._type.bin_index(value)
+        if _is_counter(self._values):
+            weight = _to_integer_weights(weight)
+            _check_overflow(self._values[index], weight)
         self._values[index] += weight
+        self._cache = None
 
     def update(self, values, weights=None):
         """
@@ -172,12 +566,18 @@ class Distribution:
         values = np.asarray(values)
         if values.ndim != 1:
             raise ValueError("Values must be 1-D array-like.")
-        if weights is None:
-            weights = 1
-        index = self._edges.searchsorted(values)
-        # Cannot use self._hist[index] += weights because it does
-        # not accumulate if index contains duplicate values.
-        np.add.at(self._values, index, weights)
+        if (
+            kernels._use_kernels(len(values))
+            and self._values.dtype == np.float64
+            and values.dtype.kind in "iuf"
+        ):
+            kernels.bin_accumulate(self.edges, self._values, values, weights)
+        else:
+            index = self._type.bin_index(values)
+            # Cannot use self._hist[index] += weights because it does
+            # not accumulate if index contains duplicate values.
+            _accumulate(self._values, index, weights)
+        self._cache = None
 
     @property
     def weight(self):
@@ -200,7 +600,7 @@ class Distribution:
 
         :return: float number
         """
-        return mean(self._edges, self._values)
+        return mean(self.edges, self._values)
 
     @property
     def pdf(self):
@@ -211,7 +611,7 @@ class Distribution:
 
         :return: a :class:`.PDF` instance
         """
-        return PDF(self._edges, self._values)
+        return self._get_cached("pdf", PDF, self.edges, self._values)
 
     @property
     def cdf(self):
@@ -222,7 +622,13 @@ class Distribution:
 
         :return: a :class:`.CDF` instance
         """
-        return CDF(self._edges, self._values)
+        return self._get_cached(
+            "cdf",
+            CDF._from_cumulative,
+            self.edges,
+            self._values,
+            self._get_cumulative(),
+        )
 
     @property
     def quantile(self):
@@ -233,8 +639,32 @@ class Distribution:
 
         :return: a :class:`.Quantile` instance
         """
-        return Quantile(self._edges, self._values)
+        return self._get_cached(
+            "quantile",
+            Quantile._from_cumulative,
+            self.edges,
+            self._values,
+            self._get_cumulative(),
+        )
+
+    def _get_cumulative(self):
+        # Shared by to_cumulative() and statistical functions,
+        # summed in float64 as by the statistical functions themselves.
+        return self._get_cached(
+            "cumulative", np.cumsum, self._values, None, np.float64
+        )
+
+    def _get_cached(self, key, func, *args):
+        # The cache is created lazily and dropped when values change,
+        # so distributions that are only updated do not pay for it.
+        if self._cache is None:
+            self._cache = {}
+        try:
+            return self._cache[key]
+        except KeyError:
+            result = self._cache[key] = func(*args)
+            return result
 
     def _check_compatibility(self, dist):
-        if not np.array_equal(dist._edges, self._edges):
+        if not _same_edges(dist.edges, self.edges):
             raise ValueError("Distributions have different edges.")
@@ -0,0 +1,208 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+BACKENDS = ("numpy", "numba")
+
+_backend = "numpy" if numba is None else "numba"
+
+# Kernels are used for inputs with at least this number of elements.
+# NumPy is fast enough for smaller inputs, so processes handling them
+# do not wait for compilation of kernels.
+_MIN_KERNEL_SIZE = 2 ** 14
+
+
+def get_backend():
+    """
+    Return name of the backend used for hot loops.
+
+    The ``"numba"`` backend is used by default if Numba is installed,
+    otherwise the ``"numpy"`` backend is used.
+
+    :return: ``"numpy"`` or ``"numba"``
+    """
+    return _backend
+
+
+def set_backend(name):
+    """
+    Choose the backend used for hot loops.
+
+    The ``"numba"`` backend fuses binning of samples in
+    :meth:`.Distribution.update` to one loop and evaluates
+    quantiles of many histograms (:func:`.stats.quantile`)
+    without temporary arrays.
+    Kernels are used only for inputs with many elements (samples,
+    or evaluated points of all histograms), smaller inputs are processed
+    by NumPy. Kernels are compiled by Numba when they are first needed,
+    and compiled code is cached on disk for next processes.
+    Both backends give identical results.
+
+    :param name: ``"numpy"`` or ``"numba"``
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend: {name!r}")
+    if name == "numba" and numba is None:
+        raise ImportError("Numba backend requires numba.")
+    _backend = name
+
+
+def _use_kernels(size):
+    # Return whether kernels should process an input of the given size.
+    return _backend == "numba" and size >= _MIN_KERNEL_SIZE
+
+
+def bin_accumulate(edges, values, samples, weights=None):
+    """
+    Add samples to a float64 histogram in one loop.
+
+    Gives same results as ``np.add.at(values, edges.searchsorted(samples), weights)``.
+
+    :param edges: 1-D array, ordered histogram edges
+    :param values: 1-D float64 array, histogram values updated inplace
+    :param samples: 1-D numeric array
+    :param weights: optional scalar or 1-D array-like with same length as samples
+    """
+    if weights is None:
+        _bin_add_weight(edges, values, samples, 1.0)
+        return
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.ndim == 0:
+        _bin_add_weight(edges, values, samples, float(weights))
+        return
+    if weights.shape != samples.shape:
+        raise ValueError("Weights must have same length as values.")
+    _bin_add_weights(edges, values, samples, weights)
+
+
+def interp_rows_middle(v, xp, fp, left, right):
+    """
+    Evaluate ``stats._interp_rows_middle()`` in one loop.
+
+    :param v: 1-D float array, values to interpolate at
+    :param xp: 1-D array shared by all rows, or 2-D array with one row per function
+    :param fp: 1-D array shared by all rows, or 2-D array with one row per function
+    :param left: 1-D array, function value for inputs below ``xp[0]``
+    :param right: 1-D array, function value for inputs above ``xp[-1]``
+    :return: 2-D array of shape ``(len(left), len(v))``
+    """
+    rows = len(left)
+    size = np.shape(xp)[-1]
+    xp = np.broadcast_to(np.asarray(xp, dtype=np.float64), (rows, size))
+    fp = np.broadcast_to(np.asarray(fp, dtype=np.float64), (rows, size))
+    out = np.empty((rows, len(v)))
+    _interp_rows_middle(
+        np.asarray(v, dtype=np.float64),
+        xp,
+        fp,
+        np.asarray(left, dtype=np.float64),
+        np.asarray(right, dtype=np.float64),
+        out,
+    )
+    return out
+
+
+if numba is not None:
+    # Kernels repeat operations of the NumPy implementations in same order,
+    # so they round equally. The numpy error model gives NaN and infinity
+    # for division by zero, instead of raising ZeroDivisionError.
+    _jit = numba.njit(nogil=True, error_model="numpy", cache=True)
+
+    @_jit
+    def _search_left(a, x):
+        # Same as np.searchsorted(a, x, side="left"), NaN is after all items.
+        lo, hi = 0, len(a)
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if a[mid] >= x:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    @_jit
+    def _search_right(a, x):
+        # Same as np.searchsorted(a, x, side="right"), NaN is after all items.
+        lo, hi = 0, len(a)
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if a[mid] > x:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    @_jit
+    def _bin_add_weight(edges, values, samples, weight):
+        for i in range(len(samples)):
+            values[_search_left(edges, samples[i])] += weight
+
+    @_jit
+    def _bin_add_weights(edges, values, samples, weights):
+        for i in range(len(samples)):
+            values[_search_left(edges, samples[i])] += weights[i]
+
+    @_jit
+    def _interp_point(x, xp, fp, left, right, lowest):
+        # Scalar version of stats._interp_rows().
+        size = len(xp)
+        if lowest:
+            index = _search_left(xp, x)
+            anchor = min(index, size - 1)
+            other = max(anchor - 1, 0)
+            x_anchor, x_other = xp[anchor], xp[other]
+            y_anchor, y_other = fp[anchor], fp[other]
+            slope = (y_other - y_anchor) / (x_anchor - x_other)
+            result = slope * (x_anchor - x) + y_anchor
+            retry = slope * (x_other - x) + y_other
+        else:
+            index = _search_right(xp, x)
+            anchor = max(index - 1, 0)
+            other = min(anchor + 1, size - 1)
+            x_anchor, x_other = xp[anchor], xp[other]
+            y_anchor, y_other = fp[anchor], fp[other]
+            slope = (y_other - y_anchor) / (x_other - x_anchor)
+            result = slope * (x - x_anchor) + y_anchor
+            retry = slope * (x - x_other) + y_other
+        if np.isnan(result):
+            result = retry
+        if np.isnan(result) and y_anchor == y_other:
+            result = y_anchor
+        if x_anchor == x or anchor == other:
+            result = y_anchor
+        if index == 0 and x < x_anchor:
+            result = left
+        if index == size and x > x_anchor:
+            result = right
+        return result
+
+    @_jit
+    def _interp_rows_middle(v, xp, fp, left, right, out):
+        for row in range(len(left)):
+            for i in range(len(v)):
+                x = v[i]
+                if np.isnan(x):
+                    out[row, i] = np.nan
+                    continue
+                low = _interp_point(x, xp[row], fp[row], left[row], right[row], True)
+                high = _interp_point(x, xp[row], fp[row], left[row], right[row], False)
+                out[row, i] = (low + high) / 2
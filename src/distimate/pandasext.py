@@ -12,22 +12,384 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import re
+
 import numpy as np
 
-from distimate.types import DistributionType
+from distimate import arrowext, stats
+from distimate.distributions import (
+    Distribution,
+    _get_type,
+    _is_counter,
+    _max_exact_integer,
+    _same_edges,
+)
+from distimate.sparse import SparseDistribution
 
 try:
     import pandas as pd
+    from pandas.api.extensions import ExtensionArray, ExtensionDtype
+    from pandas.api.indexers import check_array_indexer
 except ImportError:
     pd = None
+    ExtensionArray = ExtensionDtype = object
+
+
+# Group sums process rows in chunks of about this number of values.
+_SEGMENT_CHUNK_SIZE = 2 ** 20
 
 
 def _format_number(v):
-    if round(v) == v:
+    if np.isfinite(v) and round(v) == v:
         return str(int(v))
     return str(v)
 
 
+class DistributionDtype(ExtensionDtype):
+    """
+    Pandas extension dtype for :class:`.Distribution` instances.
+
+    Distributions with same edges are stored in a :class:`DistributionExtensionArray`
+    instead of a Pandas Series of Python objects.
+
+    :param dist_type: :class:`.DistributionType` or
+        1-D array-like with histogram edges
+    """
+
+    type = Distribution
+    kind = "O"
+    na_value = np.nan
+    _metadata = ("_key",)
+
+    _string_pattern = re.compile(r"^distimate\[(?P<edges>.*)\]$")
+
+    def __init__(self, dist_type):
+        dist_type = _get_type(dist_type)
+        self._dist_type = dist_type
+        self._key = tuple(dist_type.edges.tolist())
+
+    def __repr__(self):
+        return self.name
+
+    @property
+    def name(self):
+        """
+        String identifying the dtype, including histogram edges.
+
+        The name can be parsed back, for example, by ``series.astype(name)``.
+
+        :return: string like ``"distimate[0, 10, 100]"``
+        """
+        edges = ", ".join(_format_number(edge) for edge in self._key)
+        return f"distimate[{edges}]"
+
+    @property
+    def dist_type(self):
+        """
+        Distribution type of the distributions.
+
+        :return: :class:`.DistributionType`
+        """
+        return self._dist_type
+
+    @property
+    def edges(self):
+        """
+        Edges of the histograms.
+
+        :return: 1-D :class:`numpy.array`, ordered histogram edges
+        """
+        return self._dist_type.edges
+
+    @classmethod
+    def construct_array_type(cls):
+        return DistributionExtensionArray
+
+    def __from_arrow__(self, array):
+        values, mask = arrowext.from_arrow(array)
+        return DistributionExtensionArray(self._dist_type, values, mask)
+
+    @classmethod
+    def construct_from_string(cls, string):
+        if not isinstance(string, str):
+            raise TypeError(f"Expects a string, got {type(string).__name__}.")
+        match = cls._string_pattern.match(string)
+        if match is None:
+            raise TypeError(f"Cannot construct a '{cls.__name__}' from '{string}'.")
+        try:
+            edges = [float(edge) for edge in match.group("edges").split(",")]
+            return cls(edges)
+        except ValueError as exc:
+            # Pandas expects TypeError when a string is not this dtype.
+            raise TypeError(
+                f"Cannot construct a '{cls.__name__}' from '{string}'."
+            ) from exc
+
+
+class DistributionExtensionArray(ExtensionArray):
+    """
+    Pandas extension array of :class:`.Distribution` instances.
+
+    Stores histograms of all distributions in one 2-D array
+    and missing values in a boolean mask,
+    so Pandas operations do not box Python objects.
+
+    :param dist_type: :class:`.DistributionType` or
+        1-D array-like with histogram edges
+    :param values: 2-D array-like, one histogram per row
+    :param mask: optional 1-D boolean array-like, true for missing values
+    """
+
+    _dtype_cls = DistributionDtype
+
+    def __init__(self, dist_type, values, mask=None):
+        dtype = self._dtype_cls(dist_type)
+        values = _to_float64(values)
+        if values.ndim != 2 or values.shape[1] != len(dtype.edges) + 1:
+            raise ValueError("Histograms must have len(edges) + 1 columns.")
+        if mask is None:
+            mask = np.zeros(len(values), dtype=bool)
+        mask = np.asarray(mask, dtype=bool)
+        if mask.any() and np.any(values[mask] != 0):
+            # Histograms of missing values are zeros.
+            values = values.copy()
+            values[mask] = 0
+        # NaN values fail the comparison too.
+        if not np.all(values >= 0):
+            raise ValueError("Histogram values must not be negative.")
+        self._dtype = dtype
+        self._values = values
+        self._mask = mask
+
+    @classmethod
+    def _from_sequence(cls, scalars, dtype=None, copy=False):
+        if isinstance(scalars, cls):
+            if dtype is not None and scalars.dtype != dtype:
+                raise ValueError("Distributions have different edges.")
+            return scalars.copy() if copy else scalars
+        scalars = list(scalars)
+        if dtype is None:
+            dists = [scalar for scalar in scalars if isinstance(scalar, Distribution)]
+            if not dists:
+                raise ValueError("Cannot infer distribution edges.")
+            dtype = cls._dtype_cls(dists[0].edges)
+        elif isinstance(dtype, str):
+            dtype = cls._dtype_cls.construct_from_string(dtype)
+        values = np.zeros((len(scalars), len(dtype.edges) + 1))
+        mask = np.zeros(len(scalars), dtype=bool)
+        for i, scalar in enumerate(scalars):
+            if isinstance(scalar, Distribution):
+                if not _same_edges(scalar.edges, dtype.edges):
+                    raise ValueError("Distributions have different edges.")
+                values[i] = _to_float64(scalar.values)
+            elif pd.isna(scalar):
+                mask[i] = True
+            else:
+                raise TypeError(f"Expected Distribution, got {type(scalar).__name__}.")
+        return cls(dtype.dist_type, values, mask)
+
+    @classmethod
+    def _from_factorized(cls, values, original):
+        histograms = np.zeros((len(values), original._values.shape[1]))
+        mask = np.zeros(len(values), dtype=bool)
+        for i, value in enumerate(values):
+            if value is None:
+                mask[i] = True
+            else:
+                histograms[i] = np.frombuffer(value, dtype=original._values.dtype)
+        return cls(original.dtype.dist_type, histograms, mask)
+
+    @classmethod
+    def _concat_same_type(cls, to_concat):
+        to_concat = list(to_concat)
+        dtype = to_concat[0].dtype
+        if any(array.dtype != dtype for array in to_concat):
+            raise ValueError("Distributions have different edges.")
+        values = np.concatenate([array._values for array in to_concat])
+        mask = np.concatenate([array._mask for array in to_concat])
+        return cls(dtype.dist_type, values, mask)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __arrow_array__(self, type=None):
+        # The type selects a type of histogram values.
+        # Plain fixed-size lists are returned when requested without extension.
+        value_type = None
+        if type is not None:
+            storage_type = getattr(type, "storage_type", type)
+            if storage_type.list_size != self._values.shape[1]:
+                raise ValueError("Distributions have different edges.")
+            value_type = storage_type.value_type
+        arrow_type = arrowext.DistributionArrowType(self.dtype.dist_type, value_type)
+        array = arrowext.to_arrow(arrow_type, self._values, self._mask)
+        if type is not None and not isinstance(type, arrowext.DistributionArrowType):
+            return array.storage
+        return array
+
+    def __getitem__(self, item):
+        if np.ndim(item) == 0 and not isinstance(item, slice):
+            if self._mask[item]:
+                return self.dtype.na_value
+            return self.dtype.dist_type.from_histogram(self._values[item].copy())
+        item = check_array_indexer(self, item)
+        return self._create(self._values[item], self._mask[item])
+
+    def __setitem__(self, key, value):
+        key = check_array_indexer(self, key)
+        if isinstance(value, Distribution):
+            if not _same_edges(value.edges, self.dtype.edges):
+                raise ValueError("Distributions have different edges.")
+            self._values[key] = _to_float64(value.values)
+            self._mask[key] = False
+            return
+        if np.ndim(value) == 0 and pd.isna(value):
+            self._values[key] = 0
+            self._mask[key] = True
+            return
+        if not isinstance(value, type(self)):
+            value = self._from_sequence(value, dtype=self.dtype)
+        elif value.dtype != self.dtype:
+            raise ValueError("Distributions have different edges.")
+        self._values[key] = value._values
+        self._mask[key] = value._mask
+
+    def __eq__(self, other):
+        if isinstance(other, (pd.Series, pd.Index, pd.DataFrame)):
+            return NotImplemented
+        if isinstance(other, Distribution):
+            if not _same_edges(other.edges, self.dtype.edges):
+                raise ValueError("Distributions have different edges.")
+            other_values = other.values
+            other_mask = np.zeros(len(self), dtype=bool)
+        elif isinstance(other, type(self)):
+            if other.dtype != self.dtype:
+                raise ValueError("Distributions have different edges.")
+            other_values, other_mask = other._values, other._mask
+        else:
+            return NotImplemented
+        equal = np.all(self._values == other_values, axis=1)
+        return np.asarray(equal & ~self._mask & ~other_mask, dtype=bool)
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @property
+    def nbytes(self):
+        return self._values.nbytes + self._mask.nbytes
+
+    @property
+    def values(self):
+        """
+        Values of the underlying histograms.
+
+        Histograms of missing values are zeros.
+
+        :return: 2-D :class:`numpy.array`, one histogram per row
+        """
+        return self._values
+
+    def isna(self):
+        return self._mask.copy()
+
+    def take(self, indices, allow_fill=False, fill_value=None):
+        indices = np.asarray(indices, dtype=np.intp)
+        if not allow_fill:
+            return self._create(self._values[indices], self._mask[indices])
+        if np.any(indices < -1):
+            raise ValueError("Invalid value in 'indices'.")
+        fill = indices == -1
+        if len(self) == 0 and not np.all(fill):
+            raise IndexError("Cannot take from an empty array.")
+        if len(self) == 0:
+            values = np.zeros((len(indices), self._values.shape[1]))
+            mask = np.zeros(len(indices), dtype=bool)
+        else:
+            positions = np.where(fill, 0, indices)
+            values = self._values[positions]
+            mask = self._mask[positions]
+        if fill_value is None or pd.isna(fill_value):
+            values[fill] = 0
+            mask[fill] = True
+        elif isinstance(fill_value, Distribution):
+            values[fill] = _to_float64(fill_value.values)
+            mask[fill] = False
+        else:
+            raise TypeError("Fill value must be a Distribution or a missing value.")
+        return self._create(values, mask)
+
+    def copy(self):
+        return self._create(self._values.copy(), self._mask.copy())
+
+    def unique(self):
+        keys, _ = self._values_for_factorize()
+        codes, _ = pd.factorize(keys)
+        _, first = np.unique(codes, return_index=True)
+        return self.take(np.sort(first))
+
+    def _values_for_factorize(self):
+        values = np.empty(len(self), dtype=object)
+        for i, histogram in enumerate(self._values):
+            values[i] = None if self._mask[i] else histogram.tobytes()
+        return values, None
+
+    def _reduce(self, name, skipna=True, keepdims=False, **kwargs):
+        if name != "sum":
+            raise TypeError(f"Distributions do not support operation '{name}'.")
+        if not skipna and self._mask.any():
+            return self.dtype.na_value
+        if np.sum(~self._mask) < kwargs.get("min_count", 0):
+            return self.dtype.na_value
+        result = self.dtype.dist_type.from_histogram(self._values.sum(axis=0))
+        if keepdims:
+            return self._from_sequence([result], dtype=self.dtype)
+        return result
+
+    def _groupby_op(self, *, how, has_dropped_na, min_count, ngroups, ids, **kwargs):
+        if how in ("first", "last"):
+            return self._groupby_nth(how, min_count, ngroups, ids, **kwargs)
+        if how != "sum":
+            return super()._groupby_op(
+                how=how,
+                has_dropped_na=has_dropped_na,
+                min_count=min_count,
+                ngroups=ngroups,
+                ids=ids,
+                **kwargs,
+            )
+        valid = (ids >= 0) & ~self._mask
+        values = _segment_sum(self._values, ids, ngroups, valid)
+        counts = np.bincount(ids[valid], minlength=ngroups)
+        return self._create(values, counts < min_count)
+
+    def _groupby_nth(self, how, min_count, ngroups, ids, skipna=True, **kwargs):
+        # Take the first or the last row of each group.
+        # Pandas cannot aggregate distributions one by one,
+        # because their histograms look like array results.
+        valid = ids >= 0
+        if skipna:
+            valid &= ~self._mask
+        positions = np.flatnonzero(valid)
+        if how == "last":
+            positions = positions[::-1]
+        groups, first = np.unique(ids[positions], return_index=True)
+        indices = np.full(ngroups, -1, dtype=np.intp)
+        indices[groups] = positions[first]
+        result = self.take(indices, allow_fill=True)
+        counts = np.bincount(ids[valid], minlength=ngroups)
+        result._values[counts < min_count] = 0
+        result._mask[counts < min_count] = True
+        return result
+
+    def _create(self, values, mask):
+        result = type(self).__new__(type(self))
+        result._dtype = self._dtype
+        result._values = values
+        result._mask = mask
+        return result
+
+
 class DistributionAccessor(object):
     """
     Implements ``.dist`` accessor on :class:`pandas.Series`.
@@ -59,14 +421,12 @@ class DistributionAccessor(object):
         :param name: optional name of the series.
         :return: :class:`pandas.Series`
         """
-        if not isinstance(dist_type, DistributionType):
-            dist_type = DistributionType(dist_type)
+        dist_type = _get_type(dist_type)
         index = None
         if isinstance(histograms, pd.DataFrame):
             index = histograms.index
             histograms = histograms.values
-        dists = [dist_type.from_histogram(histogram) for histogram in histograms]
-        return pd.Series(dists, index=index, name=name)
+        return _create_series(dist_type, histograms, index=index, name=name)
 
     @staticmethod
     def from_cumulative(dist_type, cumulatives, *, name=None):
@@ -82,15 +442,36 @@ class DistributionAccessor(object):
         :param name: Optional name of the series.
         :return: :class:`pandas.Series`
         """
-        if not isinstance(dist_type, DistributionType):
-            dist_type = DistributionType(dist_type)
+        dist_type = _get_type(dist_type)
         index = None
         if isinstance(cumulatives, pd.DataFrame):
             index = cumulatives.index
             cumulatives = cumulatives.values
         histograms = np.diff(cumulatives, prepend=0)
-        dists = [dist_type.from_histogram(histogram) for histogram in histograms]
-        return pd.Series(dists, index=index, name=name)
+        return _create_series(dist_type, histograms, index=index, name=name)
+
+    @staticmethod
+    def from_grouped_samples(dist_type, keys, samples, weights=None, *, name=None):
+        """
+        Construct a new :class:`pandas.Series` from samples grouped by keys.
+
+        This is a static method that can be accessed
+        as ``pd.Series.dist.from_grouped_samples()``.
+
+        See :meth:`.DistributionType.from_grouped_samples` for details.
+
+        :param dist_type: :class:`.DistributionType` or
+            1-D array-like with histogram edges
+        :param keys: :class:`pandas.Series` or 1-D array-like, a key of each sample
+        :param samples: :class:`pandas.Series` or 1-D array-like
+        :param weights: optional scalar or 1-D array-like
+        :param name: optional name of the series.
+        :return: :class:`pandas.Series` indexed by sorted unique keys
+        """
+        dist_type = _get_type(dist_type)
+        unique_keys, array = dist_type.from_grouped_samples(keys, samples, weights)
+        index = pd.Index(unique_keys, name=getattr(keys, "name", None))
+        return _create_series(dist_type, array.values, index=index, name=name)
 
     def to_histogram(self):
         """
@@ -122,7 +503,7 @@ class DistributionAccessor(object):
         :param v: input value, or list of them
         :return: :class:`pandas.Series`
         """
-        return self._compute(self._pdf, v)
+        return self._compute(stats.pdf, "pdf", v)
 
     def cdf(self, v):
         """
@@ -131,7 +512,7 @@ class DistributionAccessor(object):
         :param v: input value, or list of them
         :return: :class:`pandas.Series`
         """
-        return self._compute(self._cdf, v)
+        return self._compute(stats.cdf, "cdf", v)
 
     def quantile(self, v):
         """
@@ -141,7 +522,28 @@ class DistributionAccessor(object):
         :param v: input value, or list of them
         :return: :class:`pandas.Series`
         """
-        return self._compute(self._quantile, v)
+        return self._compute(stats.quantile, "q", v, scale=100)
+
+    def sum(self, by=None):
+        """
+        Merge :class:`pandas.Series` of :class:`.Distribution` instances.
+
+        Histograms are stacked and summed at once,
+        without merging distributions one by one.
+        Missing values are skipped.
+
+        Series with :class:`DistributionDtype` can be also merged
+        using ``series.sum()`` or ``series.groupby(by).sum()``.
+
+        :param by: optional grouping, anything accepted
+            by :meth:`pandas.Series.groupby`
+        :return: :class:`.Distribution` if *by* is None,
+            otherwise :class:`pandas.Series` indexed by groups
+        """
+        series = self._to_extension_series()
+        if by is None:
+            return series.array._reduce("sum")
+        return series.groupby(by).sum()
 
     @property
     def values(self):
@@ -150,30 +552,83 @@ class DistributionAccessor(object):
 
         :return: 2-D :class:`numpy.array`
         """
+        if isinstance(self._series.dtype, DistributionDtype):
+            array = self._series.array
+            if not array.isna().any():
+                return array.values
+            values = array.values.copy()
+            values[array.isna()] = np.nan
+            return values
         if self._series.empty:
             return np.zeros((0, 0))
         return np.array([dist.values for dist in self._series])
 
-    def _compute(self, meth, v):
+    def _compute(self, func, prefix, v, scale=1):
+        points = list(v) if isinstance(v, (tuple, list)) else [v]
+        names = [self._get_name(f"{prefix}{_format_number(scale * i)}") for i in points]
+        data = self._evaluate(func, points)
         if isinstance(v, (tuple, list)):
-            columns = [meth(i) for i in v]
-            return pd.concat(columns, axis=1)
-        return meth(v)
-
-    def _pdf(self, v):
-        name = self._get_name(f"pdf{_format_number(v)}")
-        data = [dist.pdf(v) if pd.notna(dist) else np.nan for dist in self._series]
-        return pd.Series(data, index=self._series.index, name=name)
-
-    def _cdf(self, v):
-        name = self._get_name(f"cdf{_format_number(v)}")
-        data = [dist.cdf(v) if pd.notna(dist) else np.nan for dist in self._series]
-        return pd.Series(data, index=self._series.index, name=name)
-
-    def _quantile(self, v):
-        name = self._get_name(f"q{_format_number(100 * v)}")
-        data = [dist.quantile(v) if pd.notna(dist) else np.nan for dist in self._series]
-        return pd.Series(data, index=self._series.index, name=name)
+            return pd.DataFrame(data, index=self._series.index, columns=names)
+        return pd.Series(data[:, 0], index=self._series.index, name=names[0])
+
+    def _evaluate(self, func, points):
+        # Compute a function of all distributions for all points at once.
+        # Missing distributions have NaN in all columns.
+        data = np.full((len(self._series), len(points)), np.nan)
+        points = np.asarray(points, dtype=np.float64)
+        for edges, positions, histograms in self._iter_blocks():
+            data[positions] = func(edges, histograms, points)
+        return data
+
+    def _iter_blocks(self):
+        # Yield histograms of non-missing distributions stacked to 2-D blocks,
+        # one block for each set of edges.
+        if isinstance(self._series.dtype, DistributionDtype):
+            array = self._series.array
+            positions = np.flatnonzero(~array.isna())
+            if len(positions) == len(array):
+                yield array.dtype.edges, slice(None), array.values
+            else:
+                yield array.dtype.edges, positions, array.values[positions]
+            return
+        # Distributions with equal edges share one interned edges array,
+        # so we can group them by identity before comparing values.
+        groups = {}
+        for position, dist in enumerate(self._series.array):
+            if isinstance(dist, (Distribution, SparseDistribution)):
+                groups.setdefault(id(dist.edges), []).append(position)
+            elif np.ndim(dist) != 0 or not pd.isna(dist):
+                raise TypeError(f"Expected Distribution, got {type(dist).__name__}.")
+        blocks = []
+        for positions in groups.values():
+            edges = self._series.iat[positions[0]].edges
+            for block in blocks:
+                if _same_edges(block[0], edges):
+                    block[1].extend(positions)
+                    break
+            else:
+                blocks.append((edges, positions))
+        for edges, positions in blocks:
+            histograms = np.stack([self._series.iat[i].values for i in positions])
+            yield edges, positions, histograms
+
+    def _to_extension_series(self):
+        # Convert series of Distribution objects to the extension dtype,
+        # so Pandas can use vectorized operations of the extension array.
+        if isinstance(self._series.dtype, DistributionDtype):
+            return self._series
+        blocks = list(self._iter_blocks())
+        if len(blocks) > 1:
+            raise ValueError("Distributions have different edges.")
+        if not blocks:
+            raise ValueError("Cannot infer distribution edges.")
+        edges, positions, histograms = blocks[0]
+        values = np.zeros((len(self._series), histograms.shape[1]))
+        values[positions] = _to_float64(histograms)
+        mask = np.ones(len(self._series), dtype=bool)
+        mask[positions] = False
+        array = DistributionExtensionArray(edges, values, mask)
+        return pd.Series(array, index=self._series.index, name=self._series.name)
 
     def _get_name(self, name):
         if self._series.name is None:
@@ -181,7 +636,56 @@ class DistributionAccessor(object):
         return f"{self._series.name}_{name}"
 
 
+def _to_float64(values):
+    """
+    Convert histogram values to float64.
+
+    Raises :class:`ValueError` for integers that float64 cannot represent exactly.
+    """
+    values = np.asarray(values)
+    if _is_counter(values):
+        limit = _max_exact_integer(np.float64)
+        if np.any(values > limit) or np.any(values < -limit):
+            raise ValueError("Histogram values are too large for float64.")
+    return np.asarray(values, dtype=Distribution._dtype)
+
+
+def _segment_sum(values, ids, ngroups, valid):
+    # Sum valid rows of a 2-D array by group IDs.
+    # Indexes to a flattened result allow to sum all columns by one bincount,
+    # which adds rows of each group in their original order, as np.add.at.
+    # Rows are summed in chunks to bound memory of the indexes.
+    # Each chunk starts with partial sums of its groups, so the order is kept.
+    size = values.shape[1]
+    result = np.zeros((ngroups, size))
+    step = max(_SEGMENT_CHUNK_SIZE // size, 1)
+    for start in range(0, len(values), step):
+        part = slice(start, start + step)
+        chunk, chunk_ids, chunk_valid = values[part], ids[part], valid[part]
+        if not chunk_valid.all():
+            chunk = chunk[chunk_valid]
+            chunk_ids = chunk_ids[chunk_valid]
+        if len(chunk) == 0:
+            continue
+        groups, local_ids = np.unique(chunk_ids, return_inverse=True)
+        rows = np.concatenate([result[groups], chunk])
+        local_ids = np.concatenate([np.arange(len(groups)), local_ids.ravel()])
+        index = (local_ids[:, np.newaxis] * size + np.arange(size)).ravel()
+        sums = np.bincount(index, rows.ravel(), minlength=len(groups) * size)
+        result[groups] = sums.reshape(len(groups), size)
+    return result
+
+
+def _create_series(dist_type, histograms, *, index, name):
+    histograms = _to_float64(histograms)
+    if histograms.size == 0:
+        histograms = histograms.reshape(0, len(dist_type.edges) + 1)
+    array = DistributionExtensionArray(dist_type, histograms)
+    return pd.Series(array, index=index, name=name)
+
+
 def register_to_pandas():
     if pd is None:
         return  # Pandas are not installed
+    pd.api.extensions.register_extension_dtype(DistributionDtype)
     pd.api.extensions.register_series_accessor("dist")(DistributionAccessor)
@@ -0,0 +1,155 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from distimate.distributions import _get_type
+
+DEFAULT_CHUNK_SIZE = 2 ** 24
+
+
+def from_samples(
+    dist_type, samples, weights=None, *, max_workers=None, chunk_size=None
+):
+    """
+    Create a distribution from many samples using multiple processes.
+
+    Samples are split to chunks that are binned by worker processes.
+    Workers read samples from shared memory, samples are never pickled:
+
+    - A path to a ``.npy`` file or a :class:`numpy.memmap`
+      is opened by each worker in the memory-mapped mode.
+    - Other arrays are copied to :mod:`multiprocessing.shared_memory` once.
+
+    Workers return partial histograms that are summed.
+    Without weights or with integral weights, the result is exactly
+    same as from :meth:`.DistributionType.from_samples`.
+    Fractional weights are summed in different order,
+    so results can differ by rounding errors.
+
+    :param dist_type: :class:`.DistributionType` or
+        1-D array-like with histogram edges
+    :param samples: 1-D array, :class:`numpy.memmap`, or a path to a ``.npy`` file
+    :param weights: optional scalar or 1-D array, :class:`numpy.memmap`,
+        or a path to a ``.npy`` file with same length as samples.
+    :param max_workers: optional number of worker processes,
+        defaults to the number of CPUs
+    :param chunk_size: optional number of samples binned by a worker at once
+    :return: a new :class:`.Distribution`
+    """
+    dist_type = _get_type(dist_type)
+    if chunk_size is None:
+        chunk_size = DEFAULT_CHUNK_SIZE
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be positive.")
+    scalar_weight = (
+        weights is not None and np.ndim(weights) == 0 and not _is_path(weights)
+    )
+    resources = []
+    try:
+        samples_source, size = _share(samples, "Samples", resources)
+        weights_source = None
+        if weights is not None and not scalar_weight:
+            weights_source, weights_size = _share(weights, "Weights", resources)
+            if weights_size != size:
+                raise ValueError("Weights must have same length as samples.")
+        values = np.zeros(len(dist_type.edges) + 1)
+        if size > 0:
+            tasks = [
+                (dist_type, samples_source, weights_source, start, start + chunk_size)
+                for start in range(0, size, chunk_size)
+            ]
+            with ProcessPoolExecutor(max_workers) as executor:
+                for partial in executor.map(_bin_chunk, tasks):
+                    values += partial
+    finally:
+        for resource in resources:
+            resource.close()
+            resource.unlink()
+    if scalar_weight:
+        values *= weights
+    return dist_type.from_histogram(values)
+
+
+def _is_path(value):
+    return isinstance(value, (str, bytes, os.PathLike))
+
+
+def _share(array, name, resources):
+    # Return a picklable description of an array that workers can open.
+    # The name of the argument is used in error messages.
+    if _is_path(array):
+        array = np.load(array, mmap_mode="r")
+    if isinstance(array, np.memmap) and array.filename is not None:
+        if array.ndim != 1:
+            raise ValueError(f"{name} must be 1-D array-like.")
+        if not array.flags.c_contiguous:
+            raise ValueError(f"Memory-mapped {name.lower()} must be contiguous.")
+        offset = array.offset + _memmap_view_offset(array)
+        source = ("memmap", array.filename, array.dtype.str, offset, len(array))
+        return source, len(array)
+    array = np.asarray(array)
+    if array.ndim != 1:
+        raise ValueError(f"{name} must be 1-D array-like.")
+    memory = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    resources.append(memory)
+    np.ndarray(array.shape, array.dtype, memory.buf)[:] = array
+    return ("shm", memory.name, array.dtype.str, len(array)), len(array)
+
+
+def _memmap_view_offset(array):
+    # Slices of memory-mapped arrays share their mmap with a base array.
+    base = array
+    while isinstance(base.base, np.memmap):
+        base = base.base
+    if base is array:
+        return 0
+    return array.__array_interface__["data"][0] - base.__array_interface__["data"][0]
+
+
+def _open(source):
+    # Open an array described by _share(), return it and a closing function.
+    kind = source[0]
+    if kind == "memmap":
+        _, filename, dtype, offset, size = source
+        array = np.memmap(filename, dtype=dtype, mode="r", offset=offset, shape=(size,))
+        return array, lambda: None
+    _, name, dtype, size = source
+    memory = shared_memory.SharedMemory(name=name)
+    array = np.ndarray((size,), dtype=dtype, buffer=memory.buf)
+    return array, memory.close
+
+
+def _bin_chunk(task):
+    dist_type, samples_source, weights_source, start, stop = task
+    samples, close_samples = _open(samples_source)
+    try:
+        index = dist_type.bin_index(samples[start:stop])
+        size = len(dist_type.edges) + 1
+        if weights_source is None:
+            return np.bincount(index, minlength=size)
+        weights, close_weights = _open(weights_source)
+        try:
+            return np.bincount(index, weights[start:stop], minlength=size)
+        finally:
+            del weights
+            close_weights()
+    finally:
+        # Views of shared memory must be released before closing it.
+        del samples
+        close_samples()
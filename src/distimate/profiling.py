@@ -0,0 +1,263 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import contextlib
+import functools
+import threading
+import time
+
+import numpy as np
+
+from distimate.distributions import Distribution
+from distimate.pandasext import DistributionAccessor
+from distimate.sparse import SparseDistribution
+from distimate.stats import CDF, PDF, Quantile
+
+_MISSING = object()
+
+
+def _one(args, kwargs):
+    return 1
+
+
+def _argument_size(position, name):
+    # Count elements of a positional-or-keyword argument.
+    def count(args, kwargs):
+        value = args[position] if len(args) > position else kwargs[name]
+        return int(np.size(value))
+
+    return count
+
+
+def _argument_length(position, name):
+    # Count rows of a positional-or-keyword argument.
+    def count(args, kwargs):
+        value = args[position] if len(args) > position else kwargs[name]
+        return len(value)
+
+    return count
+
+
+def _series_length(args, kwargs):
+    return len(args[0]._series)
+
+
+# Instrumented methods: (name, class, attribute, function counting elements).
+# Counting functions get positional arguments including self.
+_TARGETS = [
+    ("Distribution.add", Distribution, "add", _one),
+    ("Distribution.update", Distribution, "update", _argument_size(1, "values")),
+    ("SparseDistribution.add", SparseDistribution, "add", _one),
+    (
+        "SparseDistribution.update",
+        SparseDistribution,
+        "update",
+        _argument_size(1, "values"),
+    ),
+]
+# CDF and Quantile are also created from cached cumulative histograms,
+# so their common initialization is instrumented instead of constructors.
+for _cls, _init in (PDF, "__init__"), (CDF, "_init"), (Quantile, "_init"):
+    _TARGETS += [
+        (f"{_cls.__name__}.__init__", _cls, _init, _argument_size(2, "hist")),
+        (f"{_cls.__name__}.__call__", _cls, "__call__", _argument_size(1, "v")),
+    ]
+for _name in "to_histogram", "to_cumulative", "pdf", "cdf", "quantile", "sum":
+    _TARGETS.append(
+        (f"Series.dist.{_name}", DistributionAccessor, _name, _series_length)
+    )
+_TARGETS += [
+    (
+        "Series.dist.from_histogram",
+        DistributionAccessor,
+        "from_histogram",
+        _argument_length(1, "histograms"),
+    ),
+    (
+        "Series.dist.from_cumulative",
+        DistributionAccessor,
+        "from_cumulative",
+        _argument_length(1, "cumulatives"),
+    ),
+    (
+        "Series.dist.from_grouped_samples",
+        DistributionAccessor,
+        "from_grouped_samples",
+        _argument_size(2, "samples"),
+    ),
+]
+
+_lock = threading.RLock()
+_active = []
+_originals = []
+
+
+class ProfileCounter:
+    """
+    Counters of one instrumented function.
+
+    :param calls: number of calls
+    :param elements: number of processed elements,
+        samples for ingestion, histogram buckets for construction
+        of statistical functions, evaluated points for their calls,
+        and rows for the Pandas accessor
+    :param time: cumulative wall time in seconds, including nested calls
+    """
+
+    __slots__ = ("calls", "elements", "time")
+
+    def __init__(self, calls=0, elements=0, time=0.0):
+        self.calls = calls
+        self.elements = elements
+        self.time = time
+
+    def __repr__(self):
+        return (
+            f"ProfileCounter(calls={self.calls}, elements={self.elements}, "
+            f"time={self.time!r})"
+        )
+
+
+class Profile:
+    """
+    Report of calls of instrumented functions.
+
+    Returned by :func:`profile`.
+    Counters are updated while the profile is active.
+    """
+
+    __slots__ = ("_counters",)
+
+    def __init__(self):
+        self._counters = {}
+
+    def __repr__(self):
+        return f"Profile({self._counters!r})"
+
+    @property
+    def counters(self):
+        """
+        Counters of called functions.
+
+        :return: dict mapping function names to :class:`ProfileCounter`
+        """
+        return dict(self._counters)
+
+    def to_dict(self):
+        """
+        Convert the report to plain Python objects.
+
+        Useful for forwarding numbers to a metrics system or for logging.
+
+        :return: dict mapping function names to dicts
+            with ``calls``, ``elements`` and ``time`` keys
+        """
+        return {
+            name: {
+                "calls": counter.calls,
+                "elements": counter.elements,
+                "time": counter.time,
+            }
+            for name, counter in self._counters.items()
+        }
+
+    def _record(self, name, elements, duration):
+        counter = self._counters.get(name)
+        if counter is None:
+            counter = self._counters[name] = ProfileCounter()
+        counter.calls += 1
+        counter.elements += elements
+        counter.time += duration
+
+
+@contextlib.contextmanager
+def profile(hook=None):
+    """
+    Count calls, processed elements and time spent in Distimate hot paths.
+
+    Instrumented are :meth:`.Distribution.add`, :meth:`.Distribution.update`,
+    their :class:`.SparseDistribution` counterparts,
+    construction and calls of :class:`.PDF`, :class:`.CDF`
+    and :class:`.Quantile`, and methods of the ``.dist`` Pandas accessor.
+
+    Instrumentation is off by default and costs nothing then.
+    Within this context, instrumented methods are replaced by wrappers
+    measuring each call, the original methods are restored on exit.
+    Calls from all threads are counted.
+    Contexts can be nested, each one gets its own report.
+
+    .. code-block:: python
+
+        with profile() as report:
+            run_job()
+        for name, counter in report.counters.items():
+            print(name, counter.calls, counter.elements, counter.time)
+
+    :param hook: optional callable called with the :class:`Profile`
+        when the context exits, for example, to forward it to a metrics system
+    :return: context manager returning a :class:`Profile`
+    """
+    report = Profile()
+    with _lock:
+        if not _active:
+            _install()
+        _active.append(report)
+    try:
+        yield report
+    finally:
+        with _lock:
+            _active.remove(report)
+            if not _active:
+                _uninstall()
+        if hook is not None:
+            hook(report)
+
+
+def _install():
+    for name, cls, attribute, count in _TARGETS:
+        original = cls.__dict__.get(attribute, _MISSING)
+        _originals.append((cls, attribute, original))
+        if isinstance(original, staticmethod):
+            wrapper = staticmethod(_wrap(name, original.__func__, count))
+        else:
+            wrapper = _wrap(name, getattr(cls, attribute), count)
+        setattr(cls, attribute, wrapper)
+
+
+def _uninstall():
+    while _originals:
+        cls, attribute, original = _originals.pop()
+        if original is _MISSING:
+            delattr(cls, attribute)  # Restore the inherited method.
+        else:
+            setattr(cls, attribute, original)
+
+
+def _wrap(name, func, count):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            try:
+                elements = count(args, kwargs)
+            except (IndexError, KeyError, TypeError):
+                elements = 0  # Invalid arguments, the call has raised.
+            with _lock:
+                for report in _active:
+                    report._record(name, elements, duration)
+
+    return wrapper
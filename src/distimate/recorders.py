@@ -0,0 +1,166 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+
+import numpy as np
+
+from distimate.distributions import (
+    _accumulate,
+    _add_histogram,
+    _check_overflow,
+    _get_type,
+    _is_counter,
+    _to_integer_weights,
+)
+
+
+class _Shard:
+    # Histogram written by one thread.
+    # The version is odd while the histogram is being updated,
+    # so readers can detect and retry inconsistent copies.
+
+    __slots__ = ("values", "version")
+
+    def __init__(self, size, dtype):
+        self.values = np.zeros(size, dtype=dtype)
+        self.version = 0
+
+    def copy_values(self):
+        while True:
+            version = self.version
+            if version % 2 == 0:
+                values = self.values.copy()
+                if self.version == version:
+                    return values
+            time.sleep(0)  # Let the writer finish.
+
+
+class ShardedRecorder:
+    """
+    Records samples from many threads without locking.
+
+    Each thread adds samples to its own histogram shard,
+    so threads do not wait for each other.
+    Shards are merged when a :meth:`snapshot` is taken.
+    Writers are not stopped during the snapshot;
+    each :meth:`add` or :meth:`update` call is either
+    completely included or not included at all.
+
+    Shards keep histograms in the dtype of the distribution type.
+    Types with integer dtype count exactly, so they accept
+    only non-negative integer weights.
+
+    :param dist_type: :class:`.DistributionType` or
+        1-D array-like with histogram edges
+    """
+
+    __slots__ = ("_type", "_local", "_shards", "_lock")
+
+    def __init__(self, dist_type):
+        self._type = _get_type(dist_type)
+        self._local = threading.local()
+        self._shards = []
+        # Only registration of new shards is locked.
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        name = type(self).__name__
+        return f"<{name}: shards={len(self._shards)}>"
+
+    @property
+    def edges(self):
+        """
+        Edges of the underlying histograms
+
+        :return: :class: 1-D `numpy.array`, ordered histogram edges
+        """
+        return self._type.edges
+
+    def add(self, value, weight=None):
+        """
+        Add a new item to the shard of the current thread.
+
+        :param value: item to add
+        :param weight: optional item weight
+        """
+        if np.ndim(value) != 0:
+            raise ValueError("Value must be a scalar.")
+        if weight is None:
+            weight = 1
+        elif np.ndim(weight) != 0:
+            raise ValueError("Weight must be a scalar.")
+        index = self._type.bin_index(value)
+        shard = self._get_shard()
+        # Everything is validated before the version becomes odd,
+        # and it must become even again, otherwise snapshots would wait forever.
+        if _is_counter(shard.values):
+            weight = _to_integer_weights(weight)
+            _check_overflow(shard.values[index], weight)
+            weight = weight.astype(shard.values.dtype)
+        shard.version += 1
+        try:
+            shard.values[index] += weight
+        finally:
+            shard.version += 1
+
+    def update(self, values, weights=None):
+        """
+        Add multiple items to the shard of the current thread.
+
+        :param values: items to add, 1-D array-like
+        :param weights: optional scalar or 1-D array-like
+            with same length as samples.
+        """
+        values = np.asarray(values)
+        if values.ndim != 1:
+            raise ValueError("Values must be 1-D array-like.")
+        if weights is not None and np.ndim(weights) != 0:
+            weights = np.asarray(weights)
+            if weights.shape != values.shape:
+                raise ValueError("Weights must have same length as values.")
+        index = self._type.bin_index(values)
+        shard = self._get_shard()
+        if _is_counter(shard.values):
+            if weights is not None:
+                weights = _to_integer_weights(weights)
+        elif weights is not None and np.ndim(weights) != 0:
+            weights = np.asarray(weights, dtype=np.float64)
+        shard.version += 1
+        try:
+            _accumulate(shard.values, index, weights)
+        finally:
+            shard.version += 1
+
+    def snapshot(self):
+        """
+        Merge shards of all threads to one distribution.
+
+        :return: a new :class:`.Distribution`
+        """
+        values = np.zeros(len(self._type.edges) + 1, dtype=self._type.dtype)
+        for shard in list(self._shards):
+            _add_histogram(values, shard.copy_values())
+        return self._type.from_histogram(values)
+
+    def _get_shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = _Shard(len(self._type.edges) + 1, self._type.dtype)
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
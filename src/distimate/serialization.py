@@ -0,0 +1,184 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Binary format of histograms.
+
+The format starts with a 16-byte header:
+
+- 2 bytes: magic ``b"DH"``
+- 1 byte: format version
+- 1 byte: payload encoding
+- 4 bytes: number of buckets, little-endian unsigned integer
+- 8 bytes: fingerprint of histogram edges
+
+The header is followed by one of payloads:
+
+- dense: all buckets as little-endian float64 numbers
+- sparse counts: number of nonempty buckets, differences between
+  their indexes, and their values, all as unsigned LEB128 varints;
+  used for integer histograms with counts that floats cannot represent
+- sparse floats: same as sparse counts,
+  but values are little-endian float64 numbers
+"""
+
+import hashlib
+import struct
+
+import numpy as np
+
+_HEADER = struct.Struct("<2sBBI8s")
+_MAGIC = b"DH"
+_VERSION = 1
+
+_DENSE = 0
+_SPARSE_COUNTS = 1
+_SPARSE_FLOATS = 2
+
+_FLOAT_DTYPE = np.dtype("<f8")
+
+# Float numbers represent all integers up to this value exactly.
+_MAX_EXACT_INTEGER = 2 ** 53
+
+# Number of 7-bit groups in a 64-bit integer.
+_MAX_VARINT_LENGTH = 10
+
+# Integers less than n-th limit are encoded as n+1 bytes.
+_VARINT_LIMITS = np.left_shift(
+    np.uint64(1), np.arange(7, 7 * _MAX_VARINT_LENGTH, 7, dtype=np.uint64)
+)
+
+
+def fingerprint(edges):
+    """Return 8-byte fingerprint of histogram edges."""
+    data = np.ascontiguousarray(edges, dtype=_FLOAT_DTYPE).tobytes()
+    return hashlib.blake2b(data, digest_size=8).digest()
+
+
+def encode(values, edges_fingerprint):
+    """Encode histogram values to bytes, choosing the smallest payload."""
+    values = np.asarray(values)
+    integer = values.dtype.kind in "iu"
+    if not integer:
+        values = values.astype(np.float64, copy=False)
+    index = np.flatnonzero(values)
+    nonzero = values[index]
+    deltas = np.diff(index, prepend=0).astype(np.uint64)
+    delta_lengths = _varint_lengths(deltas)
+    exact = np.all(nonzero < _MAX_EXACT_INTEGER)
+    counts = integer or (np.all(nonzero == np.trunc(nonzero)) and exact)
+    if counts:
+        nonzero = nonzero.astype(np.uint64)
+        value_lengths = _varint_lengths(nonzero)
+        values_size = value_lengths.sum()
+    else:
+        values_size = _FLOAT_DTYPE.itemsize * len(nonzero)
+    count = np.array([len(index)], dtype=np.uint64)
+    count_lengths = _varint_lengths(count)
+    sparse_size = count_lengths.sum() + delta_lengths.sum() + values_size
+    # Dense floats would round large integer counts.
+    dense_exact = exact or not integer
+    if sparse_size >= _FLOAT_DTYPE.itemsize * len(values) and dense_exact:
+        header = _HEADER.pack(_MAGIC, _VERSION, _DENSE, len(values), edges_fingerprint)
+        return header + values.astype(_FLOAT_DTYPE, copy=False).tobytes()
+    encoding = _SPARSE_COUNTS if counts else _SPARSE_FLOATS
+    header = _HEADER.pack(_MAGIC, _VERSION, encoding, len(values), edges_fingerprint)
+    parts = [
+        header,
+        _encode_varints(count, count_lengths),
+        _encode_varints(deltas, delta_lengths),
+    ]
+    if counts:
+        parts.append(_encode_varints(nonzero, value_lengths))
+    else:
+        parts.append(nonzero.astype(_FLOAT_DTYPE, copy=False).tobytes())
+    return b"".join(parts)
+
+
+def decode(data, edges_fingerprint):
+    """
+    Decode histogram values from bytes.
+
+    Dense payloads are not copied, the returned array
+    is a view of the data (read-only if the data is).
+    Sparse counts are returned as uint64, so that large counts stay exact.
+    """
+    data = memoryview(data).cast("B")
+    if len(data) < _HEADER.size:
+        raise ValueError("Invalid distribution data.")
+    magic, version, encoding, size, data_fingerprint = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("Invalid distribution data.")
+    if data_fingerprint != edges_fingerprint:
+        raise ValueError("Distribution data have different edges.")
+    payload = np.frombuffer(data, dtype=np.uint8, offset=_HEADER.size)
+    if encoding == _DENSE:
+        if len(payload) != _FLOAT_DTYPE.itemsize * size:
+            raise ValueError("Invalid distribution data.")
+        return np.frombuffer(data, dtype=_FLOAT_DTYPE, offset=_HEADER.size)
+    if encoding not in (_SPARSE_COUNTS, _SPARSE_FLOATS):
+        raise ValueError("Invalid distribution data.")
+    (count,), offset = _decode_varints(payload, 1, 0)
+    deltas, offset = _decode_varints(payload, int(count), offset)
+    if encoding == _SPARSE_COUNTS:
+        nonzero, offset = _decode_varints(payload, int(count), offset)
+    else:
+        end = offset + _FLOAT_DTYPE.itemsize * int(count)
+        if end > len(payload):
+            raise ValueError("Invalid distribution data.")
+        nonzero = payload[offset:end].view(_FLOAT_DTYPE)
+        offset = end
+    if offset != len(payload):
+        raise ValueError("Invalid distribution data.")
+    index = np.cumsum(deltas)
+    if len(index) and index[-1] >= size:
+        raise ValueError("Invalid distribution data.")
+    values = np.zeros(size, dtype=nonzero.dtype)
+    values[index.astype(np.intp)] = nonzero
+    return values
+
+
+def _varint_lengths(values):
+    return np.searchsorted(_VARINT_LIMITS, values, side="right") + 1
+
+
+def _encode_varints(values, lengths):
+    # Encode unsigned integers as LEB128:
+    # 7 bits per byte, the highest bit is set in all bytes but the last.
+    shifts = np.arange(0, 7 * _MAX_VARINT_LENGTH, 7, dtype=np.uint64)
+    groups = ((values[:, np.newaxis] >> shifts) & np.uint64(0x7F)).astype(np.uint8)
+    positions = np.arange(_MAX_VARINT_LENGTH)
+    groups[positions < lengths[:, np.newaxis] - 1] |= 0x80
+    return groups[positions < lengths[:, np.newaxis]].tobytes()
+
+
+def _decode_varints(data, count, offset):
+    # Decode count LEB128 integers from uint8 array starting at offset.
+    # Return decoded integers and offset after them.
+    if count == 0:
+        return np.zeros(0, dtype=np.uint64), offset
+    ends = np.flatnonzero(data[offset:] < 0x80)[:count]
+    if len(ends) < count:
+        raise ValueError("Invalid distribution data.")
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    lengths = ends - starts + 1
+    if np.any(lengths > _MAX_VARINT_LENGTH):
+        raise ValueError("Invalid distribution data.")
+    end = int(ends[-1]) + 1
+    groups = data[offset:][:end].astype(np.uint64) & np.uint64(0x7F)
+    positions = np.arange(end) - np.repeat(starts, lengths)
+    groups <<= (7 * positions).astype(np.uint64)
+    return np.bitwise_or.reduceat(groups, starts), offset + end
@@ -0,0 +1,375 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+from distimate.distributions import (
+    Distribution,
+    _accumulate,
+    _add_histogram,
+    _check_overflow,
+    _get_type,
+    _same_edges,
+    _to_integer_weights,
+)
+from distimate.stats import CDF, PDF, Quantile, mean
+
+# A sparse bucket takes an index and a value, twice as much as a dense bucket.
+# Histograms become dense when more than this fraction of buckets is used,
+# and sparse again when less than half of that is used.
+_DENSITY_THRESHOLD = 0.5
+
+
+class SparseDistribution:
+    """
+    Statistical distribution represented by nonempty histogram buckets.
+
+    Stores indexes and values of nonempty buckets,
+    which takes less memory than :class:`.Distribution`
+    when only a few of many buckets are used.
+    When the histogram fills up, it is converted to a dense array
+    automatically, and back when it becomes sparse after a merge.
+
+    Statistical functions are computed from a temporary dense histogram,
+    so they return same results as for a :class:`.Distribution`
+    with the same histogram. Unlike there, the functions are not cached.
+
+    :param edges: 1-D array-like, ordered histogram edges,
+        or a :class:`.DistributionType`
+    :param values: optional 1-D array-like, histogram,
+        one item longer than *edges*
+    """
+
+    __slots__ = ("_type", "_index", "_values", "_dense")
+
+    def __init__(self, edges, values=None):
+        self._type = _get_type(edges)
+        if values is None:
+            dtype = self._type.dtype
+            self._set_sparse(np.zeros(0, dtype=np.intp), np.zeros(0, dtype))
+            return
+        # Use Distribution to validate the histogram. It can share the array
+        # with the caller, so copy it before it is updated inplace.
+        values = Distribution(self._type, values).values.copy()
+        self._set_dense(values)
+        self._normalize()
+
+    def __repr__(self):
+        name = type(self).__name__
+        return f"<{name}: weight={self.weight:.0f}, buckets={self.bucket_count}>"
+
+    def __eq__(self, other):
+        """Return whether distribution histograms are equal."""
+        if isinstance(other, (Distribution, SparseDistribution)):
+            self._check_compatibility(other)
+            return np.array_equal(self.values, other.values)
+        return NotImplemented
+
+    def __add__(self, other):
+        """Combine this distribution with other distribution."""
+        if isinstance(other, (Distribution, SparseDistribution)):
+            result = self.copy()
+            result += other
+            return result
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __iadd__(self, other):
+        """Combine this distribution with other distribution inplace."""
+        if isinstance(other, SparseDistribution) and other._dense is None:
+            self._check_compatibility(other)
+            self._add_at(other._index, other._values)
+            return self
+        if isinstance(other, Distribution):
+            self._check_compatibility(other)
+            if self._dense is None:
+                self._set_dense(self.values)
+            _add_histogram(self._dense, other.values)
+            self._normalize()
+            return self
+        if isinstance(other, SparseDistribution):
+            self._check_compatibility(other)
+            return self.__iadd__(other.to_dense())
+        return NotImplemented
+
+    @property
+    def edges(self):
+        """
+        Edges of the underlying histogram
+
+        :return: :class: 1-D `numpy.array`, ordered histogram edges
+        """
+        return self._type.edges
+
+    @property
+    def values(self):
+        """
+        Values of the underlying histogram.
+
+        Returns a new dense array for sparse histograms.
+
+        :return: 1-D `numpy.array`, histogram values
+        """
+        if self._dense is not None:
+            return self._dense
+        values = np.zeros(len(self._type.edges) + 1, dtype=self._type.dtype)
+        values[self._index] = self._values
+        return values
+
+    @property
+    def is_sparse(self):
+        """
+        Whether the histogram is stored as sparse.
+
+        :return: bool
+        """
+        return self._dense is None
+
+    @property
+    def bucket_count(self):
+        """
+        Number of nonempty buckets.
+
+        :return: integer
+        """
+        if self._dense is not None:
+            return np.count_nonzero(self._dense)
+        return len(self._index)
+
+    @classmethod
+    def from_samples(cls, edges, samples, weights=None):
+        """
+        Create a distribution from a list of values.
+
+        :param edges: 1-D array-like, ordered histogram edges,
+            or a :class:`.DistributionType`
+        :param samples: 1-D array-like
+        :param weights: optional scalar
+            or 1-D array-like with same length as samples.
+        :return: a new :class:`SparseDistribution`
+        """
+        dist = cls(edges)
+        dist.update(samples, weights)
+        return dist
+
+    @classmethod
+    def from_histogram(cls, edges, histogram):
+        """
+        Create a distribution from a histogram.
+
+        :param edges: 1-D array-like, ordered histogram edges,
+            or a :class:`.DistributionType`
+        :param histogram: 1-D array-like, one item longer than edges
+        :return: a new :class:`SparseDistribution`
+        """
+        return cls(edges, histogram)
+
+    @classmethod
+    def from_distribution(cls, dist):
+        """
+        Create a sparse distribution from a dense one.
+
+        :param dist: :class:`.Distribution`
+        :return: a new :class:`SparseDistribution`
+        """
+        return cls(dist._type, dist.values)
+
+    def copy(self):
+        """
+        Return a copy of this distribution.
+
+        :return: a new :class:`SparseDistribution`
+        """
+        result = type(self).__new__(type(self))
+        result._type = self._type
+        if self._dense is not None:
+            result._set_dense(self._dense.copy())
+        else:
+            result._set_sparse(self._index.copy(), self._values.copy())
+        return result
+
+    def to_dense(self):
+        """
+        Convert this distribution to a dense :class:`.Distribution`.
+
+        :return: a new :class:`.Distribution`
+        """
+        return Distribution(self._type, self.values.copy())
+
+    def to_histogram(self):
+        """
+        Return a histogram of this distribution as a NumPy array.
+
+        :return: 1-D :class:`numpy.array`
+        """
+        return self.values.copy()
+
+    def to_cumulative(self):
+        """
+        Return a cumulative histogram of this distribution as a NumPy array.
+
+        :return: 1-D :class:`numpy.array`
+        """
+        return np.cumsum(self.values)
+
+    def add(self, value, weight=None):
+        """
+        Add a new item to this distribution.
+
+        :param value: item to add
+        :param weight: optional item weight
+        """
+        if np.ndim(value) != 0:
+            raise ValueError("Value must be a scalar.")
+        if weight is None:
+            weight = 1
+        index = self._type.bin_index(value)
+        counter = self._type.dtype.kind != "f"
+        if counter:
+            weight = _to_integer_weights(weight)
+        if self._dense is not None:
+            if counter:
+                _check_overflow(self._dense[index], weight)
+            self._dense[index] += weight
+            return
+        position = self._index.searchsorted(index)
+        if position < len(self._index) and self._index[position] == index:
+            if counter:
+                _check_overflow(self._values[position], weight)
+            self._values[position] += weight
+            return
+        self._index = np.insert(self._index, position, index)
+        self._values = np.insert(self._values, position, weight)
+        self._normalize()
+
+    def update(self, values, weights=None):
+        """
+        Add multiple items to this distribution.
+
+        :param values: items to add, 1-D array-like
+        :param weights: optional scalar or 1-D array-like
+            with same length as samples.
+        """
+        values = np.asarray(values)
+        if values.ndim != 1:
+            raise ValueError("Values must be 1-D array-like.")
+        index = self._type.bin_index(values)
+        if self._dense is not None:
+            _accumulate(self._dense, index, weights)
+            self._normalize()
+            return
+        if weights is None:
+            weights = 1
+        if self._type.dtype.kind == "f":
+            weights = np.broadcast_to(np.asarray(weights, np.float64), index.shape)
+        self._add_at(index, weights)
+
+    @property
+    def weight(self):
+        """
+        Return a total weight of samples in this distribution.
+
+        :return: float number
+        """
+        return self.values.sum()
+
+    @property
+    def mean(self):
+        """
+        Estimate mean of this distribution.
+
+        See :func:`.mean` for details.
+
+        :return: float number
+        """
+        return mean(self.edges, self.values)
+
+    @property
+    def pdf(self):
+        """
+        Probability density function (PDF) of this distribution.
+
+        See :class:`.PDF` for details.
+
+        :return: a :class:`.PDF` instance
+        """
+        return PDF(self.edges, self.values)
+
+    @property
+    def cdf(self):
+        """
+        Cumulative distribution function (CDF) of this distribution.
+
+        See :class:`.CDF` for details.
+
+        :return: a :class:`.CDF` instance
+        """
+        return CDF(self.edges, self.values)
+
+    @property
+    def quantile(self):
+        """
+        Quantile function of this distribution.
+
+        See :class:`.Quantile` for details.
+
+        :return: a :class:`.Quantile` instance
+        """
+        return Quantile(self.edges, self.values)
+
+    def _add_at(self, index, weights):
+        # Add weights to sparse buckets.
+        # Existing values go first, so bincount sums each bucket
+        # in same order as np.add.at on a dense histogram.
+        all_index = np.concatenate([self._index, index])
+        unique, inverse = np.unique(all_index, return_inverse=True)
+        inverse = inverse.ravel()
+        if self._type.dtype == np.float64:
+            all_weights = np.concatenate([self._values, weights])
+            values = np.bincount(inverse, all_weights, minlength=len(unique))
+        else:
+            # Bincount sums in float64, so other types are accumulated
+            # as in dense histograms, integer counters with overflow checks.
+            count = len(self._index)
+            values = np.zeros(len(unique), dtype=self._type.dtype)
+            values[inverse[:count]] = self._values
+            _accumulate(values, inverse[count:], weights)
+        nonzero = values != 0
+        self._set_sparse(unique[nonzero], values[nonzero])
+        self._normalize()
+
+    def _normalize(self):
+        # Choose the representation by density.
+        limit = _DENSITY_THRESHOLD * (len(self._type.edges) + 1)
+        if self._dense is None:
+            if len(self._index) > limit:
+                self._set_dense(self.values)
+        elif np.count_nonzero(self._dense) < limit / 2:
+            index = np.flatnonzero(self._dense)
+            self._set_sparse(index, self._dense[index])
+
+    def _set_dense(self, values):
+        self._dense = values
+        self._index = None
+        self._values = None
+
+    def _set_sparse(self, index, values):
+        self._dense = None
+        self._index = index
+        self._values = values
+
+    def _check_compatibility(self, dist):
+        if not _same_edges(dist.edges, self.edges):
+            raise ValueError("Distributions have different edges.")
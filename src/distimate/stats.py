@@ -14,6 +14,8 @@
 
 import numpy as np
 
+from distimate import kernels
+
 interp_right = np.interp
 
 
@@ -41,6 +43,119 @@ def interp_middle(v, xp, fp, left=None, right=None):
     return (low + high) / 2
 
 
+def _searchsorted_rows(a, v, side="left"):
+    """
+    Like :func:`numpy.searchsorted` but for each row of a 2-D array.
+
+    Runs a binary search for all rows and all values at once.
+
+    :param a: 2-D array, each row sorted
+    :param v: 1-D array, values to find
+    :param side: "left" or "right"
+    :return: 2-D array of shape ``(len(a), len(v))``
+    """
+    rows, size = a.shape
+    lo = np.zeros((rows, len(v)), dtype=np.intp)
+    hi = np.full((rows, len(v)), size, dtype=np.intp)
+    # Indexing a flat array is faster than indexing by (row, column) pairs.
+    flat = np.ravel(a)
+    offset = np.arange(rows)[:, np.newaxis] * size
+    while True:
+        active = lo < hi
+        if not active.any():
+            return lo
+        mid = (lo + hi) // 2
+        pivot = flat[offset + np.minimum(mid, size - 1)]
+        if side == "right":
+            after = pivot <= v
+        else:
+            after = pivot < v
+        lo = np.where(active & after, mid + 1, lo)
+        hi = np.where(active & ~after, mid, hi)
+
+
+def _interp_rows(v, xp, fp, left, right, lowest=False):
+    """
+    Like :func:`numpy.interp` but for each row of a 2-D array.
+
+    Computes same values as :func:`numpy.interp` called for each row.
+    If *lowest* is true, computes same values as :func:`interp_left`.
+
+    :param v: 1-D array, values to interpolate at
+    :param xp: 1-D array shared by all rows, or 2-D array with one row per function
+    :param fp: 1-D array shared by all rows, or 2-D array with one row per function
+    :param left: 1-D array, function value for inputs below ``xp[0]``
+    :param right: 1-D array, function value for inputs above ``xp[-1]``
+    :param lowest: whether to use lowest of equal xp values
+    :return: 2-D array of shape ``(len(left), len(v))``
+    """
+    rows = len(left)
+    size = xp.shape[-1]
+    offset = np.arange(rows)[:, np.newaxis] * size
+
+    def take(a, index):
+        return a[index] if a.ndim == 1 else np.ravel(a)[offset + index]
+
+    side = "left" if lowest else "right"
+    if xp.ndim == 1:
+        index = np.searchsorted(xp, v, side=side)[np.newaxis, :]
+    else:
+        index = _searchsorted_rows(xp, v, side=side)
+    if lowest:
+        # Same as numpy.interp with negated and reversed xp:
+        # Interpolate from the first xp greater than or equal to v.
+        anchor = np.minimum(index, size - 1)
+        other = np.maximum(anchor - 1, 0)
+        x_anchor, x_other = take(xp, anchor), take(xp, other)
+        y_anchor, y_other = take(fp, anchor), take(fp, other)
+        below, above = index == 0, index == size
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = (y_other - y_anchor) / (x_anchor - x_other)
+            result = slope * (x_anchor - v) + y_anchor
+            retry = slope * (x_other - v) + y_other
+    else:
+        # Interpolate from the last xp less than or equal to v.
+        anchor = np.maximum(index - 1, 0)
+        other = np.minimum(anchor + 1, size - 1)
+        x_anchor, x_other = take(xp, anchor), take(xp, other)
+        y_anchor, y_other = take(fp, anchor), take(fp, other)
+        below, above = index == 0, index == size
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = (y_other - y_anchor) / (x_other - x_anchor)
+            result = slope * (v - x_anchor) + y_anchor
+            retry = slope * (v - x_other) + y_other
+    # Repeat the NaN fallbacks of numpy.interp.
+    result = np.where(np.isnan(result), retry, result)
+    result = np.where(np.isnan(result) & (y_anchor == y_other), y_anchor, result)
+    result = np.where((x_anchor == v) | (anchor == other), y_anchor, result)
+    result = np.where(below & (v < x_anchor), left[:, np.newaxis], result)
+    result = np.where(above & (v > x_anchor), right[:, np.newaxis], result)
+    result = np.broadcast_to(result, (rows, len(v))).copy()
+    result[:, np.isnan(v)] = np.nan
+    return result
+
+
+def _interp_rows_middle(v, xp, fp, left, right):
+    """Return a midpoint between lowest and highest ``_interp_rows`` values."""
+    if kernels._use_kernels(len(left) * len(v)):
+        return kernels.interp_rows_middle(v, xp, fp, left, right)
+    low = _interp_rows(v, xp, fp, left, right, lowest=True)
+    high = _interp_rows(v, xp, fp, left, right)
+    return (low + high) / 2
+
+
+def _evaluate_rows(func, edges, hist, v):
+    # Evaluate a row-wise function for one or more histograms and inputs.
+    # The result has shape hist.shape[:-1] + np.shape(v).
+    edges = np.asarray(edges)
+    hist = np.asarray(hist)
+    v = np.asarray(v, dtype=np.float64)
+    shape = hist.shape[:-1] + v.shape
+    hist = hist.reshape(-1, hist.shape[-1])
+    result = func(edges, hist, v.ravel())
+    return result.reshape(shape)[()]
+
+
 class _StatsFunction:
     """
     Statistical function.
@@ -49,7 +164,7 @@ class _StatsFunction:
     or can be called for approximating value at an arbitrary point.
     """
 
-    __slots__ = ("_x", "_y", "_left", "_right", "_interp")
+    __slots__ = ("_x", "_y", "_left", "_right", "_interp", "_forward", "_backward")
 
     def __init__(self, x, y, *, left=np.nan, right=np.nan, interp=interp_right):
         self._x = x
@@ -57,15 +172,43 @@ class _StatsFunction:
         self._left = left
         self._right = right
         self._interp = interp
+        # Prepare arrays for np.interp once, so that calls do not
+        # convert them, or reverse them for the interp_left().
+        xp = np.asarray(x, dtype=np.float64)
+        fp = np.asarray(y, dtype=np.float64)
+        self._forward = None
+        self._backward = None
+        if interp is interp_right or interp is interp_middle:
+            self._forward = xp, fp
+        if interp is interp_left or interp is interp_middle:
+            self._backward = -xp[::-1], np.ascontiguousarray(fp[::-1])
 
     def __call__(self, v):
         """
         Compute function value at the given point.
 
+        Arrays are evaluated at once.
+        Sorted arrays are evaluated faster than unsorted,
+        because each search in *x* starts from the previous result.
+
         :param v: scalar value or Numpy array-like
         :return: scalar value or Numpy array depending on *x*
         """
-        return self._interp(v, self._x, self._y, left=self._left, right=self._right)
+        if self._forward is None and self._backward is None:
+            return self._interp(v, self._x, self._y, left=self._left, right=self._right)
+        v = np.asarray(v)
+        high = low = None
+        if self._forward is not None:
+            xp, fp = self._forward
+            high = np.interp(v, xp, fp, left=self._left, right=self._right)
+        if self._backward is not None:
+            xp, fp = self._backward
+            low = np.interp(-v, xp, fp, left=self._right, right=self._left)
+        if high is None:
+            return low
+        if low is None:
+            return high
+        return (low + high) / 2
 
     @property
     def x(self):
@@ -94,22 +237,32 @@ def mean(edges, hist):
     - Return NaN if the rightmost bin is not empty
       (because we cannot approximate outliers).
 
+    When called with a 2-D array of histograms (one per row),
+    returns an array with one mean per row.
+
     :param edges: 1-D array-like, ordered histogram edges
-    :param hist: 1-D array-like, one item longer than edges
-    :return: float number
+    :param hist: 1-D array-like, one item longer than edges,
+        or 2-D array-like with one histogram per row
+    :return: float number or 1-D :class:`numpy.array`
     """
     edges = np.asarray(edges)
     hist = np.asarray(hist)
-    total = hist.sum()
-    if total == 0 or hist[-1] != 0:
+    total = hist.sum(axis=-1)
+    if hist.ndim == 1 and (total == 0 or hist[-1] != 0):
         return np.nan
     # For example, if edges are 0, 10, 100
     # then buckets are [0, 0], (0, 10], (10, 100].
     # So left = [0, 0, 10] and right = [0, 10, 100].
-    left = np.r_[edges[0], edges[:-1]]
+    left = np.concatenate([edges[:1], edges[:-1]])
     right = edges
     middle = (left + right) / 2
-    return np.sum(hist[:-1] * middle) / total
+    if hist.ndim == 1:
+        # A single histogram does not need masked division of rows.
+        return (hist[:-1] * middle).sum() / total
+    valid = (total != 0) & (hist[..., -1] == 0)
+    result = np.full(np.shape(total), np.nan)
+    np.divide(np.sum(hist[..., :-1] * middle, axis=-1), total, out=result, where=valid)
+    return result[()]
 
 
 class PDF(_StatsFunction):
@@ -210,9 +363,19 @@ class CDF(_StatsFunction):
     __slots__ = ()
 
     def __init__(self, edges, hist):
-        edges = np.asarray(edges)
         hist = np.asarray(hist)
-        cumulative = np.cumsum(hist, dtype=np.float64)
+        self._init(edges, hist, np.cumsum(hist, dtype=np.float64))
+
+    @classmethod
+    def _from_cumulative(cls, edges, hist, cumulative):
+        # Create the function from a precomputed cumulative histogram.
+        self = cls.__new__(cls)
+        self._init(edges, np.asarray(hist), cumulative)
+        return self
+
+    def _init(self, edges, hist, cumulative):
+        edges = np.asarray(edges)
+        cumulative = np.asarray(cumulative, dtype=np.float64)
         if cumulative[-1] == 0:
             # When we have no samples then the function is undefined.
             y = np.full_like(edges, np.nan, dtype=np.float64)
@@ -255,9 +418,19 @@ class Quantile(_StatsFunction):
     __slots__ = ()
 
     def __init__(self, edges, hist):
-        edges = np.asarray(edges)
         hist = np.asarray(hist)
-        cumulative = np.cumsum(hist, dtype=np.float64)
+        self._init(edges, hist, np.cumsum(hist, dtype=np.float64))
+
+    @classmethod
+    def _from_cumulative(cls, edges, hist, cumulative):
+        # Create the function from a precomputed cumulative histogram.
+        self = cls.__new__(cls)
+        self._init(edges, np.asarray(hist), cumulative)
+        return self
+
+    def _init(self, edges, hist, cumulative):
+        edges = np.asarray(edges)
+        cumulative = np.asarray(cumulative, dtype=np.float64)
         if cumulative[-2] == 0:
             # When we have no samples then the function is undefined.
             # In addition to that, the function is also undefined
@@ -277,3 +450,111 @@ class Quantile(_StatsFunction):
             x = x_all[mask]
             y = y_all[mask]
         super().__init__(x, y, interp=interp_middle)
+
+
+def _pdf_rows(edges, hist, v):
+    total = hist.sum(axis=1)
+    valid = total != 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        body = hist[:, 1:-1] / np.diff(edges) / total[:, np.newaxis]
+    # Buckets are left-open, so the PDF value at an edge
+    # is given by the bucket left of that edge, as in PDF.
+    head = np.where(hist[:, 0] == 0, 0, np.nan)
+    tail = np.where(hist[:, -1] == 0, 0, np.nan)
+    table = np.c_[head, body, tail]
+    table[~valid] = np.nan
+    index = np.searchsorted(edges, v)
+    result = table[:, index]
+    result[:, v < edges[0]] = 0
+    result[:, np.isnan(v)] = np.nan
+    return result
+
+
+def _cdf_rows(edges, hist, v):
+    cumulative = np.cumsum(hist, axis=1, dtype=np.float64)
+    total = cumulative[:, -1:]
+    valid = total[:, 0] != 0
+    y = np.full((len(hist), len(edges)), np.nan)
+    np.divide(cumulative[:, :-1], total, out=y, where=valid[:, np.newaxis])
+    left = np.zeros(len(hist))
+    right = np.where(valid & (hist[:, -1] == 0), 1, np.nan)
+    return _interp_rows(v, edges.astype(np.float64), y, left, right)
+
+
+def _quantile_rows(edges, hist, q):
+    rows = len(hist)
+    cumulative = np.cumsum(hist, axis=1, dtype=np.float64)
+    total = cumulative[:, -1:]
+    # The function is undefined with no samples in the inner buckets.
+    valid = cumulative[:, -2] != 0
+    # Same points as in Quantile, but without removing vertical chains.
+    # Points inside vertical chains do not change the result, because equal x
+    # values are resolved to the first or the last point of a chain.
+    # Heading and trailing chains are removed in Quantile,
+    # so we move them out of the <0, 1> range instead.
+    x = np.zeros((rows, len(edges) + 2))
+    np.divide(cumulative[:, :-1], total, out=x[:, 1:-1], where=valid[:, np.newaxis])
+    x[:, -1] = 1
+    y = np.r_[edges[0], edges, np.nan]
+    nonempty = hist != 0
+    first = np.argmax(nonempty, axis=1)
+    last = hist.shape[1] - np.argmax(nonempty[:, ::-1], axis=1)
+    point = np.arange(x.shape[1])
+    x[point < first[:, np.newaxis]] = -np.inf
+    x[point > last[:, np.newaxis]] = np.inf
+    nan = np.full(rows, np.nan)
+    result = _interp_rows_middle(q, x, y, nan, nan)
+    result[:, (q < 0) | (q > 1)] = np.nan
+    result[~valid] = np.nan
+    return result
+
+
+def pdf(edges, hist, v):
+    """
+    Compute PDF values for one or more histograms at once.
+
+    Returns same values as calling :class:`PDF` for each histogram,
+    but processes all histograms in one pass.
+
+    :param edges: 1-D array-like, ordered histogram edges
+    :param hist: 1-D array-like, one item longer than edges,
+        or 2-D array-like with one histogram per row
+    :param v: scalar value or 1-D array-like
+    :return: scalar value or :class:`numpy.array`
+        of shape ``hist.shape[:-1] + np.shape(v)``
+    """
+    return _evaluate_rows(_pdf_rows, edges, hist, v)
+
+
+def cdf(edges, hist, v):
+    """
+    Compute CDF values for one or more histograms at once.
+
+    Returns same values as calling :class:`CDF` for each histogram,
+    but processes all histograms in one pass.
+
+    :param edges: 1-D array-like, ordered histogram edges
+    :param hist: 1-D array-like, one item longer than edges,
+        or 2-D array-like with one histogram per row
+    :param v: scalar value or 1-D array-like
+    :return: scalar value or :class:`numpy.array`
+        of shape ``hist.shape[:-1] + np.shape(v)``
+    """
+    return _evaluate_rows(_cdf_rows, edges, hist, v)
+
+
+def quantile(edges, hist, q):
+    """
+    Compute quantile values for one or more histograms at once.
+
+    Returns same values as calling :class:`Quantile` for each histogram,
+    but processes all histograms in one pass.
+
+    :param edges: 1-D array-like, ordered histogram edges
+    :param hist: 1-D array-like, one item longer than edges,
+        or 2-D array-like with one histogram per row
+    :param q: scalar value or 1-D array-like
+    :return: scalar value or :class:`numpy.array`
+        of shape ``hist.shape[:-1] + np.shape(q)``
+    """
+    return _evaluate_rows(_quantile_rows, edges, hist, q)
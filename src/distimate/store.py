@@ -0,0 +1,311 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import struct
+
+import numpy as np
+
+from distimate import stats
+from distimate.arrays import DistributionArray
+from distimate.distributions import (
+    _add_histogram,
+    _get_type,
+    _is_counter,
+    _same_edges,
+    _to_counters,
+)
+
+# Header: magic, version, number of edges, dtype of rows; followed by edges.
+_HEADER = struct.Struct("<8sII4s")
+_MAGIC = b"DISTSTOR"
+_VERSION = 2
+
+_EDGES_DTYPE = np.dtype("<f8")
+
+# Number of rows processed at once by range queries.
+_CHUNK_ROWS = 2 ** 14
+
+
+class DistributionStore:
+    """
+    File-backed append-only store of distributions.
+
+    The file starts with a header holding histogram edges and dtype,
+    followed by histograms stored as fixed-width rows.
+    Rows are accessed using a memory-mapped array,
+    so opening a store does not read its rows,
+    and queries read only pages with the requested rows.
+
+    If the file does not exist, a new store is created for *dist_type*.
+    If the file exists, its edges and dtype must match *dist_type* (if given).
+    A store with an incomplete last row, left by an interrupted append,
+    cannot be opened or appended to.
+
+    The store is not safe for concurrent writers.
+
+    :param path: path to the store file
+    :param dist_type: optional :class:`.DistributionType` or
+        1-D array-like with histogram edges, required for new stores
+    """
+
+    __slots__ = ("_path", "_type", "_dtype", "_offset", "_rows")
+
+    def __init__(self, path, dist_type=None):
+        self._path = os.fspath(path)
+        if dist_type is not None:
+            dist_type = _get_type(dist_type)
+        exists = os.path.exists(self._path)
+        if exists:
+            edges, dtype = self._read_header()
+            if dist_type is None:
+                dist_type = _get_type(edges).with_dtype(dtype)
+            elif not _same_edges(dist_type.edges, edges):
+                raise ValueError("Distributions have different edges.")
+            elif dist_type.dtype != dtype:
+                raise ValueError("Distributions have different dtypes.")
+        elif dist_type is None:
+            raise ValueError("Distribution type is required for a new store.")
+        else:
+            self._write_header(dist_type.edges, dist_type.dtype)
+        self._type = dist_type
+        self._dtype = dist_type.dtype.newbyteorder("<")
+        self._offset = _HEADER.size + _EDGES_DTYPE.itemsize * len(dist_type.edges)
+        self._rows = None
+        if exists:
+            self._count_rows()
+
+    def __repr__(self):
+        name = type(self).__name__
+        return f"<{name}: {self._path!r}, size={len(self)}>"
+
+    def __len__(self):
+        return len(self._get_rows())
+
+    def __getitem__(self, item):
+        """
+        Return a distribution or a subset of distributions.
+
+        Integer returns a :class:`.Distribution` with a copy of the histogram.
+        Slices, integer arrays and boolean masks return
+        a :class:`.DistributionArray` with histograms read from the file.
+        """
+        rows = self._get_rows()
+        if np.ndim(item) == 0 and not isinstance(item, slice):
+            return self._type.from_histogram(np.array(rows[item], self._type.dtype))
+        return DistributionArray(self._type.edges, np.array(rows[item], np.float64))
+
+    @property
+    def path(self):
+        """
+        Path to the store file.
+
+        :return: string
+        """
+        return self._path
+
+    @property
+    def dist_type(self):
+        """
+        Type of stored distributions.
+
+        :return: :class:`.DistributionType`
+        """
+        return self._type
+
+    @property
+    def edges(self):
+        """
+        Edges of the stored histograms
+
+        :return: :class: 1-D `numpy.array`, ordered histogram edges
+        """
+        return self._type.edges
+
+    def append(self, dist):
+        """
+        Append a distribution to the end of the store.
+
+        :param dist: :class:`.Distribution` with same edges
+        """
+        self._check_compatibility(dist)
+        self._write_rows(dist.values[np.newaxis])
+
+    def extend(self, dists):
+        """
+        Append multiple distributions to the end of the store.
+
+        :param dists: :class:`.DistributionArray`
+            or iterable of :class:`.Distribution` instances
+        """
+        if isinstance(dists, DistributionArray):
+            self._check_compatibility(dists)
+            values = dists.values
+        else:
+            # Histograms are not stacked to a float array,
+            # so that large integer counters stay exact.
+            dists = list(dists)
+            for dist in dists:
+                self._check_compatibility(dist)
+            values = np.zeros((len(dists), len(self.edges) + 1), self._type.dtype)
+            for row, dist in zip(values, dists):
+                _add_histogram(row, dist.values)
+        self._write_rows(values)
+
+    def sum(self, start=None, stop=None):
+        """
+        Merge distributions in a range of rows.
+
+        :param start: optional first row
+        :param stop: optional row after the last one
+        :return: a new :class:`.Distribution`
+        """
+        values = np.zeros(len(self._type.edges) + 1, dtype=self._type.dtype)
+        for chunk in self._iter_chunks(start, stop, self._type.dtype):
+            _add_histogram(values, _sum_rows(chunk))
+        return self._type.from_histogram(values)
+
+    def pdf(self, v, start=None, stop=None):
+        """
+        Compute PDF of distributions in a range of rows.
+
+        See :func:`.stats.pdf` for details.
+
+        :param v: scalar value or 1-D array-like
+        :param start: optional first row
+        :param stop: optional row after the last one
+        :return: :class:`numpy.array` with one row per distribution
+        """
+        return self._evaluate(stats.pdf, v, start, stop)
+
+    def cdf(self, v, start=None, stop=None):
+        """
+        Compute CDF of distributions in a range of rows.
+
+        See :func:`.stats.cdf` for details.
+
+        :param v: scalar value or 1-D array-like
+        :param start: optional first row
+        :param stop: optional row after the last one
+        :return: :class:`numpy.array` with one row per distribution
+        """
+        return self._evaluate(stats.cdf, v, start, stop)
+
+    def quantile(self, q, start=None, stop=None):
+        """
+        Compute quantile function of distributions in a range of rows.
+
+        See :func:`.stats.quantile` for details.
+
+        :param q: scalar value or 1-D array-like
+        :param start: optional first row
+        :param stop: optional row after the last one
+        :return: :class:`numpy.array` with one row per distribution
+        """
+        return self._evaluate(stats.quantile, q, start, stop)
+
+    def _evaluate(self, func, v, start, stop):
+        v = np.asarray(v, dtype=np.float64)
+        edges = self._type.edges
+        results = [func(edges, chunk, v) for chunk in self._iter_chunks(start, stop)]
+        if not results:
+            return np.zeros((0,) + v.shape)
+        return np.concatenate(results)
+
+    def _iter_chunks(self, start, stop, dtype=np.float64):
+        # Yield histograms from a range of rows in chunks,
+        # so that memory does not grow with length of the range.
+        rows = self._get_rows()
+        start, stop, _ = slice(start, stop).indices(len(rows))
+        for chunk_start in range(start, stop, _CHUNK_ROWS):
+            chunk_stop = min(chunk_start + _CHUNK_ROWS, stop)
+            yield np.asarray(rows[chunk_start:chunk_stop], dtype=dtype)
+
+    def _count_rows(self):
+        # An interrupted append can leave a partial row at the end of the file.
+        # Rows after it would be misaligned, so the store is not usable.
+        size = os.path.getsize(self._path) - self._offset
+        count, remainder = divmod(size, self._dtype.itemsize * (len(self.edges) + 1))
+        if remainder:
+            raise ValueError("Distribution store ends with an incomplete row.")
+        return count
+
+    def _get_rows(self):
+        if self._rows is None:
+            size = len(self._type.edges) + 1
+            count = self._count_rows()
+            if count == 0:
+                # Empty files cannot be memory-mapped.
+                self._rows = np.zeros((0, size), dtype=self._dtype)
+            else:
+                shape = (count, size)
+                self._rows = np.memmap(
+                    self._path,
+                    dtype=self._dtype,
+                    mode="r",
+                    offset=self._offset,
+                    shape=shape,
+                )
+        return self._rows
+
+    def _write_rows(self, values):
+        if self._dtype.kind in "iu":
+            values = _to_counters(values, self._dtype)
+        data = np.ascontiguousarray(values, dtype=self._dtype).tobytes()
+        self._count_rows()
+        with open(self._path, "ab") as f:
+            f.write(data)
+        # The file has grown, it will be mapped again.
+        self._rows = None
+
+    def _read_header(self):
+        with open(self._path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise ValueError("Invalid distribution store.")
+            magic, version, count, dtype = _HEADER.unpack(header)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError("Invalid distribution store.")
+            data = f.read(_EDGES_DTYPE.itemsize * count)
+            if len(data) < _EDGES_DTYPE.itemsize * count:
+                raise ValueError("Invalid distribution store.")
+        try:
+            dtype = np.dtype(dtype.rstrip(b"\0").decode("ascii"))
+        except (TypeError, UnicodeDecodeError):
+            raise ValueError("Invalid distribution store.") from None
+        if dtype.kind not in "iuf":
+            raise ValueError("Invalid distribution store.")
+        edges = np.frombuffer(data, dtype=_EDGES_DTYPE).astype(np.float64)
+        return edges, dtype.newbyteorder("=")
+
+    def _write_header(self, edges, dtype):
+        # Rows are little-endian, like the header, for example "<u4".
+        code = dtype.newbyteorder("<").str.encode("ascii")
+        with open(self._path, "xb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, len(edges), code))
+            f.write(np.ascontiguousarray(edges, dtype=_EDGES_DTYPE).tobytes())
+
+    def _check_compatibility(self, other):
+        if not _same_edges(other.edges, self._type.edges):
+            raise ValueError("Distributions have different edges.")
+
+
+def _sum_rows(chunk):
+    # Sum histograms in rows, integer counters are summed exactly.
+    if not _is_counter(chunk):
+        return chunk.sum(axis=0, dtype=np.float64)
+    if int(np.max(chunk, initial=0)) * len(chunk) <= np.iinfo(np.uint64).max:
+        return chunk.sum(axis=0, dtype=np.uint64)
+    # Python integers do not overflow.
+    return chunk.astype(object).sum(axis=0)
@@ -12,24 +12,73 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
+import weakref
+
 import numpy as np
 
-from distimate.distributions import Distribution
+from distimate import serialization
+from distimate.arrays import DistributionArray
+from distimate.distributions import (
+    Distribution,
+    _intern_edges,
+    _is_counter,
+    _merge_histograms,
+)
+
+# Rebin maps cached by source and target types while both types exist.
+# Cached outside of types, so that types stay picklable.
+_rebin_maps = weakref.WeakKeyDictionary()
 
 
 class DistributionType:
     """
     Factory for creating distributions with constant histogram edges.
 
+    Distribution types created from hand-written edges find buckets
+    for samples using a binary search in edges.
+    Types created by :meth:`linear`, :meth:`exponential`
+    or :meth:`log_linear` compute bucket indexes arithmetically,
+    which takes constant time per sample.
+
+    Histogram values of created distributions are stored as *dtype*.
+    Float64 counters support any weights.
+    Integer counters take less memory (``uint32``) or count exactly
+    beyond 2**53 (``int64``), but accept only non-negative integer weights
+    and raise :class:`OverflowError` instead of wrapping around.
+    Float32 counters halve memory of approximate weighted histograms,
+    but they count exactly only up to 2**24.
+    Histograms in a :class:`.DistributionArray` are always float64.
+
+    Edges are copied to a read-only array that is shared by all types
+    and distributions with equal edges, so merging distributions
+    checks compatibility of their edges by identity.
+
     :param edges: 1-D array-like, ordered histogram edges
+    :param dtype: optional NumPy dtype of histogram values,
+        an integer or floating type, defaults to float64
     """
 
-    __slots__ = ("_edges",)
+    __slots__ = ("_edges", "_dtype", "_fingerprint", "__weakref__")
 
     _dist_cls = Distribution
+    _array_cls = DistributionArray
+
+    def __init__(self, edges, dtype=None):
+        self._edges = _intern_edges(edges)
+        if dtype is None:
+            dtype = self._dist_cls._dtype
+        self._dtype = np.dtype(dtype)
+        if self._dtype.kind not in "iuf":
+            raise ValueError("Histogram dtype must be an integer or float type.")
+        self._fingerprint = None
 
-    def __init__(self, edges):
-        self._edges = np.asarray(edges)
+    def __setstate__(self, state):
+        # Unpickled edges are a private copy, so they are interned again.
+        _, slots = state
+        for name, value in slots.items():
+            setattr(self, name, value)
+        self._edges = _intern_edges(self._edges)
 
     @property
     def edges(self):
@@ -40,13 +89,153 @@ class DistributionType:
         """
         return self._edges
 
+    @property
+    def dtype(self):
+        """
+        Type of histogram values
+
+        :return: :class:`numpy.dtype`
+        """
+        return self._dtype
+
+    @property
+    def fingerprint(self):
+        """
+        Fingerprint of histogram edges used in serialized distributions.
+
+        :return: :class:`bytes`
+        """
+        if self._fingerprint is None:
+            self._fingerprint = serialization.fingerprint(self._edges)
+        return self._fingerprint
+
+    @classmethod
+    def linear(cls, start, stop, count, *, dtype=None):
+        """
+        Create a distribution type with evenly spaced edges.
+
+        Edges are same as from :func:`numpy.linspace`.
+
+        :param start: the first edge
+        :param stop: the last edge
+        :param count: number of edges, at least two
+        :param dtype: optional NumPy dtype of histogram values
+        :return: a new :class:`DistributionType`
+        """
+        return _LinearDistributionType(start, stop, count, dtype)
+
+    @classmethod
+    def exponential(cls, start, stop, count, *, dtype=None):
+        """
+        Create a distribution type with edges spaced evenly on a log scale.
+
+        Edges are same as from :func:`numpy.geomspace`,
+        each edge is *factor* times greater than the previous one.
+
+        Quantiles of samples between *start* and *stop*
+        are estimated with a relative error at most ``factor - 1``.
+
+        :param start: the first edge, a positive number
+        :param stop: the last edge, greater than *start*
+        :param count: number of edges, at least two
+        :param dtype: optional NumPy dtype of histogram values
+        :return: a new :class:`DistributionType`
+        """
+        return _ExponentialDistributionType(start, stop, count, dtype)
+
+    @classmethod
+    def log_linear(cls, start, stop, subbuckets, *, dtype=None):
+        """
+        Create a distribution type with log-linear edges.
+
+        Edges split each power-of-two interval ``[2**k, 2**(k + 1)]``
+        to *subbuckets* buckets of same width.
+        This layout is used by HDR histograms and similar sketches.
+        Edges cover the interval from *start* to *stop*,
+        rounded to powers of two.
+
+        Quantiles of samples between *start* and *stop*
+        are estimated with a relative error at most ``1 / subbuckets``.
+
+        :param start: a positive number, a lower bound of the first edge
+        :param stop: an upper bound of the last edge, greater than *start*
+        :param subbuckets: number of buckets in each power-of-two interval
+        :param dtype: optional NumPy dtype of histogram values
+        :return: a new :class:`DistributionType`
+        """
+        return _LogLinearDistributionType(start, stop, subbuckets, dtype)
+
+    def with_dtype(self, dtype):
+        """
+        Return a distribution type with same edges and other histogram dtype.
+
+        :param dtype: NumPy dtype of histogram values
+        :return: a :class:`DistributionType`, this one if dtype does not change
+        """
+        dtype = np.dtype(dtype)
+        if dtype == self._dtype:
+            return self
+        if dtype.kind not in "iuf":
+            raise ValueError("Histogram dtype must be an integer or float type.")
+        # Copy keeps arithmetic layouts of subclasses.
+        result = copy.copy(self)
+        result._dtype = dtype
+        return result
+
+    def _rebin(self, values, target):
+        """
+        Rebin histograms with edges of this type to edges of target type.
+
+        :param values: 1-D or 2-D array, histograms in last axis
+        :param target: :class:`DistributionType`
+        :return: float64 :class:`numpy.array` with target histograms,
+            uint64 if integer histograms are translated exactly
+        """
+        target_maps = _rebin_maps.get(self)
+        if target_maps is None:
+            target_maps = _rebin_maps[self] = weakref.WeakKeyDictionary()
+        rebin_map = target_maps.get(target)
+        if rebin_map is None:
+            rebin_map = _rebin_map(self._edges, target.edges)
+            target_maps[target] = rebin_map
+        rows, cols, weights = rebin_map
+        size = len(target.edges) + 1
+        if _is_counter(values) and np.all(weights == 1):
+            # Bincount sums in float64, which would round large counters.
+            totals = values.sum(axis=-1, dtype=np.float64)
+            if np.any(totals >= 2.0 ** 64):
+                raise OverflowError("Histogram values overflow uint64.")
+            result = np.zeros(values.shape[:-1] + (size,), dtype=np.uint64)
+            np.add.at(result.T, cols, values[..., rows].T.astype(np.uint64))
+            return result
+        if values.ndim == 1:
+            return np.bincount(cols, values[rows] * weights, minlength=size)
+        # Indexes to a flattened result allow to rebin all rows by one bincount.
+        count = len(values)
+        index = (np.arange(count)[:, np.newaxis] * size + cols).ravel()
+        contributions = (values[:, rows] * weights).ravel()
+        result = np.bincount(index, contributions, minlength=count * size)
+        return result.reshape(count, size)
+
+    def bin_index(self, values):
+        """
+        Return indexes of histogram buckets for samples.
+
+        Buckets include their right edge, so the result is same
+        as from :meth:`numpy.ndarray.searchsorted` called on edges.
+
+        :param values: scalar or array-like samples
+        :return: :class:`numpy.array` of bucket indexes
+        """
+        return self._edges.searchsorted(values)
+
     def empty(self):
         """
         Create an empty distribution.
 
         :return: a new :class:`Distribution`
         """
-        return self._dist_cls(self._edges)
+        return self._dist_cls(self)
 
     def from_samples(self, samples, weights=None):
         """
@@ -56,7 +245,7 @@ class DistributionType:
         :param weights: optional 1-D array-like
         :return: a new :class:`Distribution`
         """
-        return self._dist_cls.from_samples(self._edges, samples, weights)
+        return self._dist_cls.from_samples(self, samples, weights)
 
     def from_histogram(self, histogram):
         """
@@ -65,7 +254,7 @@ class DistributionType:
         :param histogram: 1-D array-like
         :return: a new :class:`Distribution`
         """
-        return self._dist_cls.from_histogram(self._edges, histogram)
+        return self._dist_cls.from_histogram(self, histogram)
 
     def from_cumulative(self, cumulative):
         """
@@ -74,4 +263,231 @@ class DistributionType:
         :param cumulative: 1-D array-like
         :return: a new :class:`Distribution`
         """
-        return self._dist_cls.from_cumulative(self._edges, cumulative)
+        return self._dist_cls.from_cumulative(self, cumulative)
+
+    def merge(self, dists, *, pairwise=False):
+        """
+        Merge many distributions to a new one.
+
+        See :meth:`.Distribution.merge_all` for details.
+        Unlike there, *dists* can be empty.
+        The result has dtype of this type.
+
+        :param dists: iterable of distributions with same edges
+        :param pairwise: whether to use pairwise summation
+        :return: a new :class:`Distribution`
+        """
+        values = _merge_histograms(self, dists, pairwise)
+        return self._dist_cls(self, values)
+
+    def from_bytes(self, data):
+        """
+        Create a distribution from bytes.
+
+        See :meth:`.Distribution.from_bytes` for details.
+
+        :param data: bytes-like object
+        :return: a new :class:`Distribution`
+        """
+        return self._dist_cls.from_bytes(self, data)
+
+    def empty_array(self, size):
+        """
+        Create an array of empty distributions.
+
+        :param size: number of distributions
+        :return: a new :class:`.DistributionArray`
+        """
+        values = np.zeros((size, len(self._edges) + 1), dtype=self._array_cls._dtype)
+        return self._array_cls(self._edges, values)
+
+    def from_grouped_samples(self, keys, samples, weights=None):
+        """
+        Create one distribution for each unique key from samples.
+
+        Equivalent to calling :meth:`from_samples` with samples of each key,
+        but all histograms are computed at once.
+
+        :param keys: 1-D array-like, a key of each sample
+        :param samples: 1-D array-like
+        :param weights: optional scalar or 1-D array-like
+            with same length as samples.
+        :return: a tuple of sorted unique keys as :class:`numpy.array`
+            and a :class:`.DistributionArray` with one distribution per key
+        """
+        keys = np.asarray(keys)
+        samples = np.asarray(samples)
+        if keys.ndim != 1 or samples.ndim != 1:
+            raise ValueError("Keys and samples must be 1-D array-like.")
+        if len(keys) != len(samples):
+            raise ValueError("Keys and samples must have same length.")
+        if weights is not None and np.ndim(weights) == 0:
+            # Add the scalar weight to each sample, as from_samples() does.
+            weights = np.full(len(samples), weights, dtype=np.float64)
+        unique_keys, codes = np.unique(keys, return_inverse=True)
+        size = len(self._edges) + 1
+        # Histograms are rows of one 2-D array, so we can count
+        # samples of all keys at once, using one index to a flat array.
+        # The bincount sums weights in order, as np.add.at would do.
+        index = codes.ravel() * size + self.bin_index(samples)
+        values = np.bincount(index, weights, minlength=len(unique_keys) * size)
+        values = values.reshape(len(unique_keys), size)
+        return unique_keys, self._array_cls(self._edges, values)
+
+    def array_from_histogram(self, histograms):
+        """
+        Create an array of distributions from histograms.
+
+        :param histograms: 2-D array-like, one histogram per row
+        :return: a new :class:`.DistributionArray`
+        """
+        return self._array_cls.from_histogram(self._edges, histograms)
+
+    def array_from_cumulative(self, cumulatives):
+        """
+        Create an array of distributions from cumulative histograms.
+
+        :param cumulatives: 2-D array-like, one cumulative histogram per row
+        :return: a new :class:`.DistributionArray`
+        """
+        return self._array_cls.from_cumulative(self._edges, cumulatives)
+
+    def array_from_distributions(self, dists):
+        """
+        Create an array of distributions by stacking distributions.
+
+        :param dists: iterable of :class:`.Distribution` instances
+        :return: a new :class:`.DistributionArray`
+        """
+        return self._array_cls.from_distributions(self._edges, dists)
+
+
+def _rebin_map(source_edges, target_edges):
+    """
+    Return a sparse matrix translating source histograms to target histograms.
+
+    Each source bucket is split to target buckets proportionally
+    to their overlap, assuming samples spread uniformly in the bucket.
+    Samples below the first source edge are assumed to be at the first edge,
+    samples above the last source edge are assumed to be just above it.
+    Empty-width buckets hold samples at their edge.
+
+    :return: tuple of source bucket indexes, target bucket indexes
+        and weights, ordered by source index
+    """
+    source_edges = np.asarray(source_edges, dtype=np.float64)
+    target_edges = np.asarray(target_edges, dtype=np.float64)
+    lower = np.r_[-np.inf, source_edges]
+    upper = np.r_[source_edges, np.inf]
+    # The first and the last target bucket overlapping each source bucket.
+    first = target_edges.searchsorted(lower, side="right")
+    last = target_edges.searchsorted(upper, side="left")
+    first[1:] = np.where(lower[1:] < upper[1:], first[1:], last[1:])
+    first[0] = last[0]
+    last[-1] = first[-1]
+    counts = last - first + 1
+    rows = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+    cols = first[rows] + offsets
+    bounds = np.r_[-np.inf, target_edges, np.inf]
+    with np.errstate(invalid="ignore"):
+        overlap = np.minimum(upper[rows], bounds[cols + 1]) - np.maximum(
+            lower[rows], bounds[cols]
+        )
+        weights = overlap / (upper[rows] - lower[rows])
+    # Buckets mapped to one target bucket are moved exactly.
+    weights[counts[rows] == 1] = 1.0
+    return rows, cols, weights
+
+
+class _ArithmeticDistributionType(DistributionType):
+    """
+    Distribution type that computes bucket indexes arithmetically.
+
+    Subclasses estimate a bucket index from a closed-form formula.
+    The estimate can be off by one because of rounding errors,
+    so it is corrected by comparison with adjacent edges.
+    """
+
+    __slots__ = ()
+
+    def bin_index(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        edges = self._edges
+        size = len(edges)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            estimate = self._estimate_index(values)
+        # Samples out of the formula domain (e.g., negative) are below edges.
+        estimate = np.nan_to_num(estimate, nan=0.0, posinf=size, neginf=0.0)
+        # NaN is sorted after all edges, as in searchsorted.
+        estimate = np.where(np.isnan(values), size, estimate)
+        index = np.clip(estimate, 0, size).astype(np.intp)
+        lower = np.maximum(index - 1, 0)
+        index -= (index > 0) & (edges[lower] >= values)
+        upper = np.minimum(index, size - 1)
+        index += (index < size) & (edges[upper] < values)
+        return index
+
+    def _estimate_index(self, values):
+        raise NotImplementedError
+
+
+class _LinearDistributionType(_ArithmeticDistributionType):
+
+    __slots__ = ("_start", "_width")
+
+    def __init__(self, start, stop, count, dtype=None):
+        if count < 2:
+            raise ValueError("Count must be at least two.")
+        if not start < stop:
+            raise ValueError("Stop must be greater than start.")
+        super().__init__(np.linspace(start, stop, count), dtype)
+        self._start = float(start)
+        self._width = (stop - start) / (count - 1)
+
+    def _estimate_index(self, values):
+        return np.ceil((values - self._start) / self._width)
+
+
+class _ExponentialDistributionType(_ArithmeticDistributionType):
+
+    __slots__ = ("_log_start", "_log_factor")
+
+    def __init__(self, start, stop, count, dtype=None):
+        if count < 2:
+            raise ValueError("Count must be at least two.")
+        if not 0 < start < stop:
+            raise ValueError("Start must be positive and less than stop.")
+        super().__init__(np.geomspace(start, stop, count), dtype)
+        self._log_start = np.log(start)
+        self._log_factor = (np.log(stop) - self._log_start) / (count - 1)
+
+    def _estimate_index(self, values):
+        return np.ceil((np.log(values) - self._log_start) / self._log_factor)
+
+
+class _LogLinearDistributionType(_ArithmeticDistributionType):
+
+    __slots__ = ("_min_exponent", "_subbuckets")
+
+    def __init__(self, start, stop, subbuckets, dtype=None):
+        if subbuckets < 1:
+            raise ValueError("Subbuckets must be at least one.")
+        if not 0 < start < stop:
+            raise ValueError("Start must be positive and less than stop.")
+        min_exponent = int(np.floor(np.log2(start)))
+        max_exponent = int(np.ceil(np.log2(stop)))
+        exponents = np.arange(min_exponent, max_exponent)
+        steps = 1 + np.arange(subbuckets) / subbuckets
+        edges = np.ldexp(steps, exponents[:, np.newaxis]).ravel()
+        super().__init__(np.append(edges, np.ldexp(1.0, max_exponent)), dtype)
+        self._min_exponent = min_exponent
+        self._subbuckets = subbuckets
+
+    def _estimate_index(self, values):
+        # Values are mantissa * 2**exponent with mantissa in [0.5, 1),
+        # so each value is in power-of-two interval starting at 2**(exponent - 1).
+        mantissa, exponent = np.frexp(values)
+        octave = exponent - 1 - self._min_exponent
+        offset = np.ceil((2 * mantissa - 1) * self._subbuckets)
+        return np.where(values > 0, octave * self._subbuckets + offset, 0)
@@ -0,0 +1,394 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+from distimate.distributions import (
+    Distribution,
+    _accumulate,
+    _get_type,
+    _is_counter,
+    _same_edges,
+    _to_integer_weights,
+)
+
+# Decayed histograms are rescaled before weights grow over exp() of this.
+# Float numbers overflow at about exp(709), so there is a room for sums.
+_MAX_DECAY_EXPONENT = 512
+
+
+class _WindowDistribution:
+    """
+    Base class for distributions of samples arriving over time.
+
+    Subclasses maintain a histogram and call :meth:`_invalidate`
+    when it changes.
+    """
+
+    __slots__ = ("_type", "_dist")
+
+    def __init__(self, dist_type):
+        self._type = _get_type(dist_type)
+        self._dist = None
+
+    def __repr__(self):
+        name = type(self).__name__
+        return f"<{name}: weight={self.weight:.0f}>"
+
+    @property
+    def edges(self):
+        """
+        Edges of the underlying histogram
+
+        :return: :class: 1-D `numpy.array`, ordered histogram edges
+        """
+        return self._type.edges
+
+    @property
+    def distribution(self):
+        """
+        Distribution of samples in the window.
+
+        :return: a :class:`.Distribution` instance
+        """
+        if self._dist is None:
+            self._dist = self._type.from_histogram(self._get_histogram())
+        return self._dist
+
+    @property
+    def weight(self):
+        """
+        Return a total weight of samples in the window.
+
+        :return: float number
+        """
+        return self.distribution.weight
+
+    @property
+    def pdf(self):
+        """
+        Probability density function (PDF) of samples in the window.
+
+        See :class:`.PDF` for details.
+
+        :return: a :class:`.PDF` instance
+        """
+        return self.distribution.pdf
+
+    @property
+    def cdf(self):
+        """
+        Cumulative distribution function (CDF) of samples in the window.
+
+        See :class:`.CDF` for details.
+
+        :return: a :class:`.CDF` instance
+        """
+        return self.distribution.cdf
+
+    @property
+    def quantile(self):
+        """
+        Quantile function of samples in the window.
+
+        See :class:`.Quantile` for details.
+
+        :return: a :class:`.Quantile` instance
+        """
+        return self.distribution.quantile
+
+    def _get_histogram(self):
+        raise NotImplementedError
+
+    def _invalidate(self):
+        self._dist = None
+
+
+class SlidingWindow(_WindowDistribution):
+    """
+    Distribution of samples from a sliding time window.
+
+    The window is split to *slot_count* slots, each covering
+    *slot_duration* of time. Histograms of slots are kept in a ring buffer
+    together with their running total. When the window advances,
+    histograms of expired slots are subtracted from the total,
+    so reading the distribution does not merge all slots.
+
+    Timestamps are passed explicitly. They can be any numbers
+    (for example, seconds since epoch) in same units as *slot_duration*.
+    The window ends with the slot of the greatest timestamp seen so far.
+    Samples older than the window are rejected.
+
+    With fractional weights, rounding errors of the subtraction
+    can leave tiny residues in buckets of the total.
+    Types with integer dtype count exactly, so they accept
+    only non-negative integer weights.
+
+    :param dist_type: :class:`.DistributionType` or
+        1-D array-like with histogram edges
+    :param slot_duration: positive number, duration of one slot
+    :param slot_count: positive integer, number of slots in the window
+    """
+
+    __slots__ = ("_slot_duration", "_slots", "_total", "_slot")
+
+    _dtype = Distribution._dtype
+
+    def __init__(self, dist_type, slot_duration, slot_count):
+        if not slot_duration > 0:
+            raise ValueError("Slot duration must be positive.")
+        if slot_count < 1:
+            raise ValueError("Slot count must be positive.")
+        super().__init__(dist_type)
+        size = len(self._type.edges) + 1
+        # Integer counters are kept in their dtype to count exactly,
+        # float types use float64 to limit rounding of subtracted slots.
+        dtype = self._type.dtype
+        if dtype.kind == "f":
+            dtype = self._dtype
+        self._slot_duration = slot_duration
+        self._slots = np.zeros((slot_count, size), dtype=dtype)
+        self._total = np.zeros(size, dtype=dtype)
+        # Number of the newest slot, None until the first timestamp.
+        self._slot = None
+
+    @property
+    def slot_count(self):
+        """
+        Number of slots in the window.
+
+        :return: integer
+        """
+        return len(self._slots)
+
+    def advance(self, timestamp):
+        """
+        Advance the window to the given time.
+
+        Samples from slots that are no longer in the window are removed.
+        Timestamps older than the newest slot are ignored.
+
+        :param timestamp: number
+        """
+        self._advance_to_slot(self._get_slot(timestamp))
+
+    def add(self, timestamp, value, weight=None):
+        """
+        Add a new item to the window.
+
+        :param timestamp: number, time of the item
+        :param value: item to add
+        :param weight: optional item weight
+        """
+        if np.ndim(value) != 0:
+            raise ValueError("Value must be a scalar.")
+        self.update(timestamp, [value], weight)
+
+    def update(self, timestamps, values, weights=None):
+        """
+        Add multiple items to the window.
+
+        :param timestamps: number or 1-D array-like with same length as values
+        :param values: items to add, 1-D array-like
+        :param weights: optional scalar or 1-D array-like
+            with same length as values.
+        """
+        values = np.asarray(values)
+        if values.ndim != 1:
+            raise ValueError("Values must be 1-D array-like.")
+        if len(values) == 0:
+            return
+        slots = self._get_slot(np.broadcast_to(timestamps, values.shape))
+        # Validate before advancing, so that rejected samples change nothing.
+        newest = slots.max() if self._slot is None else max(self._slot, slots.max())
+        if slots.min() <= newest - len(self._slots):
+            raise ValueError("Timestamps must not be older than the window.")
+        if weights is not None:
+            if np.ndim(weights) != 0 and np.shape(weights) != values.shape:
+                raise ValueError("Weights must have same length as values.")
+            if _is_counter(self._total):
+                weights = _to_integer_weights(weights)
+        bins = self._type.bin_index(values)
+        self._advance_to_slot(slots.max())
+        size = self._slots.shape[1]
+        positions = slots % len(self._slots)
+        # The total is updated first, because it overflows before any slot.
+        _accumulate(self._total, bins, weights)
+        _accumulate(self._slots.reshape(-1), positions * size + bins, weights)
+        self._invalidate()
+
+    def _get_histogram(self):
+        return self._total.copy()
+
+    def _get_slot(self, timestamp):
+        return np.floor_divide(timestamp, self._slot_duration).astype(np.int64)
+
+    def _advance_to_slot(self, slot):
+        if self._slot is None:
+            self._slot = slot
+            return
+        if slot <= self._slot:
+            return
+        count = len(self._slots)
+        if slot - self._slot >= count:
+            self._slots[:] = 0
+            self._total[:] = 0
+        else:
+            for expired in range(self._slot + 1, slot + 1):
+                histogram = self._slots[expired % count]
+                self._total -= histogram
+                histogram[:] = 0
+            # Subtraction of fractional weights is not exact.
+            np.maximum(self._total, 0, out=self._total)
+        self._slot = slot
+        self._invalidate()
+
+
+class DecayedDistribution(_WindowDistribution):
+    """
+    Distribution of samples with exponentially decaying weights.
+
+    Weight of each sample decays by ``exp(-rate * age)``,
+    so the half-life of samples is ``log(2) / rate``.
+
+    Implements forward decay: Samples are added with weight
+    ``exp(rate * (timestamp - landmark))``, so the histogram
+    does not have to be updated when time passes.
+    When the weights grow close to overflow,
+    the histogram is rescaled and the landmark is moved.
+
+    The :attr:`distribution` is scaled to weights at the newest timestamp,
+    so its weight is a decayed number of samples.
+    Decayed weights are fractional, so types with integer dtype
+    are replaced by float64 types with same edges.
+
+    :param dist_type: :class:`.DistributionType` or
+        1-D array-like with histogram edges
+    :param rate: positive number, decay rate per a time unit
+    :param landmark: optional number, time when decay starts
+    """
+
+    __slots__ = ("_rate", "_landmark", "_time", "_values")
+
+    _dtype = Distribution._dtype
+
+    def __init__(self, dist_type, rate, landmark=0):
+        if not rate > 0:
+            raise ValueError("Rate must be positive.")
+        super().__init__(dist_type)
+        if self._type.dtype.kind != "f":
+            self._type = self._type.with_dtype(self._dtype)
+        self._rate = rate
+        self._landmark = landmark
+        # The newest timestamp.
+        self._time = landmark
+        self._values = np.zeros(len(self._type.edges) + 1, dtype=self._dtype)
+
+    def __add__(self, other):
+        """Combine this distribution with other decayed distribution."""
+        if isinstance(other, DecayedDistribution):
+            result = type(self)(self._type, self._rate, self._landmark)
+            result._time = self._time
+            result._values[:] = self._values
+            result += other
+            return result
+        return NotImplemented
+
+    def __iadd__(self, other):
+        """Combine this distribution with other decayed distribution inplace."""
+        if isinstance(other, DecayedDistribution):
+            self._check_compatibility(other)
+            landmark = max(self._landmark, other._landmark)
+            self._values *= np.exp(self._rate * (self._landmark - landmark))
+            self._values += other._values * np.exp(
+                self._rate * (other._landmark - landmark)
+            )
+            self._landmark = landmark
+            self._time = max(self._time, other._time)
+            self._invalidate()
+            return self
+        return NotImplemented
+
+    @property
+    def rate(self):
+        """
+        Decay rate per a time unit.
+
+        :return: number
+        """
+        return self._rate
+
+    def advance(self, timestamp):
+        """
+        Advance the distribution to the given time.
+
+        Decays weights of all samples.
+        Timestamps older than the newest timestamp are ignored.
+
+        :param timestamp: number
+        """
+        if timestamp > self._time:
+            self._time = timestamp
+            self._invalidate()
+
+    def add(self, timestamp, value, weight=None):
+        """
+        Add a new item to this distribution.
+
+        :param timestamp: number, time of the item
+        :param value: item to add
+        :param weight: optional item weight
+        """
+        if np.ndim(value) != 0:
+            raise ValueError("Value must be a scalar.")
+        self.update(timestamp, [value], weight)
+
+    def update(self, timestamps, values, weights=None):
+        """
+        Add multiple items to this distribution.
+
+        :param timestamps: number or 1-D array-like with same length as values
+        :param values: items to add, 1-D array-like
+        :param weights: optional scalar or 1-D array-like
+            with same length as values.
+        """
+        values = np.asarray(values)
+        if values.ndim != 1:
+            raise ValueError("Values must be 1-D array-like.")
+        if len(values) == 0:
+            return
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        self.advance(timestamps.max())
+        if self._rate * (self._time - self._landmark) > _MAX_DECAY_EXPONENT:
+            self._move_landmark(self._time)
+        factors = np.exp(self._rate * (timestamps - self._landmark))
+        if weights is not None:
+            factors = factors * np.asarray(weights, dtype=np.float64)
+        if np.ndim(factors) != 0:
+            factors = np.broadcast_to(factors, values.shape)
+        _accumulate(self._values, self._type.bin_index(values), factors)
+        self._invalidate()
+
+    def _get_histogram(self):
+        return self._values * np.exp(self._rate * (self._landmark - self._time))
+
+    def _move_landmark(self, landmark):
+        self._values *= np.exp(self._rate * (self._landmark - landmark))
+        self._landmark = landmark
+
+    def _check_compatibility(self, other):
+        if other._rate != self._rate:
+            raise ValueError("Distributions have different decay rates.")
+        if not _same_edges(other.edges, self.edges):
+            raise ValueError("Distributions have different edges.")
@@ -0,0 +1,172 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+
+from distimate.arrays import DistributionArray
+from distimate.distributions import Distribution
+
+EDGES = [1, 10, 100]
+HISTOGRAMS = [[3, 0, 1, 0], [0, 0, 0, 0], [0, 3, 1, 0]]
+
+
+class TestDistributionArray:
+    def test_invalid_shape_1d(self):
+        with pytest.raises(ValueError) as exc_info:
+            DistributionArray(EDGES, [1, 0, 2, 0])
+        assert str(exc_info.value) == "Histograms must be 2-D array-like."
+
+    def test_invalid_length(self):
+        with pytest.raises(ValueError) as exc_info:
+            DistributionArray(EDGES, [[1, 0, 2]])
+        assert str(exc_info.value) == "Histograms must have len(edges) + 1 columns."
+
+    def test_negative_hist_value(self):
+        with pytest.raises(ValueError) as exc_info:
+            DistributionArray(EDGES, [[0, 0, -1, 0]])
+        assert str(exc_info.value) == "Histogram values must not be negative."
+
+    def test_empty(self):
+        array = DistributionArray(EDGES)
+        assert len(array) == 0
+        assert array.values.shape == (0, 4)
+        assert array.values.dtype == np.float64
+
+    def test_from_histogram(self):
+        array = DistributionArray.from_histogram(EDGES, HISTOGRAMS)
+        assert_array_equal(array.values, HISTOGRAMS)
+        assert_array_equal(array.to_histogram(), HISTOGRAMS)
+
+    def test_from_cumulative(self):
+        array = DistributionArray.from_cumulative(
+            EDGES, [[3, 3, 4, 4], [0, 0, 0, 0], [0, 3, 4, 4]]
+        )
+        assert_array_equal(array.values, HISTOGRAMS)
+
+    def test_to_cumulative(self):
+        array = DistributionArray(EDGES, HISTOGRAMS)
+        assert_array_equal(
+            array.to_cumulative(), [[3, 3, 4, 4], [0, 0, 0, 0], [0, 3, 4, 4]]
+        )
+
+    def test_from_distributions(self):
+        dists = [Distribution(EDGES, hist) for hist in HISTOGRAMS]
+        array = DistributionArray.from_distributions(EDGES, dists)
+        assert_array_equal(array.values, HISTOGRAMS)
+
+    def test_from_distributions_different_edges(self):
+        with pytest.raises(ValueError) as exc_info:
+            DistributionArray.from_distributions(EDGES, [Distribution([0, 1, 2])])
+        assert str(exc_info.value) == "Distributions have different edges."
+
+    def test_repr(self):
+        array = DistributionArray(EDGES, HISTOGRAMS)
+        assert repr(array) == "<DistributionArray: size=3>"
+
+    def test_getitem_int(self):
+        array = DistributionArray(EDGES, HISTOGRAMS)
+        dist = array[2]
+        assert dist == Distribution(EDGES, [0, 3, 1, 0])
+        dist.add(5)
+        assert_array_equal(array.values[2], [0, 3, 1, 0])
+
+    def test_getitem_slice(self):
+        array = DistributionArray(EDGES, HISTOGRAMS)
+        assert_array_equal(array[1:].values, HISTOGRAMS[1:])
+
+    def test_getitem_mask(self):
+        array = DistributionArray(EDGES, HISTOGRAMS)
+        assert_array_equal(
+            array[array.weight > 0].values, [HISTOGRAMS[0], HISTOGRAMS[2]]
+        )
+
+    def test_iter(self):
+        array = DistributionArray(EDGES, HISTOGRAMS)
+        assert list(array) == [Distribution(EDGES, hist) for hist in HISTOGRAMS]
+
+    def test_add_array(self):
+        array = DistributionArray(EDGES, HISTOGRAMS) + DistributionArray(
+            EDGES, HISTOGRAMS
+        )
+        assert_array_equal(array.values, 2 * np.array(HISTOGRAMS))
+
+    def test_add_distribution(self):
+        array = DistributionArray(EDGES, HISTOGRAMS) + Distribution(EDGES, [1, 0, 0, 0])
+        assert_array_equal(array.values[:, 0], [4, 1, 1])
+
+    def test_add_in_place(self):
+        array = DistributionArray(EDGES, HISTOGRAMS)
+        values = array.values
+        array += DistributionArray(EDGES, HISTOGRAMS)
+        assert_array_equal(values, 2 * np.array(HISTOGRAMS))
+
+    def test_add_different_lengths(self):
+        with pytest.raises(ValueError) as exc_info:
+            DistributionArray(EDGES, HISTOGRAMS) + DistributionArray(EDGES)
+        assert str(exc_info.value) == "Distribution arrays have different lengths."
+
+    def test_add_different_edges(self):
+        with pytest.raises(ValueError) as exc_info:
+            DistributionArray(EDGES, HISTOGRAMS) + Distribution([0, 1, 2])
+        assert str(exc_info.value) == "Distributions have different edges."
+
+    def test_sum(self):
+        dist = DistributionArray(EDGES, HISTOGRAMS).sum()
+        assert dist == Distribution(EDGES, [3, 3, 2, 0])
+
+    def test_weight(self):
+        array = DistributionArray(EDGES, HISTOGRAMS)
+        assert_array_equal(array.weight, [4, 0, 4])
+
+    def test_mean(self):
+        array = DistributionArray(EDGES, HISTOGRAMS)
+        assert_array_equal(array.mean, [(3 * 1 + 55) / 4, np.nan, (3 * 5.5 + 55) / 4])
+
+    def test_pdf(self):
+        array = DistributionArray(EDGES, HISTOGRAMS)
+        assert_array_equal(
+            array.pdf([0, 1, 55]),
+            [[0, np.nan, 1 / 4 / 90], [0, np.nan, np.nan], [0, 0, 1 / 4 / 90]],
+        )
+
+    def test_cdf(self):
+        array = DistributionArray(EDGES, HISTOGRAMS)
+        assert_array_equal(
+            array.cdf([0, 1, 55]),
+            [[0, 3 / 4, 7 / 8], [0, np.nan, np.nan], [0, 0, 7 / 8]],
+        )
+
+    def test_quantile(self):
+        array = DistributionArray(EDGES, HISTOGRAMS)
+        assert_array_equal(
+            array.quantile([0, 1 / 2, 7 / 8]),
+            [[1, 1, 55], [np.nan, np.nan, np.nan], [1, 7, 55]],
+        )
+
+    def test_quantile_scalar(self):
+        array = DistributionArray(EDGES, HISTOGRAMS)
+        assert_array_equal(array.quantile(1 / 2), [1, np.nan, 7])
+
+    def test_rebin(self):
+        array = DistributionArray(EDGES, HISTOGRAMS)
+        result = array.rebin([1, 5.5, 10, 50, 100, 1000])
+        assert result.values.shape == (3, 7)
+        for dist, expected in zip(result, array):
+            assert dist == expected.rebin(result.edges)
+
+    def test_rebin_of_empty(self):
+        result = DistributionArray(EDGES).rebin([10])
+        assert result.values.shape == (0, 2)
@@ -0,0 +1,119 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.testing import assert_array_equal
+from pandas.testing import assert_frame_equal, assert_series_equal
+
+from distimate.pandasext import DistributionDtype
+from distimate.types import DistributionType
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from distimate.arrowext import DistributionArrowType  # noqa: E402
+
+dist_type = DistributionType([0, 10, 100])
+HISTOGRAMS = [[1, 2, 3, 4], [0, 1, 0, 0], [5, 0, 5, 0]]
+
+
+def _create_series():
+    series = pd.Series.dist.from_histogram(dist_type, HISTOGRAMS, name="qty")
+    series[1] = np.nan
+    return series
+
+
+class TestDistributionArrowType:
+    def test_storage_type(self):
+        arrow_type = DistributionArrowType(dist_type)
+        assert arrow_type.storage_type == pa.list_(pa.float64(), 4)
+        assert arrow_type.dist_type is dist_type
+        assert_array_equal(arrow_type.edges, [0, 10, 100])
+
+    def test_integer_storage_type(self):
+        arrow_type = DistributionArrowType(dist_type.with_dtype(np.int64))
+        assert arrow_type.storage_type == pa.list_(pa.int64(), 4)
+
+    def test_equality(self):
+        assert DistributionArrowType([0, 10, 100]) == DistributionArrowType(dist_type)
+        assert DistributionArrowType([0, 10, 100]) != DistributionArrowType([0, 10])
+
+    def test_pickle(self):
+        arrow_type = DistributionArrowType(dist_type, pa.int64())
+        assert pickle.loads(pickle.dumps(arrow_type)) == arrow_type
+
+
+class TestArrowConversion:
+    def test_to_arrow(self):
+        array = pa.array(_create_series())
+        assert isinstance(array.type, DistributionArrowType)
+        assert array.null_count == 1
+        assert array.storage.to_pylist() == [[1, 2, 3, 4], None, [5, 0, 5, 0]]
+
+    def test_to_arrow_as_integers(self):
+        array = pa.array(_create_series(), type=pa.list_(pa.int64(), 4))
+        assert array.type == pa.list_(pa.int64(), 4)
+        assert array.to_pylist() == [[1, 2, 3, 4], None, [5, 0, 5, 0]]
+
+    def test_to_arrow_as_integers_w_fractions(self):
+        series = pd.Series.dist.from_histogram(dist_type, [[0.5, 0, 0, 0]])
+        with pytest.raises(ValueError):
+            pa.array(series, type=pa.list_(pa.int64(), 4))
+
+    def test_to_arrow_w_different_edges(self):
+        with pytest.raises(ValueError):
+            pa.array(_create_series(), type=pa.list_(pa.float64(), 5))
+
+    def test_round_trip(self):
+        series = _create_series()
+        result = pa.array(series).to_pandas()
+        assert_series_equal(result, series.rename(None), check_index_type=False)
+
+    def test_round_trip_of_slice(self):
+        series = _create_series()
+        result = pa.chunked_array([pa.array(series)[1:]]).to_pandas()
+        assert_series_equal(result, series[1:].reset_index(drop=True).rename(None))
+
+    def test_round_trip_of_chunks(self):
+        array = pa.array(_create_series())
+        result = pa.chunked_array([array, array]).to_pandas()
+        assert result.dtype == DistributionDtype(dist_type)
+        assert_array_equal(result.isna(), [False, True, False] * 2)
+
+    def test_parquet_round_trip(self):
+        df = pd.DataFrame({"color": ["red", "blue", "blue"], "qty": _create_series()})
+        buffer = io.BytesIO()
+        pq.write_table(pa.Table.from_pandas(df), buffer)
+        buffer.seek(0)
+        result = pq.read_table(buffer).to_pandas()
+        assert_frame_equal(result, df)
+        assert result["qty"].dtype.dist_type.edges is dist_type.edges
+
+    def test_parquet_round_trip_of_integers(self):
+        int_type = dist_type.with_dtype(np.int64)
+        series = pd.Series.dist.from_histogram(int_type, HISTOGRAMS, name="qty")
+        buffer = io.BytesIO()
+        pq.write_table(pa.Table.from_pandas(series.to_frame()), buffer)
+        buffer.seek(0)
+        table = pq.read_table(buffer)
+        assert table.schema.field("qty").type.value_type == pa.int64()
+        result = table.to_pandas()["qty"]
+        assert result.dtype.dist_type.dtype == np.int64
+        assert result.iloc[0].values.dtype == np.int64
+        assert_array_equal(result.dist.values, HISTOGRAMS)
@@ -0,0 +1,168 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose, assert_array_equal
+
+from distimate import distances
+
+METRICS = ["kolmogorov_smirnov", "wasserstein", "jensen_shannon", "hellinger"]
+
+edges = [0, 10, 20]
+
+
+def random_histograms(rows):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 10, (rows, len(edges) + 1)).astype(np.float64)
+
+
+class TestKolmogorovSmirnov:
+    def test_same(self):
+        assert distances.kolmogorov_smirnov(edges, [1, 2, 3, 0], [2, 4, 6, 0]) == 0
+
+    def test_disjoint(self):
+        assert distances.kolmogorov_smirnov(edges, [0, 1, 0, 0], [0, 0, 1, 0]) == 1
+
+    def test_partial(self):
+        assert distances.kolmogorov_smirnov(edges, [0, 1, 1, 0], [0, 0, 1, 0]) == 0.5
+
+
+class TestWasserstein:
+    def test_same(self):
+        assert distances.wasserstein(edges, [1, 2, 3, 0], [2, 4, 6, 0]) == 0
+
+    def test_shifted_bucket(self):
+        assert distances.wasserstein(edges, [0, 1, 0, 0], [0, 0, 1, 0]) == 10
+
+    def test_outer_buckets(self):
+        assert distances.wasserstein(edges, [1, 0, 0, 0], [0, 0, 0, 1]) == 20
+
+    def test_partial(self):
+        assert distances.wasserstein(edges, [0, 1, 1, 0], [0, 1, 0, 0]) == 5
+        assert distances.wasserstein(edges, [0, 1, 1, 0], [1, 0, 1, 0]) == 2.5
+
+    def test_crossing_cdfs(self):
+        # Difference of CDFs goes from 0.5 to -0.5, so it is two triangles.
+        assert distances.wasserstein([0, 10], [1, 0, 1], [0, 2, 0]) == 2.5
+
+
+class TestJensenShannon:
+    def test_same(self):
+        assert distances.jensen_shannon(edges, [1, 2, 3, 0], [2, 4, 6, 0]) == 0
+
+    def test_disjoint(self):
+        assert distances.jensen_shannon(edges, [1, 1, 0, 0], [0, 0, 1, 1]) == 1
+
+    def test_partial(self):
+        # Mixture has probabilities 3/4 and 1/4, entropies are 0 and 1 bit.
+        expected = -(np.log2(0.75) * 3 / 4 + np.log2(0.25) / 4) - 1 / 2
+        actual = distances.jensen_shannon(edges, [0, 1, 0, 0], [0, 1, 1, 0])
+        assert actual == pytest.approx(expected)
+
+
+class TestHellinger:
+    def test_same(self):
+        assert distances.hellinger(edges, [1, 2, 3, 0], [2, 4, 6, 0]) == 0
+
+    def test_disjoint(self):
+        assert distances.hellinger(edges, [1, 1, 0, 0], [0, 0, 1, 1]) == 1
+
+    def test_partial(self):
+        expected = np.sqrt(1 - np.sqrt(0.5))
+        actual = distances.hellinger(edges, [0, 1, 0, 0], [0, 1, 1, 0])
+        assert actual == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("metric", METRICS)
+class TestPaired:
+    def test_rows(self, metric):
+        func = getattr(distances, metric)
+        hist1 = random_histograms(5)
+        hist2 = random_histograms(5)[::-1]
+        expected = [func(edges, a, b) for a, b in zip(hist1, hist2)]
+        assert_allclose(func(edges, hist1, hist2), expected)
+
+    def test_baseline(self, metric):
+        func = getattr(distances, metric)
+        hist = random_histograms(5)
+        expected = [func(edges, hist[0], b) for b in hist]
+        assert_allclose(func(edges, hist[0], hist), expected)
+
+    def test_empty(self, metric):
+        func = getattr(distances, metric)
+        assert np.isnan(func(edges, [0, 0, 0, 0], [1, 2, 3, 0]))
+        result = func(edges, [[0, 0, 0, 0], [1, 0, 0, 0]], [1, 2, 3, 0])
+        assert_array_equal(np.isnan(result), [True, False])
+
+    def test_symmetric(self, metric):
+        func = getattr(distances, metric)
+        hist1 = random_histograms(5)
+        hist2 = random_histograms(5)[::-1]
+        assert_allclose(func(edges, hist1, hist2), func(edges, hist2, hist1))
+
+    def test_invalid_length(self, metric):
+        func = getattr(distances, metric)
+        with pytest.raises(ValueError, match=r"len\(edges\) \+ 1"):
+            func(edges, [1, 2, 3], [1, 2, 3])
+
+
+@pytest.mark.parametrize("metric", METRICS)
+class TestPairwise:
+    def test_matrix(self, metric):
+        func = getattr(distances, metric)
+        hist1 = random_histograms(4)
+        hist2 = random_histograms(7)
+        expected = [[func(edges, a, b) for b in hist2] for a in hist1]
+        assert_allclose(distances.pairwise(metric, edges, hist1, hist2), expected)
+
+    def test_symmetric(self, metric):
+        hist = random_histograms(7)
+        expected = distances.pairwise(metric, edges, hist, hist)
+        assert_allclose(distances.pairwise(metric, edges, hist), expected)
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 100])
+    def test_chunks(self, metric, chunk_size):
+        hist = random_histograms(7)
+        expected = distances.pairwise(metric, edges, hist, hist)
+        result = distances.pairwise(metric, edges, hist, chunk_size=chunk_size)
+        assert_allclose(result, expected)
+        result = distances.pairwise(metric, edges, hist, hist, chunk_size=chunk_size)
+        assert_allclose(result, expected)
+
+    def test_out(self, metric):
+        hist = random_histograms(3)
+        out = np.zeros((3, 3))
+        assert distances.pairwise(metric, edges, hist, out=out) is out
+        assert_allclose(out, distances.pairwise(metric, edges, hist))
+
+    def test_empty_rows(self, metric):
+        hist = random_histograms(2)
+        result = distances.pairwise(metric, edges, np.zeros((0, 4)), hist)
+        assert result.shape == (0, 2)
+
+
+class TestPairwiseErrors:
+    def test_unknown_metric(self):
+        with pytest.raises(ValueError, match="Unknown metric"):
+            distances.pairwise("euclidean", edges, random_histograms(2))
+
+    def test_1d(self):
+        with pytest.raises(ValueError, match="must be 2-D"):
+            distances.pairwise("hellinger", edges, [1, 2, 3, 4])
+
+    def test_out_shape(self):
+        with pytest.raises(ValueError, match="Output must have shape"):
+            hist = random_histograms(2)
+            distances.pairwise("hellinger", edges, hist, out=np.zeros(2))
@@ -12,12 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import pickle
+
 import numpy as np
 import pandas as pd
 import pytest
 from numpy.testing import assert_array_equal
 
+from distimate import stats
 from distimate.distributions import Distribution
+from distimate.stats import Quantile
+from distimate.types import DistributionType
 
 EDGES = [1, 10, 100]
 
@@ -161,6 +166,30 @@ class TestDistribution:
         dist += Distribution(EDGES, [0, 2, 0, 4])
         assert_array_equal(hist, [1, 4, 0, 4])
 
+    def test_equal_edges_are_interned(self):
+        dist1 = Distribution(EDGES)
+        dist2 = Distribution(np.array(EDGES))
+        assert dist1._type is dist2._type
+        assert dist1.edges is DistributionType(EDGES).edges
+        assert not dist1.edges.flags.writeable
+
+    def test_unpickled_edges_are_interned(self):
+        dist = DistributionType.linear(0, 100, 11, dtype=np.uint32).from_samples([5])
+        result = pickle.loads(pickle.dumps(dist))
+        assert result == dist
+        assert result.edges is dist.edges
+        assert not result.edges.flags.writeable
+        assert result._type.dtype == np.uint32
+        assert_array_equal(result._type.bin_index([5, 55]), [1, 6])
+        array = pickle.loads(pickle.dumps(dist._type.empty_array(2)))
+        assert array.edges is dist.edges
+
+    def test_interned_edges_are_copied(self):
+        edges = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+        dist = Distribution(edges)
+        edges[0] = 0
+        assert dist.edges[0] == 1
+
     def test_add_distribution_different_edges(self):
         with pytest.raises(ValueError) as exc_info:
             Distribution(EDGES, [1, 2, 0, 0]) + Distribution([0, 1, 2], [0, 2, 0, 4])
@@ -247,12 +276,122 @@ class TestDistribution:
         dist.update([1, 1, 17], [3, 2, 1])
         assert_array_equal(dist.values, [5, 0, 1, 0])
 
+    def test_update_many_samples(self):
+        samples = np.random.default_rng(0).uniform(0, 200, 1000)
+        dist = Distribution(EDGES, [1, 2, 3, 4])
+        dist.update(samples)
+        expected = np.array([1, 2, 3, 4], dtype=np.float64)
+        np.add.at(expected, np.searchsorted(EDGES, samples), 1)
+        assert_array_equal(dist.values, expected)
+
+    def test_update_many_samples_with_fractional_weight(self):
+        samples = np.random.default_rng(0).uniform(0, 200, 1000)
+        dist = Distribution(EDGES, [0.5, 0, 0, 0])
+        dist.update(samples, 0.1)
+        expected = np.array([0.5, 0, 0, 0])
+        np.add.at(expected, np.searchsorted(EDGES, samples), 0.1)
+        assert dist.values.tobytes() == expected.tobytes()
+
+    def test_update_many_samples_with_multiple_weights(self):
+        rng = np.random.default_rng(0)
+        samples = rng.uniform(0, 200, 1000)
+        weights = rng.uniform(0, 1, 1000)
+        dist = Distribution(EDGES)
+        dist.update(samples, weights)
+        expected = np.zeros(4)
+        np.add.at(expected, np.searchsorted(EDGES, samples), weights)
+        assert dist.values.tobytes() == expected.tobytes()
+
     def test_update_not_1d(self):
         dist = Distribution(EDGES)
         with pytest.raises(ValueError) as exc_info:
             dist.update([[1, 1, 17]])
         assert str(exc_info.value) == "Values must be 1-D array-like."
 
+    def test_cached_functions(self):
+        dist = Distribution(EDGES, [3, 0, 1, 0])
+        assert dist.pdf is dist.pdf
+        assert dist.cdf is dist.cdf
+        assert dist.quantile is dist.quantile
+
+    def test_cached_functions_after_add(self):
+        dist = Distribution(EDGES, [3, 0, 1, 0])
+        assert dist.cdf(1) == 0.75
+        dist.add(50)
+        assert dist.cdf(1) == 0.6
+
+    def test_cached_functions_after_update(self):
+        dist = Distribution(EDGES, [3, 0, 1, 0])
+        assert dist.quantile(1) == 100
+        dist.update([0, 1000])
+        assert np.isnan(dist.quantile(1))
+
+    def test_cached_functions_after_add_distribution_in_place(self):
+        dist = Distribution(EDGES, [3, 0, 1, 0])
+        assert_array_equal(dist.to_cumulative(), [3, 3, 4, 4])
+        dist += Distribution(EDGES, [1, 0, 0, 0])
+        assert_array_equal(dist.to_cumulative(), [4, 4, 5, 5])
+
+    def test_cached_cumulative_is_copied(self):
+        dist = Distribution(EDGES, [3, 0, 1, 0])
+        dist.to_cumulative()[0] = 100
+        assert_array_equal(dist.to_cumulative(), [3, 3, 4, 4])
+
+    def test_cached_cumulative_is_shared(self):
+        dist = Distribution(EDGES, [3, 0, 1, 0])
+        dist.to_cumulative()
+        cached = dist._cache["cumulative"]
+        assert_array_equal(dist.cdf.y, [0.75, 0.75, 1])
+        assert dist.quantile(0.5) == Quantile(EDGES, [3, 0, 1, 0])(0.5)
+        assert dist._cache["cumulative"] is cached
+
+    def test_cached_functions_are_not_pickled(self):
+        dist = Distribution(EDGES, [3, 0, 1, 0])
+        data = pickle.dumps(dist)
+        dist.pdf, dist.cdf, dist.quantile, dist.to_cumulative()
+        assert pickle.dumps(dist) == data
+        result = pickle.loads(data)
+        assert result == dist
+        assert result.cdf(1) == 0.75
+
+    def test_bytes_of_sparse_counts(self):
+        dist = Distribution(EDGES, [0, 3, 0, 300])
+        data = dist.to_bytes()
+        assert len(data) == 16 + 1 + 2 + 3
+        assert Distribution.from_bytes(EDGES, data) == dist
+
+    def test_bytes_of_sparse_floats(self):
+        dist = Distribution(EDGES + [1000, 10000], [0, 0.5, 0, 0, 0, 0])
+        data = dist.to_bytes()
+        assert len(data) == 16 + 1 + 1 + 8
+        assert Distribution.from_bytes(EDGES + [1000, 10000], data) == dist
+
+    def test_bytes_of_dense(self):
+        dist = Distribution(EDGES, [0.5, 1.5, 2.5, 3.5])
+        data = bytearray(dist.to_bytes())
+        assert len(data) == 16 + 4 * 8
+        result = Distribution.from_bytes(EDGES, data)
+        assert result == dist
+        # Dense histograms share memory with data.
+        result.add(0)
+        assert Distribution.from_bytes(EDGES, data).values[0] == 1.5
+
+    def test_bytes_of_empty(self):
+        dist = Distribution(EDGES)
+        assert Distribution.from_bytes(EDGES, dist.to_bytes()) == dist
+
+    def test_bytes_w_different_edges(self):
+        data = Distribution(EDGES).to_bytes()
+        with pytest.raises(ValueError) as exc_info:
+            Distribution.from_bytes([1, 10, 1000], data)
+        assert str(exc_info.value) == "Distribution data have different edges."
+
+    def test_bytes_truncated(self):
+        data = Distribution(EDGES, [0, 3, 0, 300]).to_bytes()
+        with pytest.raises(ValueError) as exc_info:
+            Distribution.from_bytes(EDGES, data[:-1])
+        assert str(exc_info.value) == "Invalid distribution data."
+
     def test_mean_of_empty(self):
         dist = Distribution(EDGES, [0, 0, 0, 0])
         assert np.isnan(dist.mean)
@@ -304,3 +443,236 @@ class TestDistribution:
         assert_array_equal(quantile.x, [0, 3 / 4, 3 / 4, 1])
         assert_array_equal(quantile.y, [1, 1, 10, 100])
         assert_array_equal(quantile([-1, 0, 1 / 2, 7 / 8]), [np.nan, 1, 1, 55])
+
+
+class TestCounterDtypes:
+    """Test distributions with integer and float32 counters."""
+
+    uint32_type = DistributionType(EDGES, np.uint32)
+    int64_type = DistributionType(EDGES, np.int64)
+    float32_type = DistributionType(EDGES, np.float32)
+
+    def test_default_dtype(self):
+        assert DistributionType(EDGES).dtype == np.float64
+
+    def test_invalid_dtype(self):
+        with pytest.raises(ValueError):
+            DistributionType(EDGES, np.bool_)
+
+    def test_counting(self):
+        dist = self.uint32_type.from_samples([0, 5, 5, 500])
+        dist.add(5, 2)
+        dist.update([50, 50], 3)
+        assert dist.values.dtype == np.uint32
+        assert_array_equal(dist.values, [1, 4, 6, 1])
+        assert dist.cdf(10) == 5 / 12
+
+    def test_float32_weights(self):
+        dist = self.float32_type.from_samples([0, 5], [0.25, 0.5])
+        assert dist.values.dtype == np.float32
+        assert_array_equal(dist.values, [0.25, 0.5, 0, 0])
+
+    def test_float32_many_samples_with_multiple_weights(self):
+        rng = np.random.default_rng(0)
+        samples = rng.uniform(0, 200, 1000)
+        weights = rng.uniform(0, 1, 1000)
+        dist = self.float32_type.from_samples(samples, weights)
+        expected = np.zeros(4, dtype=np.float32)
+        np.add.at(expected, np.searchsorted(EDGES, samples), weights)
+        assert dist.values.tobytes() == expected.tobytes()
+
+    def test_float32_statistics_match_stats(self):
+        rng = np.random.default_rng(0)
+        histogram = rng.uniform(0, 1e4, 4).astype(np.float32)
+        dist = self.float32_type.from_histogram(histogram)
+        v = [1, 5, 10, 50, 100]
+        q = [0.1, 0.5, 0.9]
+        assert_array_equal(dist.cdf(v), stats.cdf(EDGES, histogram, v))
+        assert_array_equal(dist.quantile(q), stats.quantile(EDGES, histogram, q))
+        assert dist.to_cumulative().dtype == np.float32
+
+    def test_fractional_weight(self):
+        dist = self.uint32_type.empty()
+        with pytest.raises(ValueError):
+            dist.add(5, 0.5)
+        with pytest.raises(ValueError):
+            dist.update([5, 5], [1, 0.5])
+        with pytest.raises(ValueError):
+            dist.update([5], -1)
+        assert_array_equal(dist.values, [0, 0, 0, 0])
+
+    def test_fractional_histogram(self):
+        with pytest.raises(ValueError):
+            self.uint32_type.from_histogram([0, 0.5, 0, 0])
+
+    def test_overflow(self):
+        limit = 2 ** 32 - 1
+        with pytest.raises(OverflowError):
+            self.uint32_type.from_histogram([0, limit + 1, 0, 0])
+        dist = self.uint32_type.from_histogram([0, limit - 1, 0, 0])
+        dist.add(5)
+        with pytest.raises(OverflowError):
+            dist.add(5)
+        with pytest.raises(OverflowError):
+            dist.update([0, 5])
+        with pytest.raises(OverflowError):
+            dist += self.uint32_type.from_samples([5])
+        # Histogram is not modified by a failed update.
+        assert_array_equal(dist.values, [0, limit, 0, 0])
+
+    def test_int64_exact_beyond_float_precision(self):
+        dist = self.int64_type.from_histogram([0, 2 ** 60, 0, 0])
+        dist.add(5)
+        assert dist.values[1] == 2 ** 60 + 1
+        data = dist.to_bytes()
+        assert self.int64_type.from_bytes(data).values[1] == 2 ** 60 + 1
+
+    def test_add_promotes_dtype(self):
+        uint32_dist = self.uint32_type.from_samples([5])
+        int64_dist = self.int64_type.from_samples([5])
+        float32_dist = self.float32_type.from_samples([5], 0.5)
+        assert (uint32_dist + int64_dist).values.dtype == np.int64
+        assert (uint32_dist + uint32_dist).values.dtype == np.uint32
+        result = uint32_dist + float32_dist
+        assert result.values.dtype == np.float64
+        assert_array_equal(result.values, [0, 1.5, 0, 0])
+        assert result.edges is uint32_dist.edges
+
+    def test_add_uint64_and_int64_counters(self):
+        uint64_type = self.int64_type.with_dtype(np.uint64)
+        uint64_dist = uint64_type.from_histogram([0, 2 ** 63 + 1, 0, 0])
+        int64_dist = self.int64_type.from_histogram([0, 2 ** 60 + 1, 0, 0])
+        for result in uint64_dist + int64_dist, int64_dist + uint64_dist:
+            assert result.values.dtype == np.uint64
+            assert result.values[1] == 2 ** 63 + 2 ** 60 + 2
+        large = uint64_type.from_histogram([0, 2 ** 64 - 1, 0, 0])
+        with pytest.raises(OverflowError):
+            large + int64_dist
+
+    def test_add_in_place_keeps_dtype(self):
+        dist = self.uint32_type.from_samples([5])
+        dist += self.int64_type.from_samples([5])
+        dist += self.float32_type.from_samples([5], 2.0)
+        assert dist.values.dtype == np.uint32
+        assert_array_equal(dist.values, [0, 4, 0, 0])
+        with pytest.raises(ValueError):
+            dist += self.float32_type.from_samples([5], 0.5)
+
+
+class TestMergeAll:
+    """Test ``Distribution.merge_all`` and ``DistributionType.merge``."""
+
+    dist_type = DistributionType(EDGES)
+
+    def test_merge_all(self):
+        dists = [self.dist_type.from_samples([0, 5]), Distribution(EDGES, [0, 1, 2, 3])]
+        result = Distribution.merge_all(dists)
+        assert_array_equal(result.values, [1, 2, 2, 3])
+        assert_array_equal(dists[0].values, [1, 1, 0, 0])
+
+    def test_merge_all_from_generator(self):
+        dists = (self.dist_type.from_samples([i]) for i in range(200))
+        result = Distribution.merge_all(dists)
+        assert_array_equal(result.values, [2, 9, 90, 99])
+
+    def test_merge_all_same_as_sum(self):
+        rng = np.random.default_rng(0)
+        dists = [self.dist_type.from_histogram(rng.random(4)) for _ in range(100)]
+        expected = sum(dists, self.dist_type.empty())
+        assert_array_equal(Distribution.merge_all(dists).values, expected.values)
+
+    def test_merge_all_pairwise(self):
+        dists = [self.dist_type.from_histogram([0.1, 0, 0, 1])] * 1000
+        sequential = Distribution.merge_all(dists)
+        pairwise = Distribution.merge_all(dists, pairwise=True)
+        assert abs(pairwise.values[0] - 100) < abs(sequential.values[0] - 100)
+        assert_array_equal(pairwise.values[1:], [0, 0, 1000])
+
+    def test_merge_all_pairwise_of_odd_count(self):
+        dists = [self.dist_type.from_samples([i]) for i in range(7)]
+        result = Distribution.merge_all(dists, pairwise=True)
+        assert_array_equal(result.values, [2, 5, 0, 0])
+
+    def test_merge_all_of_empty(self):
+        with pytest.raises(ValueError):
+            Distribution.merge_all([])
+
+    def test_merge_all_different_edges(self):
+        dists = [Distribution(EDGES), Distribution([1, 10, 1000])]
+        with pytest.raises(ValueError) as exc_info:
+            Distribution.merge_all(dists)
+        assert str(exc_info.value) == "Distributions have different edges."
+
+    def test_merge_of_empty(self):
+        for pairwise in [False, True]:
+            result = self.dist_type.merge([], pairwise=pairwise)
+            assert_array_equal(result.values, [0, 0, 0, 0])
+
+    def test_merge_keeps_type_dtype(self):
+        counter_type = self.dist_type.with_dtype(np.uint32)
+        dists = [self.dist_type.from_samples([5]), counter_type.from_samples([5])]
+        result = counter_type.merge(dists)
+        assert result.values.dtype == np.uint32
+        assert_array_equal(result.values, [0, 2, 0, 0])
+
+
+class TestRebin:
+    """Test ``Distribution.rebin``."""
+
+    fine_type = DistributionType.linear(0, 100, 101)
+    coarse_type = DistributionType.linear(0, 100, 11)
+
+    def test_rebin_to_subset(self):
+        samples = np.random.default_rng(0).uniform(-10, 110, 1000)
+        dist = self.fine_type.from_samples(samples)
+        assert dist.rebin(self.coarse_type) == self.coarse_type.from_samples(samples)
+
+    def test_rebin_to_same_edges(self):
+        dist = Distribution(EDGES, [1, 2, 3, 4])
+        assert dist.rebin(EDGES) == dist
+
+    def test_rebin_proportionally(self):
+        dist = Distribution(EDGES, [1, 2, 3, 4])
+        result = dist.rebin([1, 5.5, 10, 50, 100, 1000])
+        assert_array_equal(result.values, [1, 1, 1, 4 / 3, 5 / 3, 4, 0])
+
+    def test_rebin_outer_buckets(self):
+        dist = Distribution(EDGES, [1, 2, 3, 4])
+        result = dist.rebin([0, 20, 200])
+        # Outer samples are at the first edge and just above the last edge.
+        assert_array_equal(result.values, [0, 1 + 2 + 3 * 10 / 90, 3 * 80 / 90 + 4, 0])
+
+    def test_pickle_after_rebin(self):
+        dist = Distribution(EDGES, [1, 2, 3, 4])
+        dist.rebin([1, 50, 100])
+        assert pickle.loads(pickle.dumps(dist)) == dist
+        dist_type = DistributionType(EDGES)
+        assert_array_equal(pickle.loads(pickle.dumps(dist_type)).edges, EDGES)
+        series = pd.Series.dist.from_histogram(EDGES, [[1, 2, 3, 4]])
+        result = pickle.loads(pickle.dumps(series))
+        assert_array_equal(result.dist.values, [[1, 2, 3, 4]])
+
+    def test_rebin_preserves_weight(self):
+        dist = self.fine_type.from_samples(np.linspace(-5, 105, 997))
+        result = dist.rebin(DistributionType.exponential(0.5, 120, 7))
+        assert result.weight == pytest.approx(997)
+
+    def test_rebin_to_integer_type(self):
+        dist = self.fine_type.from_samples([1, 2, 55])
+        result = dist.rebin(self.coarse_type.with_dtype(np.uint32))
+        assert result.values.dtype == np.uint32
+        assert_array_equal(result.values, [0, 2, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0])
+        with pytest.raises(ValueError):
+            dist.rebin(DistributionType([1.5, 50], np.uint32))
+
+    def test_rebin_large_counters(self):
+        uint64_type = DistributionType([0, 1, 2], np.uint64)
+        dist = uint64_type.from_histogram([0, 2 ** 60 + 1, 2 ** 62, 0])
+        result = dist.rebin(DistributionType([0, 2], np.uint64))
+        assert result.values.dtype == np.uint64
+        assert result.values.tolist() == [0, 2 ** 62 + 2 ** 60 + 1, 0]
+        int64_dist = dist.rebin(DistributionType([0, 2], np.int64))
+        assert int64_dist.values.tolist() == [0, 2 ** 62 + 2 ** 60 + 1, 0]
+        large = uint64_type.from_histogram([0, 2 ** 63, 2 ** 63, 0])
+        with pytest.raises(OverflowError):
+            large.rebin(DistributionType([0, 2], np.uint64))
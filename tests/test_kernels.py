@@ -0,0 +1,153 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+
+from distimate import kernels, stats
+from distimate.distributions import Distribution
+from distimate.types import DistributionType
+
+edges = np.array([0.0, 1.0, 10.0, 100.0, 1000.0])
+
+samples = np.r_[
+    np.random.default_rng(0).lognormal(2, 3, 1000),
+    edges,
+    [-np.inf, -1, 0.5, np.inf, np.nan],
+]
+
+
+@pytest.fixture(params=kernels.BACKENDS)
+def backend(request, monkeypatch):
+    if request.param == "numba":
+        pytest.importorskip("numba")
+    # Use kernels also for small inputs of tests.
+    monkeypatch.setattr(kernels, "_MIN_KERNEL_SIZE", 0)
+    original = kernels.get_backend()
+    kernels.set_backend(request.param)
+    yield request.param
+    kernels.set_backend(original)
+
+
+def run_backends(func):
+    # Return results of a function for all available backends.
+    original = (kernels.get_backend(), kernels._MIN_KERNEL_SIZE)
+    kernels._MIN_KERNEL_SIZE = 0
+    results = []
+    try:
+        for name in kernels.BACKENDS:
+            if name == "numba" and kernels.numba is None:
+                continue
+            kernels.set_backend(name)
+            results.append(func())
+    finally:
+        kernels.set_backend(original[0])
+        kernels._MIN_KERNEL_SIZE = original[1]
+    return results
+
+
+class TestBackends:
+    def test_default(self):
+        assert kernels.get_backend() == ("numpy" if kernels.numba is None else "numba")
+
+    def test_unknown(self):
+        with pytest.raises(ValueError, match="Unknown backend"):
+            kernels.set_backend("cython")
+
+    def test_small_inputs(self, monkeypatch):
+        pytest.importorskip("numba")
+        monkeypatch.setattr(kernels, "_backend", "numba")
+
+        def fail(*args):
+            raise AssertionError("Kernel called.")
+
+        monkeypatch.setattr(kernels, "bin_accumulate", fail)
+        monkeypatch.setattr(kernels, "interp_rows_middle", fail)
+        dist = Distribution(edges)
+        dist.update(samples)
+        assert dist.weight == len(samples)
+        stats.quantile(edges, [[0, 1, 1, 0, 0, 0]] * 10, [0.5, 0.9])
+        with pytest.raises(AssertionError, match="Kernel called"):
+            dist.update(np.zeros(kernels._MIN_KERNEL_SIZE))
+
+    def test_missing_numba(self):
+        if kernels.numba is not None:
+            pytest.skip("Numba is installed.")
+        with pytest.raises(ImportError, match="requires numba"):
+            kernels.set_backend("numba")
+
+
+class TestUpdate:
+    def test_update(self, backend):
+        dist = Distribution(edges)
+        dist.update(samples)
+        expected = np.bincount(edges.searchsorted(samples), minlength=len(edges) + 1)
+        assert_array_equal(dist.values, expected)
+
+    def test_update_w_weights(self, backend):
+        dist = Distribution(edges, [1, 2, 3, 4, 5, 6])
+        weights = np.random.default_rng(1).random(len(samples))
+        dist.update(samples, weights)
+        expected = np.array([1, 2, 3, 4, 5, 6], dtype=np.float64)
+        np.add.at(expected, edges.searchsorted(samples), weights)
+        assert_array_equal(dist.values, expected)
+
+    def test_update_w_invalid_weights(self, backend):
+        dist = Distribution(edges)
+        with pytest.raises(ValueError):
+            dist.update([1, 2, 3], [1, 2])
+
+    @pytest.mark.parametrize("weights", [None, 0.1, 3, "random"])
+    def test_same_results(self, weights):
+        rng = np.random.default_rng(2)
+        if weights == "random":
+            weights = rng.random(len(samples))
+        initial = rng.random(len(edges) + 1)
+
+        def update():
+            dist = Distribution(edges, initial)
+            dist.update(samples, weights)
+            dist.update(samples[:3], weights if np.ndim(weights) == 0 else 1)
+            return dist.values
+
+        results = run_backends(update)
+        for result in results[1:]:
+            assert_array_equal(result, results[0])
+
+    def test_same_results_of_integer_samples(self):
+        dist_type = DistributionType.linear(0, 100, 11)
+        values = np.arange(-10, 120)
+        results = run_backends(lambda: dist_type.from_samples(values).values)
+        for result in results[1:]:
+            assert_array_equal(result, results[0])
+
+
+class TestQuantile:
+    def test_quantile(self, backend):
+        hist = [[0, 1, 1, 0, 0, 0], [0, 0, 0, 0, 0, 0], [1, 0, 0, 0, 0, 1]]
+        result = stats.quantile(edges, hist, [0, 0.5, 1, np.nan])
+        expected = [
+            stats.Quantile(edges, row)([0, 0.5, 1, np.nan]) for row in hist
+        ]
+        assert_array_equal(result, expected)
+
+    def test_same_results(self):
+        rng = np.random.default_rng(3)
+        # Many empty buckets give vertical and horizontal chains.
+        hist = rng.integers(0, 3, (100, len(edges) + 1)) * rng.integers(0, 2, 6)
+        q = np.r_[rng.random(100), [0, 0.5, 1, -0.1, 1.1, np.nan]]
+        results = run_backends(lambda: stats.quantile(edges, hist, q))
+        for result in results[1:]:
+            assert_array_equal(result, results[0])
@@ -14,12 +14,17 @@
 
 import numpy as np
 import pandas as pd
+import pytest
 from numpy.testing import assert_array_equal
 from pandas.testing import assert_frame_equal, assert_series_equal
 
+from distimate import pandasext
+from distimate.pandasext import DistributionDtype, DistributionExtensionArray
+from distimate.sparse import SparseDistribution
 from distimate.types import DistributionType
 
 dist_type = DistributionType([0, 10, 100])
+dist_dtype = DistributionDtype(dist_type)
 
 
 class TestDistributionAccessor:
@@ -33,13 +38,20 @@ class TestDistributionAccessor:
         histograms = [[1.0, 1.0, 0.0, 0.0], [0.0, 1.0, 1.0, 0.0]]
         assert_series_equal(
             pd.Series.dist.from_histogram(dist_type, histograms, name="price"),
-            pd.Series(self.dists, name="price"),
+            pd.Series(self.dists, dtype=dist_dtype, name="price"),
         )
 
+    def test_from_histogram_reuses_type(self):
+        histograms = [[1.0, 1.0, 0.0, 0.0]]
+        series1 = pd.Series.dist.from_histogram([0, 10, 100], histograms)
+        series2 = pd.Series.dist.from_histogram([0, 10, 100], histograms)
+        assert series1.dtype.dist_type is series2.dtype.dist_type
+        assert series1.iloc[0].edges is dist_type.edges
+
     def test_from_empty_histogram_array(self):
         assert_series_equal(
             pd.Series.dist.from_histogram(dist_type, [], name="price"),
-            pd.Series([], name="price"),
+            pd.Series([], dtype=dist_dtype, name="price"),
         )
 
     def test_from_histogram_frame(self):
@@ -49,7 +61,7 @@ class TestDistributionAccessor:
         )
         assert_series_equal(
             pd.Series.dist.from_histogram(dist_type, histograms, name="price"),
-            pd.Series(self.dists, index=index, name="price"),
+            pd.Series(self.dists, index=index, dtype=dist_dtype, name="price"),
         )
 
     def test_from_empty_histogram_frame(self):
@@ -57,27 +69,27 @@ class TestDistributionAccessor:
         histograms = pd.DataFrame(index=index, columns=range(4))
         assert_series_equal(
             pd.Series.dist.from_histogram(dist_type, histograms, name="price"),
-            pd.Series([], index=index, name="price"),
+            pd.Series([], index=index, dtype=dist_dtype, name="price"),
         )
 
     def test_from_histogram_using_edges(self):
         histograms = [[1.0, 1.0, 0.0, 0.0], [0.0, 1.0, 1.0, 0.0]]
         assert_series_equal(
             pd.Series.dist.from_histogram([0, 10, 100], histograms, name="price"),
-            pd.Series(self.dists, name="price"),
+            pd.Series(self.dists, dtype=dist_dtype, name="price"),
         )
 
     def test_from_cumulative_array(self):
         cumulatives = [[1, 2, 2.0, 2.0], [0.0, 1.0, 2.0, 2.0]]
         assert_series_equal(
             pd.Series.dist.from_cumulative(dist_type, cumulatives, name="price"),
-            pd.Series(self.dists, name="price"),
+            pd.Series(self.dists, dtype=dist_dtype, name="price"),
         )
 
     def test_from_empty_cumulative_array(self):
         assert_series_equal(
             pd.Series.dist.from_cumulative(dist_type, [], name="price"),
-            pd.Series([], name="price"),
+            pd.Series([], dtype=dist_dtype, name="price"),
         )
 
     def test_from_cumulative_frame(self):
@@ -87,7 +99,7 @@ class TestDistributionAccessor:
         )
         assert_series_equal(
             pd.Series.dist.from_cumulative(dist_type, cumulatives, name="price"),
-            pd.Series(self.dists, index=index, name="price"),
+            pd.Series(self.dists, index=index, dtype=dist_dtype, name="price"),
         )
 
     def test_from_empty_cumulative_frame(self):
@@ -95,14 +107,23 @@ class TestDistributionAccessor:
         cumulatives = pd.DataFrame(index=index, columns=range(4))
         assert_series_equal(
             pd.Series.dist.from_cumulative(dist_type, cumulatives, name="price"),
-            pd.Series([], index=index, name="price"),
+            pd.Series([], index=index, dtype=dist_dtype, name="price"),
         )
 
     def test_from_cumulative_usign_edges(self):
         cumulatives = [[1, 2, 2.0, 2.0], [0.0, 1.0, 2.0, 2.0]]
         assert_series_equal(
             pd.Series.dist.from_cumulative([0, 10, 100], cumulatives, name="price"),
-            pd.Series(self.dists, name="price"),
+            pd.Series(self.dists, dtype=dist_dtype, name="price"),
+        )
+
+    def test_from_grouped_samples(self):
+        keys = pd.Series(["b", "a", "b", "a"], name="key")
+        samples = [10, 0, 20, 5]
+        expected_index = pd.Index(["a", "b"], name="key")
+        assert_series_equal(
+            pd.Series.dist.from_grouped_samples(dist_type, keys, samples, name="price"),
+            pd.Series(self.dists, index=expected_index, dtype=dist_dtype, name="price"),
         )
 
     def test_to_histogram_of_anonymous_series(self):
@@ -299,3 +320,239 @@ class TestDistributionAccessor:
                 index=pd.Index(["a"], name="cat"),
             ),
         )
+
+    def test_dist_sum(self):
+        series = pd.Series([self.dist1, None, self.dist2])
+        assert series.dist.sum() == dist_type.from_samples([0, 5, 10, 20])
+
+    def test_dist_sum_by(self):
+        series = pd.Series(self.dists + [self.dist2])
+        result = series.dist.sum(by=["b", "a", "b"])
+        assert result.dtype == dist_dtype
+        assert_array_equal(result.index, ["a", "b"])
+        assert result["a"] == self.dist2
+        assert result["b"] == dist_type.from_samples([0, 5, 10, 20])
+
+    def test_dist_sum_of_mixed_edges(self):
+        dist = DistributionType([0, 1, 2]).from_samples([0])
+        series = pd.Series([self.dist1, dist])
+        with pytest.raises(ValueError) as exc_info:
+            series.dist.sum()
+        assert str(exc_info.value) == "Distributions have different edges."
+
+
+class TestDistributionExtensionArray:
+
+    dist1 = dist_type.from_samples([0, 5])
+    dist2 = dist_type.from_samples([10, 20])
+
+    def test_dtype(self):
+        series = pd.Series([self.dist1, self.dist2], dtype=dist_dtype)
+        assert isinstance(series.array, DistributionExtensionArray)
+        assert series.dtype == DistributionDtype([0, 10, 100])
+        assert series.dtype != DistributionDtype([0, 10, 1000])
+
+    def test_dtype_from_string(self):
+        assert pd.api.types.pandas_dtype("distimate[0, 10, 100]") == dist_dtype
+        assert repr(dist_dtype) == "distimate[0, 10, 100]"
+
+    def test_dtype_name_round_trip(self):
+        dtype = DistributionDtype([0, 0.5, 1e-3 + 1, 2 ** 60])
+        series = pd.Series([dtype.dist_type.from_samples([0.7])], dtype=dtype)
+        assert str(series.dtype) == repr(dtype) == dtype.name
+        assert pd.api.types.pandas_dtype(str(series.dtype)) == dtype
+        assert DistributionDtype.construct_from_string(dtype.name) == dtype
+        result = series.astype(str(series.dtype))
+        assert result.dtype == dtype
+        assert result[0] == series[0]
+
+    def test_dtype_name_w_infinite_edges(self):
+        dtype = DistributionDtype([-np.inf, 0, 10, np.inf])
+        assert dtype.name == "distimate[-inf, 0, 10, inf]"
+        assert pd.api.types.pandas_dtype(dtype.name) == dtype
+
+    def test_dtype_from_invalid_string(self):
+        for string in ["distimate[garbage]", "distimate[]", "distimate[0, x]"]:
+            with pytest.raises(TypeError):
+                DistributionDtype.construct_from_string(string)
+        with pytest.raises(TypeError):
+            pd.api.types.pandas_dtype("distimate[garbage]")
+
+    def test_infer_dtype(self):
+        array = DistributionExtensionArray._from_sequence([None, self.dist1])
+        assert array.dtype == dist_dtype
+
+    def test_different_edges(self):
+        dist = DistributionType([0, 1, 2]).from_samples([0])
+        with pytest.raises(ValueError) as exc_info:
+            pd.Series([self.dist1, dist], dtype=dist_dtype)
+        assert str(exc_info.value) == "Distributions have different edges."
+
+    def test_invalid_histograms(self):
+        with pytest.raises(ValueError):
+            pd.Series.dist.from_histogram(dist_type, [[1, -1, 0, 0]])
+        with pytest.raises(ValueError):
+            pd.Series.dist.from_histogram(dist_type, [[1, np.nan, 0, 0]])
+        with pytest.raises(ValueError):
+            DistributionExtensionArray(dist_type, [[1, -1, 0, 0]], [False])
+        array = DistributionExtensionArray(dist_type, [[1, -1, 0, 0]], [True])
+        assert array.isna().all()
+        assert_array_equal(array.values, [[0, 0, 0, 0]])
+
+    def test_inexact_counters(self):
+        counter_type = dist_type.with_dtype(np.uint64)
+        histograms = [[2 ** 53, 0, 0, 0], [2 ** 53 + 1, 0, 0, 0]]
+        series = pd.Series.dist.from_histogram(counter_type, histograms[:1])
+        assert series[0].values[0] == 2 ** 53
+        with pytest.raises(ValueError):
+            pd.Series.dist.from_histogram(counter_type, histograms)
+        dist = counter_type.from_histogram(histograms[1])
+        with pytest.raises(ValueError):
+            pd.Series([dist], dtype=dist_dtype)
+        with pytest.raises(ValueError):
+            series[0] = dist
+
+    def test_getitem(self):
+        series = pd.Series([self.dist1, None], dtype=dist_dtype)
+        assert series[0] == self.dist1
+        assert pd.isna(series[1])
+
+    def test_setitem(self):
+        series = pd.Series([self.dist1, None], dtype=dist_dtype)
+        series[0] = None
+        series[1] = self.dist2
+        assert_array_equal(series.isna(), [True, False])
+        assert series[1] == self.dist2
+
+    def test_isna(self):
+        series = pd.Series([self.dist1, None, self.dist2], dtype=dist_dtype)
+        assert_array_equal(series.isna(), [False, True, False])
+        assert_array_equal(
+            series.dropna().dist.values, [self.dist1.values, self.dist2.values]
+        )
+
+    def test_values_with_missing_data(self):
+        series = pd.Series([self.dist1, None], dtype=dist_dtype)
+        assert_array_equal(series.dist.values, [[1.0, 1.0, 0.0, 0.0], [np.nan] * 4])
+
+    def test_take(self):
+        series = pd.Series([self.dist1, self.dist2], dtype=dist_dtype)
+        reindexed = series.reindex([1, 2, 0])
+        assert reindexed.dtype == dist_dtype
+        assert_array_equal(reindexed.isna(), [False, True, False])
+        assert reindexed[1] == self.dist2
+        assert reindexed[0] == self.dist1
+
+    def test_concat(self):
+        series = pd.Series([self.dist1, self.dist2], dtype=dist_dtype)
+        result = pd.concat([series, series], ignore_index=True)
+        assert result.dtype == dist_dtype
+        assert_array_equal(result.dist.values, np.tile(series.dist.values, (2, 1)))
+
+    def test_memory_usage(self):
+        series = pd.Series([self.dist1, self.dist2], dtype=dist_dtype)
+        assert series.memory_usage(index=False) == 2 * 4 * 8 + 2
+
+    def test_eq(self):
+        series = pd.Series([self.dist1, self.dist2, None], dtype=dist_dtype)
+        assert_array_equal(series.array == self.dist1, [True, False, False])
+
+    def test_series_eq_distribution(self):
+        series = pd.Series([self.dist1, self.dist2, None], dtype=dist_dtype)
+        assert_series_equal(series == self.dist1, pd.Series([True, False, False]))
+        assert_series_equal(series != self.dist1, pd.Series([False, True, True]))
+
+    def test_series_eq_series(self):
+        series = pd.Series([self.dist1, self.dist2, None], dtype=dist_dtype)
+        other = pd.Series([self.dist1, self.dist1, None], dtype=dist_dtype)
+        assert_series_equal(series == other, pd.Series([True, False, False]))
+        assert_series_equal(series != other, pd.Series([False, True, True]))
+
+    def test_astype_object(self):
+        series = pd.Series([self.dist1, self.dist2], dtype=dist_dtype)
+        assert_series_equal(series.astype(object), pd.Series([self.dist1, self.dist2]))
+
+    def test_sum(self):
+        series = pd.Series([self.dist1, None, self.dist2], dtype=dist_dtype)
+        assert series.sum() == dist_type.from_samples([0, 5, 10, 20])
+
+    def test_groupby_sum(self):
+        df = pd.DataFrame(
+            {
+                "cat": ["a", "b", "a"],
+                "price": pd.Series(
+                    [self.dist1, self.dist2, self.dist2], dtype=dist_dtype
+                ),
+            }
+        )
+        result = df.groupby("cat")["price"].sum()
+        assert result.dtype == dist_dtype
+        assert result["a"] == dist_type.from_samples([0, 5, 10, 20])
+        assert result["b"] == self.dist2
+
+    @pytest.mark.parametrize("chunk_size", [2 ** 20, 4, 40])
+    def test_groupby_sum_matches_distributions(self, chunk_size, monkeypatch):
+        monkeypatch.setattr(pandasext, "_SEGMENT_CHUNK_SIZE", chunk_size)
+        rng = np.random.default_rng(0)
+        histograms = rng.random((200, 4))
+        keys = rng.integers(0, 7, 200)
+        series = pd.Series.dist.from_histogram(dist_type, histograms)
+        series[5] = None
+        result = series.groupby(keys).sum()
+        for key in range(7):
+            expected = dist_type.empty()
+            for dist in series[keys == key].dropna():
+                expected += dist
+            assert_array_equal(result[key].values, expected.values)
+
+    def test_groupby_sum_w_min_count(self):
+        series = pd.Series([self.dist1, None, self.dist2], dtype=dist_dtype)
+        result = series.groupby(["a", "b", "a"]).sum(min_count=1)
+        assert_array_equal(result.isna(), [False, True])
+
+    def test_groupby_first_last(self):
+        series = pd.Series([None, self.dist1, self.dist2], dtype=dist_dtype)
+        grouped = series.groupby(["a", "a", "a"])
+        assert grouped.first()["a"] == self.dist1
+        assert grouped.last()["a"] == self.dist2
+        assert grouped.first().dtype == dist_dtype
+
+    def test_quantile_with_missing_data(self):
+        series = pd.Series([self.dist1, None, self.dist2], dtype=dist_dtype)
+        assert_frame_equal(
+            series.dist.quantile([0.5, 1]),
+            pd.DataFrame({"q50": [0.0, np.nan, 10.0], "q100": [10.0, np.nan, 100.0]}),
+        )
+
+    def test_cdf_matches_distributions(self):
+        rng = np.random.default_rng(0)
+        histograms = rng.integers(0, 3, size=(50, 4)) * (rng.random((50, 4)) < 0.5)
+        series = pd.Series.dist.from_histogram(dist_type, histograms)
+        v = [-1, 0, 5, 10, 50, 100, 200]
+        expected = [dist.cdf(v) for dist in series.astype(object)]
+        assert_array_equal(series.dist.cdf(v).values, expected)
+
+
+class TestMixedEdges:
+    def test_cdf_of_mixed_edges(self):
+        dist1 = DistributionType([0, 10, 100]).from_samples([0, 5])
+        dist2 = DistributionType([0, 20, 100]).from_samples([10, 20])
+        series = pd.Series([dist1, None, dist2])
+        assert_series_equal(
+            series.dist.cdf(10), pd.Series([1.0, np.nan, 0.5], name="cdf10")
+        )
+
+    def test_cdf_of_sparse_distributions(self):
+        dist1 = SparseDistribution.from_samples(dist_type, [0, 5])
+        dist2 = dist_type.from_samples([10, 20])
+        series = pd.Series([dist1, None, dist2])
+        assert_series_equal(
+            series.dist.cdf(10), pd.Series([1.0, np.nan, 0.5], name="cdf10")
+        )
+
+    def test_cdf_of_invalid_values(self):
+        dist = dist_type.from_samples([0, 5])
+        for value in ["foo", 1.5]:
+            series = pd.Series([dist, value])
+            with pytest.raises(TypeError):
+                series.dist.cdf(10)
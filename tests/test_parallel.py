@@ -0,0 +1,85 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+
+from distimate import parallel
+from distimate.types import DistributionType
+
+dist_type = DistributionType.log_linear(0.01, 100, 8)
+
+rng = np.random.default_rng(0)
+samples = rng.exponential(1, 10001)
+weights = rng.integers(0, 5, 10001).astype(np.float64)
+
+
+@pytest.fixture
+def samples_path(tmp_path):
+    path = tmp_path / "samples.npy"
+    np.save(path, samples)
+    return path
+
+
+class TestFromSamples:
+    def test_array(self):
+        dist = parallel.from_samples(dist_type, samples, max_workers=2, chunk_size=999)
+        assert_array_equal(dist.values, dist_type.from_samples(samples).values)
+
+    def test_array_w_weights(self):
+        dist = parallel.from_samples(
+            dist_type, samples, weights, max_workers=2, chunk_size=999
+        )
+        expected = dist_type.from_samples(samples, weights)
+        assert_array_equal(dist.values, expected.values)
+
+    def test_array_w_scalar_weight(self):
+        dist = parallel.from_samples(dist_type, samples, 3, max_workers=2)
+        assert_array_equal(dist.values, dist_type.from_samples(samples, 3).values)
+
+    def test_path(self, samples_path):
+        dist = parallel.from_samples(
+            dist_type, samples_path, max_workers=2, chunk_size=999
+        )
+        assert_array_equal(dist.values, dist_type.from_samples(samples).values)
+
+    def test_memmap_slice(self, samples_path):
+        memmap = np.load(samples_path, mmap_mode="r")[100:]
+        dist = parallel.from_samples(dist_type, memmap, max_workers=2, chunk_size=999)
+        assert_array_equal(dist.values, dist_type.from_samples(samples[100:]).values)
+
+    def test_empty(self):
+        dist = parallel.from_samples(dist_type, np.array([]))
+        assert dist.weight == 0
+
+    def test_different_lengths(self):
+        with pytest.raises(ValueError) as exc_info:
+            parallel.from_samples(dist_type, samples, weights[1:])
+        assert str(exc_info.value) == "Weights must have same length as samples."
+
+    def test_invalid_chunk_size(self):
+        with pytest.raises(ValueError):
+            parallel.from_samples(dist_type, samples, chunk_size=0)
+
+    def test_invalid_weights_shape(self):
+        with pytest.raises(ValueError) as exc_info:
+            parallel.from_samples(dist_type, samples, np.ones((2, 2)))
+        assert str(exc_info.value) == "Weights must be 1-D array-like."
+
+    def test_non_contiguous_memmap(self, samples_path):
+        memmap = np.load(samples_path, mmap_mode="r")[::2]
+        with pytest.raises(ValueError) as exc_info:
+            parallel.from_samples(dist_type, memmap)
+        assert str(exc_info.value) == "Memory-mapped samples must be contiguous."
@@ -0,0 +1,115 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pandas as pd
+import pytest
+
+from distimate.distributions import Distribution
+from distimate.profiling import profile
+from distimate.sparse import SparseDistribution
+from distimate.stats import PDF, Quantile
+from distimate.types import DistributionType
+
+dist_type = DistributionType([0, 10, 100])
+
+
+class TestProfile:
+    def test_ingestion(self):
+        dist = Distribution(dist_type)
+        with profile() as report:
+            dist.add(1)
+            dist.add(2, 3)
+            dist.update([1, 2, 3])
+            dist.update(values=[1, 2])
+        assert report.to_dict().keys() == {"Distribution.add", "Distribution.update"}
+        assert report.counters["Distribution.add"].calls == 2
+        assert report.counters["Distribution.add"].elements == 2
+        assert report.counters["Distribution.update"].calls == 2
+        assert report.counters["Distribution.update"].elements == 5
+        assert report.counters["Distribution.update"].time > 0
+
+    def test_sparse_ingestion(self):
+        dist = SparseDistribution(dist_type)
+        with profile() as report:
+            dist.update([1, 2, 3])
+        assert report.counters["SparseDistribution.update"].elements == 3
+
+    def test_stats(self):
+        dist = Distribution(dist_type, [0, 1, 2, 3])
+        with profile() as report:
+            dist.quantile([0.1, 0.5])
+            dist.quantile(0.9)
+            PDF([0, 1], [1, 2, 3])
+        counters = report.counters
+        assert counters["Quantile.__init__"].calls == 1
+        assert counters["Quantile.__init__"].elements == 4
+        assert counters["Quantile.__call__"].calls == 2
+        assert counters["Quantile.__call__"].elements == 3
+        assert counters["PDF.__init__"].elements == 3
+        assert "CDF.__init__" not in counters
+
+    def test_pandas_accessor(self):
+        with profile() as report:
+            series = pd.Series.dist.from_histogram(dist_type, [[1, 2, 3, 4]] * 5)
+            series.dist.quantile([0.5, 0.9])
+            series.dist.sum()
+        counters = report.counters
+        assert counters["Series.dist.from_histogram"].elements == 5
+        assert counters["Series.dist.quantile"].calls == 1
+        assert counters["Series.dist.quantile"].elements == 5
+        assert counters["Series.dist.sum"].elements == 5
+
+    def test_off_by_default(self):
+        add = Distribution.add
+        call = Quantile.__call__
+        with profile() as report:
+            assert Distribution.add is not add
+            assert "__call__" in vars(Quantile)
+        assert Distribution.add is add
+        assert Quantile.__call__ is call
+        assert "__call__" not in vars(Quantile)
+        Distribution(dist_type).add(1)
+        assert "Distribution.add" not in report.counters
+
+    def test_nested(self):
+        dist = Distribution(dist_type)
+        with profile() as outer:
+            dist.add(1)
+            with profile() as inner:
+                dist.add(1)
+            dist.add(1)
+        assert outer.counters["Distribution.add"].calls == 3
+        assert inner.counters["Distribution.add"].calls == 1
+
+    def test_hook(self):
+        reports = []
+        with profile(hook=reports.append) as report:
+            Distribution(dist_type).add(1)
+        assert reports == [report]
+
+    def test_exception(self):
+        dist = Distribution(dist_type)
+        add = Distribution.add
+        with pytest.raises(ValueError, match="Value must be a scalar."):
+            with profile() as report:
+                dist.add([1, 2])
+        assert report.counters["Distribution.add"].calls == 1
+        assert Distribution.add is add
+
+    def test_invalid_arguments(self):
+        dist = Distribution(dist_type)
+        with profile() as report:
+            with pytest.raises(TypeError):
+                dist.update()
+        assert report.counters["Distribution.update"].elements == 0
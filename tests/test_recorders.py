@@ -0,0 +1,136 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+
+from distimate.recorders import ShardedRecorder
+from distimate.types import DistributionType
+
+dist_type = DistributionType([0, 10, 100])
+
+
+def run_threads(target, count):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+class TestShardedRecorder:
+    def test_empty(self):
+        recorder = ShardedRecorder(dist_type)
+        assert_array_equal(recorder.snapshot().values, [0, 0, 0, 0])
+
+    def test_add(self):
+        recorder = ShardedRecorder(dist_type)
+        recorder.add(5)
+        recorder.add(50, weight=2)
+        assert_array_equal(recorder.snapshot().values, [0, 1, 2, 0])
+
+    def test_update(self):
+        recorder = ShardedRecorder(dist_type)
+        recorder.update([0, 5, 500], [1, 2, 3])
+        assert_array_equal(recorder.snapshot().values, [1, 2, 0, 3])
+
+    def test_snapshot_after_errors(self):
+        recorder = ShardedRecorder(dist_type)
+        recorder.add(5)
+        with pytest.raises(ValueError, match="same length"):
+            recorder.update([1, 2, 3], [1, 2])
+        with pytest.raises(ValueError, match="must be a scalar"):
+            recorder.add(5, [1, 2])
+        # Fails while writing, after the shard was marked as being updated.
+        with pytest.raises(Exception):
+            recorder.add(5, "heavy")
+        snapshots = []
+        thread = threading.Thread(
+            target=lambda: snapshots.append(recorder.snapshot()), daemon=True
+        )
+        thread.start()
+        thread.join(timeout=5)
+        assert snapshots, "Snapshot did not return."
+        assert_array_equal(snapshots[0].values, [0, 1, 0, 0])
+
+    def test_shards_of_threads(self):
+        recorder = ShardedRecorder(dist_type)
+        run_threads(lambda i: recorder.add(5), 4)
+        assert repr(recorder) == "<ShardedRecorder: shards=4>"
+        assert_array_equal(recorder.snapshot().values, [0, 4, 0, 0])
+
+    def test_no_lost_counts(self):
+        recorder = ShardedRecorder(dist_type)
+
+        def record(i):
+            for _ in range(2000):
+                recorder.add(5)
+                recorder.update([50, 500])
+
+        run_threads(record, 8)
+        assert_array_equal(recorder.snapshot().values, [0, 16000, 16000, 16000])
+
+    def test_snapshots_while_recording(self):
+        recorder = ShardedRecorder(dist_type)
+        done = threading.Event()
+        snapshots = []
+
+        def record(i):
+            for _ in range(2000):
+                recorder.update([5, 50])
+
+        def read():
+            while not done.is_set():
+                snapshots.append(recorder.snapshot().values)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        run_threads(record, 4)
+        done.set()
+        reader.join()
+        snapshots.append(recorder.snapshot().values)
+        for values in snapshots:
+            # Both samples of each update are included, or none of them.
+            assert values[1] == values[2]
+        weights = [values.sum() for values in snapshots]
+        assert np.all(np.diff(weights) >= 0)
+        assert weights[-1] == 16000
+
+    def test_integer_counters(self):
+        recorder = ShardedRecorder(dist_type.with_dtype(np.uint64))
+        recorder.add(5, 2 ** 60)
+        recorder.add(5)
+        recorder.update([50, 500], [1, 2])
+        with pytest.raises(ValueError):
+            recorder.add(0.5, 0.5)
+        with pytest.raises(ValueError):
+            recorder.update([50, 500], [1, 0.5])
+        with pytest.raises(ValueError):
+            recorder.update([50], -1)
+        snapshot = recorder.snapshot()
+        assert snapshot.values.dtype == np.uint64
+        assert snapshot.values[1] == 2 ** 60 + 1
+        assert_array_equal(snapshot.values, [0, 2 ** 60 + 1, 1, 2])
+
+    def test_integer_overflow(self):
+        recorder = ShardedRecorder(dist_type.with_dtype(np.uint32))
+        recorder.add(5, 2 ** 32 - 1)
+        with pytest.raises(OverflowError):
+            recorder.add(5)
+        with pytest.raises(OverflowError):
+            recorder.update([5])
+        assert_array_equal(recorder.snapshot().values, [0, 2 ** 32 - 1, 0, 0])
@@ -0,0 +1,163 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+
+from distimate.distributions import Distribution
+from distimate.sparse import SparseDistribution
+from distimate.types import DistributionType
+
+dist_type = DistributionType.linear(0, 100, 101)
+
+
+class TestSparseDistribution:
+    def test_empty(self):
+        dist = SparseDistribution(dist_type)
+        assert dist.is_sparse
+        assert dist.bucket_count == 0
+        assert_array_equal(dist.to_histogram(), np.zeros(102))
+        assert repr(dist) == "<SparseDistribution: weight=0, buckets=0>"
+
+    def test_add(self):
+        dist = SparseDistribution(dist_type)
+        dist.add(50)
+        dist.add(10, 2)
+        dist.add(50)
+        assert dist.is_sparse
+        assert dist.bucket_count == 2
+        assert dist.values[10] == 2
+        assert dist.values[50] == 2
+
+    def test_update(self):
+        dist = SparseDistribution(dist_type)
+        dist.update([50, 10, 50], [1, 2, 3])
+        dist.update([10])
+        assert dist.is_sparse
+        assert dist.values[10] == 3
+        assert dist.values[50] == 4
+
+    def test_integer_counters(self):
+        counter_type = dist_type.with_dtype(np.uint32)
+        dist = SparseDistribution(counter_type)
+        dist.update([50, 10, 50], [1, 2, 3])
+        dist.add(10)
+        assert dist.is_sparse
+        assert dist.values.dtype == np.uint32
+        assert dist.values[10] == 3
+        assert dist.values[50] == 4
+        with pytest.raises(ValueError):
+            dist.update([10], 0.5)
+
+    def test_convert_to_dense(self):
+        dist = SparseDistribution.from_samples(dist_type, np.arange(60))
+        assert not dist.is_sparse
+        assert dist == dist_type.from_samples(np.arange(60))
+
+    def test_convert_to_sparse(self):
+        dense = SparseDistribution.from_samples(dist_type, np.arange(100))
+        assert not dense.is_sparse
+        dist = SparseDistribution.from_histogram(dist_type, np.eye(102)[5])
+        assert dist.is_sparse
+        assert dist.bucket_count == 1
+
+    def test_merge(self):
+        dist1 = SparseDistribution.from_samples(dist_type, [10, 20])
+        dist2 = SparseDistribution.from_samples(dist_type, [20, 30])
+        result = dist1 + dist2
+        assert result.is_sparse
+        assert result == dist_type.from_samples([10, 20, 20, 30])
+        assert dist1 == dist_type.from_samples([10, 20])
+
+    def test_merge_w_dense(self):
+        dist = SparseDistribution.from_samples(dist_type, [10, 20])
+        dense = dist_type.from_samples([20, 30])
+        assert dist + dense == dist_type.from_samples([10, 20, 20, 30])
+        assert dense + dist == dist_type.from_samples([10, 20, 20, 30])
+        dist += dense
+        assert dist.is_sparse
+        assert dist == dist_type.from_samples([10, 20, 20, 30])
+
+    def test_merge_w_different_edges(self):
+        dist = SparseDistribution(dist_type)
+        with pytest.raises(ValueError) as exc_info:
+            dist += SparseDistribution([0, 1, 2])
+        assert str(exc_info.value) == "Distributions have different edges."
+
+    def test_same_histogram_as_dense(self):
+        rng = np.random.default_rng(0)
+        sparse = SparseDistribution(dist_type)
+        dense = Distribution(dist_type)
+        for _ in range(10):
+            samples = rng.normal(50, 3, 20)
+            weights = rng.random(20)
+            sparse.update(samples, weights)
+            dense.update(samples, weights)
+        assert sparse.is_sparse
+        assert sparse.values.tobytes() == dense.values.tobytes()
+
+    def test_same_float32_histogram_as_dense(self):
+        float_type = dist_type.with_dtype(np.float32)
+        rng = np.random.default_rng(0)
+        sparse = SparseDistribution(float_type)
+        dense = float_type.empty()
+        for _ in range(10):
+            samples = rng.normal(50, 3, 20)
+            weights = rng.random(20)
+            sparse.update(samples, weights)
+            dense.update(samples, weights)
+        assert sparse.is_sparse
+        assert sparse.values.dtype == np.float32
+        assert sparse.values.tobytes() == dense.values.tobytes()
+
+    def test_same_statistics_as_dense(self):
+        samples = np.random.default_rng(0).normal(50, 3, 100)
+        sparse = SparseDistribution.from_samples(dist_type, samples)
+        dense = dist_type.from_samples(samples)
+        q = np.linspace(0, 1, 11)
+        v = np.linspace(-10, 110, 25)
+        assert sparse.is_sparse
+        assert_array_equal(sparse.quantile(q), dense.quantile(q))
+        assert_array_equal(sparse.cdf(v), dense.cdf(v))
+        assert_array_equal(sparse.pdf(v), dense.pdf(v))
+        assert sparse.mean == dense.mean
+        assert_array_equal(sparse.to_cumulative(), dense.to_cumulative())
+
+    def test_to_dense(self):
+        dist = SparseDistribution.from_samples(dist_type, [10, 20])
+        dense = dist.to_dense()
+        assert isinstance(dense, Distribution)
+        assert dense == dist_type.from_samples([10, 20])
+
+    def test_from_distribution(self):
+        dense = dist_type.from_samples([10, 20])
+        dist = SparseDistribution.from_distribution(dense)
+        assert dist.is_sparse
+        assert dist == dense
+
+    def test_from_dense_distribution_does_not_share_values(self):
+        dense = dist_type.from_samples(np.arange(100))
+        median = dense.quantile(0.5)
+        dist = SparseDistribution.from_distribution(dense)
+        assert not dist.is_sparse
+        dist.add(0.5)
+        assert dense.weight == 100
+        assert dense.quantile(0.5) == median
+
+    def test_from_histogram_does_not_share_values(self):
+        histogram = np.ones(102)
+        dist = SparseDistribution.from_histogram(dist_type, histogram)
+        dist.add(0.5)
+        assert_array_equal(histogram, np.ones(102))
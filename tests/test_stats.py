@@ -372,3 +372,59 @@ class TestQuantileFunction:
         assert_func_values(
             quantile, [0, 3 / 8, 3 / 4, 7 / 8, 1], [1, 5.5, 55, 550, 1000],
         )
+
+    def test_quantile_of_sorted_and_unsorted_points(self):
+        quantile = distimate.Quantile([1, 10, 100, 1000], [0, 3, 0, 1, 0])
+        points = np.random.default_rng(0).random(100)
+        assert_allclose(quantile(np.sort(points)), np.sort(quantile(points)))
+        assert_allclose(
+            quantile(points),
+            distimate.stats.interp_middle(
+                points, quantile.x, quantile.y, left=np.nan, right=np.nan
+            ),
+        )
+
+
+class TestRowFunctions:
+    """Test that functions for 2-D histograms match per-histogram classes."""
+
+    edges = [1, 10, 100]
+    hists = np.array(
+        [
+            [0, 0, 0, 0],
+            [7, 0, 0, 0],
+            [0, 0, 0, 7],
+            [3, 0, 1, 0],
+            [0, 3, 0, 1],
+            [3, 0, 0, 1],
+            [0, 3, 1, 0],
+        ]
+    )
+
+    def test_mean(self):
+        expected = [distimate.mean(self.edges, hist) for hist in self.hists]
+        assert_allclose(distimate.stats.mean(self.edges, self.hists), expected)
+
+    def test_pdf(self):
+        v = [np.nan, 0.9, 1, 2, 10, 20, 100, 101]
+        expected = [distimate.PDF(self.edges, hist)(v) for hist in self.hists]
+        assert_allclose(distimate.stats.pdf(self.edges, self.hists, v), expected)
+
+    def test_cdf(self):
+        v = [np.nan, 0.9, 1, 5.5, 10, 55, 100, 101]
+        expected = [distimate.CDF(self.edges, hist)(v) for hist in self.hists]
+        assert_allclose(distimate.stats.cdf(self.edges, self.hists, v), expected)
+
+    def test_quantile(self):
+        q = [np.nan, -1, 0, 3 / 8, 3 / 4, 7 / 8, 1, 2]
+        expected = [distimate.Quantile(self.edges, hist)(q) for hist in self.hists]
+        assert_allclose(distimate.stats.quantile(self.edges, self.hists, q), expected)
+
+    def test_scalar_input(self):
+        result = distimate.stats.quantile(self.edges, self.hists, 0.5)
+        assert result.shape == (len(self.hists),)
+
+    def test_1d_histogram(self):
+        result = distimate.stats.cdf(self.edges, [3, 0, 1, 0], 55)
+        assert np.ndim(result) == 0
+        assert result == 7 / 8
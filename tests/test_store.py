@@ -0,0 +1,165 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+
+from distimate import store
+from distimate.store import DistributionStore
+from distimate.types import DistributionType
+
+dist_type = DistributionType([0, 10, 100])
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "dists.bin"
+
+
+class TestDistributionStore:
+
+    dist1 = dist_type.from_samples([0, 5])
+    dist2 = dist_type.from_samples([10, 20])
+
+    def test_create(self, path):
+        dists = DistributionStore(path, dist_type)
+        assert len(dists) == 0
+        assert_array_equal(dists.edges, [0, 10, 100])
+
+    def test_create_without_type(self, path):
+        with pytest.raises(ValueError) as exc_info:
+            DistributionStore(path)
+        assert str(exc_info.value) == "Distribution type is required for a new store."
+
+    def test_append(self, path):
+        dists = DistributionStore(path, dist_type)
+        dists.append(self.dist1)
+        dists.append(self.dist2)
+        assert len(dists) == 2
+        assert dists[0] == self.dist1
+        assert dists[-1] == self.dist2
+
+    def test_extend(self, path):
+        dists = DistributionStore(path, dist_type)
+        dists.extend([self.dist1, self.dist2])
+        dists.extend(dist_type.array_from_distributions([self.dist1]))
+        assert_array_equal(
+            dists[1:].values, [self.dist2.values, self.dist1.values],
+        )
+
+    def test_reopen(self, path):
+        DistributionStore(path, dist_type).extend([self.dist1, self.dist2])
+        dists = DistributionStore(path)
+        assert_array_equal(dists.edges, [0, 10, 100])
+        assert len(dists) == 2
+        assert dists[1] == self.dist2
+
+    def test_reopen_w_different_edges(self, path):
+        DistributionStore(path, dist_type)
+        with pytest.raises(ValueError) as exc_info:
+            DistributionStore(path, [0, 10])
+        assert str(exc_info.value) == "Distributions have different edges."
+
+    def test_reopen_integer_dtype(self, path):
+        uint32_type = dist_type.with_dtype(np.uint32)
+        DistributionStore(path, uint32_type).append(uint32_type.from_samples([5]))
+        dists = DistributionStore(path)
+        assert dists.dist_type.dtype == np.uint32
+        assert dists[0].values.dtype == np.uint32
+        assert dists.sum().values.dtype == np.uint32
+        assert_array_equal(dists[0].values, [0, 1, 0, 0])
+
+    def test_reopen_w_different_dtype(self, path):
+        DistributionStore(path, dist_type.with_dtype(np.uint32))
+        with pytest.raises(ValueError) as exc_info:
+            DistributionStore(path, dist_type)
+        assert str(exc_info.value) == "Distributions have different dtypes."
+
+    def test_append_fractional_to_integer_dtype(self, path):
+        dists = DistributionStore(path, dist_type.with_dtype(np.uint32))
+        with pytest.raises(ValueError):
+            dists.append(dist_type.from_samples([5], 0.5))
+        assert len(dists) == 0
+
+    def test_exact_sum_of_uint64(self, path, monkeypatch):
+        monkeypatch.setattr(store, "_CHUNK_ROWS", 2)
+        uint64_type = dist_type.with_dtype(np.uint64)
+        dists = DistributionStore(path, uint64_type)
+        rows = [[2 ** 63 + 1, 0, 0, 0], [2 ** 62, 1, 0, 0], [3, 0, 0, 0]]
+        dists.extend(uint64_type.from_histogram(row) for row in rows)
+        result = dists.sum()
+        assert result.values.dtype == np.uint64
+        assert result.values.tolist() == [2 ** 63 + 2 ** 62 + 4, 1, 0, 0]
+        dists.append(uint64_type.from_histogram([2 ** 63, 0, 0, 0]))
+        with pytest.raises(OverflowError):
+            dists.sum()
+
+    def test_incomplete_row(self, path):
+        dists = DistributionStore(path, dist_type)
+        dists.append(self.dist1)
+        with open(path, "ab") as f:
+            f.write(b"\0" * 5)
+        with pytest.raises(ValueError) as exc_info:
+            DistributionStore(path)
+        assert str(exc_info.value) == "Distribution store ends with an incomplete row."
+        with pytest.raises(ValueError):
+            dists.append(self.dist2)
+        with pytest.raises(ValueError):
+            len(dists)
+
+    def test_invalid_file(self, path):
+        path.write_bytes(b"not a store")
+        with pytest.raises(ValueError) as exc_info:
+            DistributionStore(path)
+        assert str(exc_info.value) == "Invalid distribution store."
+
+    def test_append_w_different_edges(self, path):
+        dists = DistributionStore(path, dist_type)
+        with pytest.raises(ValueError):
+            dists.append(DistributionType([0, 10]).empty())
+
+    def test_sum(self, path, monkeypatch):
+        monkeypatch.setattr(store, "_CHUNK_ROWS", 2)
+        dists = DistributionStore(path, dist_type)
+        dists.extend([self.dist1, self.dist2] * 3)
+        assert dists.sum() == dist_type.from_samples([0, 5, 10, 20] * 3)
+        assert dists.sum(1, 4) == dist_type.from_samples([0, 5, 10, 20, 10, 20])
+        assert dists.sum(4, 4) == dist_type.empty()
+
+    def test_quantile(self, path, monkeypatch):
+        monkeypatch.setattr(store, "_CHUNK_ROWS", 2)
+        dists = DistributionStore(path, dist_type)
+        dists.extend([self.dist1, self.dist2] * 3)
+        assert_array_equal(dists.quantile(0.5), [0, 10] * 3)
+        assert_array_equal(
+            dists.quantile([0.5, 1], start=3), [[10, 100], [0, 10], [10, 100]]
+        )
+
+    def test_cdf(self, path):
+        dists = DistributionStore(path, dist_type)
+        dists.extend([self.dist1, self.dist2])
+        assert_array_equal(dists.cdf(10), [1, 0.5])
+        assert dists.cdf([10, 100], start=2).shape == (0, 2)
+
+    def test_pdf(self, path):
+        dists = DistributionStore(path, dist_type)
+        dists.append(self.dist2)
+        assert_array_equal(dists.pdf(50), [1 / 180])
+
+    def test_rows_are_mapped(self, path):
+        dists = DistributionStore(path, dist_type)
+        dists.extend([self.dist1, self.dist2])
+        assert len(dists) == 2
+        assert isinstance(dists._rows, np.memmap)
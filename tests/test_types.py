@@ -12,7 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from numpy.testing import assert_array_equal
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose, assert_array_equal
 
 from distimate.types import DistributionType
 
@@ -41,3 +43,158 @@ class TestDistributionConversions:
     def test_from_cumulative(self):
         dist = self.dist_type.from_cumulative([2, 2, 3, 3])
         assert_array_equal(dist.values, [2, 0, 1, 0])
+
+    def test_from_bytes(self):
+        dist = self.dist_type.from_samples([0, 42, 47])
+        assert self.dist_type.from_bytes(dist.to_bytes()) == dist
+
+    def test_fingerprint(self):
+        assert self.dist_type.fingerprint == DistributionType([1, 10, 100]).fingerprint
+        assert self.dist_type.fingerprint != DistributionType([1, 10]).fingerprint
+
+
+class TestGroupedSamples:
+    """Test ``DistributionType.from_grouped_samples`` method."""
+
+    dist_type = DistributionType([1, 10, 100])
+
+    def test_from_grouped_samples(self):
+        keys, array = self.dist_type.from_grouped_samples(
+            ["b", "a", "b", "b"], [0, 42, 47, 1000]
+        )
+        assert_array_equal(keys, ["a", "b"])
+        assert_array_equal(array.values, [[0, 0, 1, 0], [1, 0, 1, 1]])
+
+    def test_from_grouped_samples_w_weights(self):
+        keys, array = self.dist_type.from_grouped_samples(
+            [2, 1, 2], [0, 42, 47], [5, 1, 2]
+        )
+        assert_array_equal(keys, [1, 2])
+        assert_array_equal(array.values, [[0, 0, 1, 0], [5, 0, 2, 0]])
+
+    def test_from_grouped_samples_w_scalar_weight(self):
+        keys, array = self.dist_type.from_grouped_samples([1, 1, 1], [5, 6, 7], 0.1)
+        expected = self.dist_type.from_samples([5, 6, 7], 0.1)
+        assert_array_equal(array.values, [expected.values])
+
+    def test_from_grouped_samples_matches_from_samples(self):
+        rng = np.random.default_rng(0)
+        keys = rng.integers(0, 10, 1000)
+        samples = rng.uniform(0, 200, 1000)
+        weights = rng.uniform(0, 1, 1000)
+        unique_keys, array = self.dist_type.from_grouped_samples(
+            keys, samples, weights
+        )
+        for key, dist in zip(unique_keys, array):
+            mask = keys == key
+            expected = self.dist_type.from_samples(samples[mask], weights[mask])
+            assert_array_equal(dist.values, expected.values)
+
+    def test_from_empty_grouped_samples(self):
+        keys, array = self.dist_type.from_grouped_samples([], [])
+        assert len(keys) == 0
+        assert array.values.shape == (0, 4)
+
+    def test_from_grouped_samples_w_different_lengths(self):
+        with pytest.raises(ValueError):
+            self.dist_type.from_grouped_samples([1, 2], [1])
+
+
+class TestDistributionArrayConversions:
+    """Test ``DistributionType.*_array`` methods."""
+
+    dist_type = DistributionType([1, 10, 100])
+
+    def test_empty_array(self):
+        array = self.dist_type.empty_array(2)
+        assert_array_equal(array.values, [[0, 0, 0, 0], [0, 0, 0, 0]])
+
+    def test_array_from_histogram(self):
+        array = self.dist_type.array_from_histogram([[2, 0, 1, 0]])
+        assert_array_equal(array.values, [[2, 0, 1, 0]])
+
+    def test_array_from_cumulative(self):
+        array = self.dist_type.array_from_cumulative([[2, 2, 3, 3]])
+        assert_array_equal(array.values, [[2, 0, 1, 0]])
+
+    def test_array_from_distributions(self):
+        dist = self.dist_type.from_histogram([2, 0, 1, 0])
+        array = self.dist_type.array_from_distributions([dist, dist])
+        assert_array_equal(array.values, [[2, 0, 1, 0], [2, 0, 1, 0]])
+
+
+class TestArithmeticLayouts:
+    """Test ``DistributionType`` factories with arithmetic bucket lookup."""
+
+    def _check_bin_index(self, dist_type):
+        edges = dist_type.edges
+        samples = np.concatenate(
+            [
+                edges,
+                np.nextafter(edges, np.inf),
+                np.nextafter(edges, -np.inf),
+                np.linspace(edges[0] - 1, edges[-1] + 1, 1001),
+                [0, -1, np.inf, -np.inf, np.nan],
+            ]
+        )
+        assert_array_equal(dist_type.bin_index(samples), edges.searchsorted(samples))
+        for sample in samples[::50]:
+            assert dist_type.bin_index(sample) == edges.searchsorted(sample)
+
+    def test_linear_edges(self):
+        dist_type = DistributionType.linear(0, 100, 11)
+        assert_array_equal(dist_type.edges, np.linspace(0, 100, 11))
+
+    def test_linear_bin_index(self):
+        self._check_bin_index(DistributionType.linear(-3.3, 7.1, 37))
+
+    def test_exponential_edges(self):
+        dist_type = DistributionType.exponential(1, 1000, 4)
+        assert_allclose(dist_type.edges, [1, 10, 100, 1000])
+
+    def test_exponential_bin_index(self):
+        self._check_bin_index(DistributionType.exponential(0.1, 1e4, 200))
+
+    def test_log_linear_edges(self):
+        dist_type = DistributionType.log_linear(1, 3, 4)
+        expected = [1, 1.25, 1.5, 1.75, 2, 2.5, 3, 3.5, 4]
+        assert_array_equal(dist_type.edges, expected)
+
+    def test_log_linear_bin_index(self):
+        self._check_bin_index(DistributionType.log_linear(1e-3, 1e6, 7))
+
+    def test_log_linear_relative_error(self):
+        dist_type = DistributionType.log_linear(1, 1000, 8)
+        samples = np.geomspace(1, 1000, 1001)
+        dist = dist_type.from_samples(samples)
+        estimate = dist.quantile(np.linspace(0, 1, 1001))
+        assert np.all(np.abs(estimate - samples) <= samples / 8)
+
+    def test_from_samples(self):
+        dist_type = DistributionType.linear(0, 100, 11)
+        dist = dist_type.from_samples([0, 5, 10, 10.5, 1000])
+        assert_array_equal(dist.values, [1, 2, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1])
+
+    def test_add_keeps_type(self):
+        dist_type = DistributionType.linear(0, 100, 11)
+        dist = dist_type.from_samples([1]) + dist_type.from_samples([2])
+        dist.add(15)
+        assert_array_equal(dist.values, [0, 2, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0])
+
+    def test_dtype(self):
+        dist_type = DistributionType.log_linear(1, 100, 4, dtype=np.uint32)
+        assert dist_type.dtype == np.uint32
+        assert dist_type.from_samples([3]).values.dtype == np.uint32
+        float_type = dist_type.with_dtype(np.float64)
+        assert type(float_type) is type(dist_type)
+        assert float_type.edges is dist_type.edges
+        assert float_type.with_dtype(np.float64) is float_type
+        assert_array_equal(float_type.bin_index([3]), dist_type.bin_index([3]))
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            DistributionType.linear(0, 100, 1)
+        with pytest.raises(ValueError):
+            DistributionType.exponential(0, 100, 10)
+        with pytest.raises(ValueError):
+            DistributionType.log_linear(10, 1, 4)
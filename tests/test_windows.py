@@ -0,0 +1,217 @@
+# Copyright 2020 Akamai Technologies, Inc
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose, assert_array_equal
+
+from distimate.types import DistributionType
+from distimate.windows import DecayedDistribution, SlidingWindow
+
+dist_type = DistributionType([0, 10, 100])
+
+
+class TestSlidingWindow:
+    def test_empty(self):
+        window = SlidingWindow(dist_type, 10, 3)
+        assert_array_equal(window.distribution.values, [0, 0, 0, 0])
+        assert repr(window) == "<SlidingWindow: weight=0>"
+
+    def test_add(self):
+        window = SlidingWindow(dist_type, 10, 3)
+        window.add(100, 5)
+        window.add(105, 50, weight=2)
+        assert_array_equal(window.distribution.values, [0, 1, 2, 0])
+
+    def test_update(self):
+        window = SlidingWindow(dist_type, 10, 3)
+        window.update([100, 110, 120], [5, 50, 500], [1, 2, 3])
+        assert_array_equal(window.distribution.values, [0, 1, 2, 3])
+
+    def test_update_w_scalar_timestamp(self):
+        window = SlidingWindow(dist_type, 10, 3)
+        window.update(100, [0, 5, 5])
+        assert_array_equal(window.distribution.values, [1, 2, 0, 0])
+
+    def test_expire_slots(self):
+        window = SlidingWindow(dist_type, 10, 3)
+        window.update([100, 110, 120], [5, 50, 500])
+        window.advance(130)
+        assert_array_equal(window.distribution.values, [0, 0, 1, 1])
+        window.add(145, 5)
+        assert_array_equal(window.distribution.values, [0, 1, 0, 1])
+
+    def test_expire_all_slots(self):
+        window = SlidingWindow(dist_type, 10, 3)
+        window.update([100, 110, 120], [5, 50, 500])
+        window.advance(1000)
+        assert_array_equal(window.distribution.values, [0, 0, 0, 0])
+
+    def test_advance_backwards(self):
+        window = SlidingWindow(dist_type, 10, 3)
+        window.update([100, 120], [5, 50])
+        window.advance(100)
+        assert_array_equal(window.distribution.values, [0, 1, 1, 0])
+
+    def test_add_to_past_slot(self):
+        window = SlidingWindow(dist_type, 10, 3)
+        window.add(120, 5)
+        window.add(100, 50)
+        window.advance(130)
+        assert_array_equal(window.distribution.values, [0, 1, 0, 0])
+
+    def test_add_older_than_window(self):
+        window = SlidingWindow(dist_type, 10, 3)
+        window.add(130, 5)
+        with pytest.raises(ValueError) as exc_info:
+            window.add(100, 5)
+        assert str(exc_info.value) == "Timestamps must not be older than the window."
+
+    def test_rejected_update_does_not_advance(self):
+        window = SlidingWindow(dist_type, 10, 3)
+        window.update([0, 0], [5, 50])
+        with pytest.raises(ValueError, match="older than the window"):
+            window.update([100, 0], [5, 5])
+        assert window.weight == 2
+        window.add(20, 5)
+        assert_array_equal(window.distribution.values, [0, 2, 1, 0])
+
+    def test_rejected_first_update(self):
+        window = SlidingWindow(dist_type, 10, 3)
+        with pytest.raises(ValueError, match="older than the window"):
+            window.update([100, 0], [5, 5])
+        window.add(0, 5)
+        assert window.weight == 1
+
+    def test_integer_counters(self):
+        window = SlidingWindow(dist_type.with_dtype(np.int64), 10, 3)
+        window.update([0, 10], [5, 50], [2 ** 60 + 1, 3])
+        assert window.distribution.values.dtype == np.int64
+        assert_array_equal(window.distribution.values, [0, 2 ** 60 + 1, 3, 0])
+        window.advance(30)
+        assert_array_equal(window.distribution.values, [0, 0, 3, 0])
+
+    @pytest.mark.parametrize("weights", [[0.5, 1], [-1, 1]])
+    def test_integer_counters_w_invalid_weights(self, weights):
+        window = SlidingWindow(dist_type.with_dtype(np.int64), 10, 3)
+        window.add(0, 5)
+        with pytest.raises(ValueError, match="integer histograms"):
+            window.update([0, 0], [5, 50], weights)
+        assert_array_equal(window.distribution.values, [0, 1, 0, 0])
+
+    @pytest.mark.parametrize("weights", [[-1], [1, 2], [0.5]])
+    def test_rejected_weights_do_not_advance(self, weights):
+        window = SlidingWindow(dist_type.with_dtype(np.int64), 10, 3)
+        window.add(0, 5)
+        with pytest.raises(ValueError):
+            window.update(100, [5], weights)
+        assert_array_equal(window.distribution.values, [0, 1, 0, 0])
+        window.add(20, 50)
+        assert_array_equal(window.distribution.values, [0, 1, 1, 0])
+
+    def test_matches_merged_slots(self):
+        rng = np.random.default_rng(0)
+        timestamps = np.sort(rng.uniform(0, 1000, 1000))
+        samples = rng.uniform(0, 200, 1000)
+        window = SlidingWindow(dist_type, 10, 30)
+        for timestamp, sample in zip(timestamps, samples):
+            window.add(timestamp, sample)
+        in_window = timestamps >= (timestamps[-1] // 10 - 29) * 10
+        expected = dist_type.from_samples(samples[in_window])
+        assert window.distribution == expected
+
+    def test_quantile(self):
+        window = SlidingWindow(dist_type, 10, 3)
+        window.update([100, 110], [5, 50])
+        assert window.quantile(0.5) == 10
+        window.advance(130)
+        assert window.quantile(0.5) == 55
+
+    def test_invalid_slot_duration(self):
+        with pytest.raises(ValueError):
+            SlidingWindow(dist_type, 0, 3)
+
+    def test_invalid_slot_count(self):
+        with pytest.raises(ValueError):
+            SlidingWindow(dist_type, 10, 0)
+
+
+class TestDecayedDistribution:
+    def test_empty(self):
+        dist = DecayedDistribution(dist_type, 0.1)
+        assert_array_equal(dist.distribution.values, [0, 0, 0, 0])
+        assert repr(dist) == "<DecayedDistribution: weight=0>"
+
+    def test_add(self):
+        dist = DecayedDistribution(dist_type, np.log(2) / 10)
+        dist.add(0, 5)
+        dist.add(10, 50, weight=2)
+        assert_allclose(dist.distribution.values, [0, 0.5, 2, 0])
+
+    def test_update(self):
+        dist = DecayedDistribution(dist_type, np.log(2) / 10)
+        dist.update([0, 10, 20], [5, 50, 500], [4, 2, 1])
+        assert_allclose(dist.distribution.values, [0, 1, 1, 1])
+
+    def test_advance(self):
+        dist = DecayedDistribution(dist_type, np.log(2) / 10)
+        dist.update(0, [5, 50])
+        dist.advance(20)
+        assert_allclose(dist.distribution.values, [0, 0.25, 0.25, 0])
+        assert dist.quantile(0.5) == 10
+
+    def test_move_landmark(self):
+        dist = DecayedDistribution(dist_type, 1)
+        dist.add(0, 5)
+        dist.add(1000, 5)
+        dist.add(2000, 50)
+        assert_allclose(dist.distribution.values, [0, np.exp(-1000), 1, 0])
+
+    def test_matches_exact_decay(self):
+        rng = np.random.default_rng(0)
+        timestamps = np.sort(rng.uniform(0, 10000, 1000))
+        samples = rng.uniform(0, 200, 1000)
+        dist = DecayedDistribution(dist_type, 0.01)
+        for timestamp, sample in zip(timestamps, samples):
+            dist.add(timestamp, sample)
+        weights = np.exp(-0.01 * (timestamps[-1] - timestamps))
+        expected = dist_type.from_samples(samples, weights)
+        assert_allclose(dist.distribution.values, expected.values)
+
+    def test_add_distributions(self):
+        dist1 = DecayedDistribution(dist_type, np.log(2) / 10)
+        dist1.add(0, 5)
+        dist2 = DecayedDistribution(dist_type, np.log(2) / 10, landmark=5)
+        dist2.add(10, 50)
+        result = dist1 + dist2
+        assert_allclose(result.distribution.values, [0, 0.5, 1, 0])
+        assert_allclose(dist1.distribution.values, [0, 1, 0, 0])
+
+    def test_add_distributions_w_different_rates(self):
+        dist1 = DecayedDistribution(dist_type, 0.1)
+        dist2 = DecayedDistribution(dist_type, 0.2)
+        with pytest.raises(ValueError) as exc_info:
+            dist1 += dist2
+        assert str(exc_info.value) == "Distributions have different decay rates."
+
+    def test_integer_dtype(self):
+        dist = DecayedDistribution(dist_type.with_dtype(np.int64), 0.1)
+        dist.update([0, 10], [5, 50])
+        assert dist.distribution.values.dtype == np.float64
+        assert dist.weight == pytest.approx(1 + np.exp(-1))
+        assert dist.quantile(0) == 0
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            DecayedDistribution(dist_type, 0)